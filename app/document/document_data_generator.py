@@ -4,53 +4,37 @@ import logging
 import time
 
 from core.database.database_manager import DatabaseManager
-from core.s3.s3_client import S3Client
 from core.discord.discord_client import DiscordClient
 from core.llm.openai import OpenAIChatLLM
 from core.llm.exception import InvalidLLMJsonResponseError
 from core.enums.enum import LLMErrorType
-from core.llm.utils import fill_message_placeholders, load_prompt_messages
+from core.tracing.tracer import current_span, traced
+from app.document.document_digest import build_digest
+from app.job.job_context import JobContext
 
 
 logging.basicConfig(level=logging.INFO)
 
+# full: 문서 전체를 보낸다. digest: 도입부, 제목, 핵심 문장만 모은 digest를 보낸다. (app/document/document_digest.py)
+DOCUMENT_DATA_MODE = os.environ.get("PICKTOSS_DOCUMENT_DATA_MODE", "full")
 
+
+@traced("document_data_generator")
 def document_data_generator(
-    s3_client: S3Client,
     discord_client: DiscordClient, 
     chat_llm: OpenAIChatLLM,
-    s3_key: str,
-    db_pk: int
+    db_manager: DatabaseManager,
+    job_context: JobContext
     ):
     print("Start Document Data Generation Worker")
     start_time = time.time()
-    
-    db_manager = DatabaseManager(host=os.environ["PICKTOSS_DB_HOST"], user=os.environ["PICKTOSS_DB_USER"], password=os.environ["PICKTOSS_DB_PASSWORD"], db=os.environ["PICKTOSS_DB_NAME"])
-
-    bucket_obj = s3_client.get_object(key=s3_key)
-    content = bucket_obj.decode_content_str()
 
-    language = "en"
-
-    document_select_query = f"SELECT * FROM document WHERE id = {db_pk}"
-    document = db_manager.execute_query(document_select_query)
-    if document and len(document) > 0:
-        language = document[0]['language']
-
-    if language == "en":
-        # dev & prod
-        prompt_messages = load_prompt_messages(prompt_path="/var/task/core/llm/prompts/generate_en_document_data.txt") 
-        # local
-        # prompt_messages = load_prompt_messages(prompt_path="core/llm/prompts/generate_en_document_data.txt")
-    elif language == "ko":
-        # dev & prod
-        prompt_messages = load_prompt_messages(prompt_path="/var/task/core/llm/prompts/generate_ko_document_data.txt") 
-        # local
-        # prompt_messages = load_prompt_messages(prompt_path="core/llm/prompts/generate_document_data.txt")
-    else:
-        prompt_messages = load_prompt_messages(prompt_path="/var/task/core/llm/prompts/generate_en_document_data.txt")
+    s3_key, db_pk = job_context.s3_key, job_context.db_pk
+    content = job_context.content
 
-    messages = fill_message_placeholders(messages=prompt_messages, placeholders={"note": content})
+    note = build_digest(content) if DOCUMENT_DATA_MODE == "digest" else content
+    current_span().add("note_chars", len(note))
+    messages = job_context.document_prompt.render(note=note)
 
     resp_dict = {'emoji': None, 'title': None, 'category_id': None}
 
@@ -91,7 +75,6 @@ def document_data_generator(
     db_manager.execute_query(document_update_query)
     db_manager.commit()
 
-    db_manager.close()
     end_time = time.time()
     print(f"문서 데이터 생성 함수 걸린 시간: {end_time - start_time}")
     print("End Document Data Generation Worker")
\ No newline at end of file
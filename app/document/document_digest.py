@@ -0,0 +1,78 @@
+"""Compact extractive digest of a note, used instead of the whole note to generate emoji, title and category.
+
+The digest keeps the opening of the note, its headings and the sentences that best cover its recurring
+terms, in document order, within a token budget. It is built locally in one pass over the note, so the
+document data prompt stays small and within the model context however long the note is.
+"""
+import math
+import os
+import re
+from collections import Counter
+
+from core.llm.tokenizer import count_tokens
+
+
+DOCUMENT_DIGEST_TOKEN_BUDGET = int(os.environ.get("PICKTOSS_DOCUMENT_DIGEST_TOKEN_BUDGET", "1500"))
+# budget 중 도입부와 제목(heading)에 먼저 쓰는 비율. 나머지는 핵심 문장으로 채운다.
+OPENING_SHARE = 0.4
+HEADING_SHARE = 0.2
+MIN_SENTENCE_WORDS = 3
+
+_SEGMENT_PATTERN = re.compile(r"[^\n.!?。]+[.!?。]?")
+_WORD_PATTERN = re.compile(r"\w{2,}")
+
+
+def build_digest(content: str, token_budget: int = DOCUMENT_DIGEST_TOKEN_BUDGET) -> str:
+    """`content` itself if it fits in `token_budget`, otherwise its opening, headings and key sentences."""
+    # 토큰 수는 글자 수보다 많을 수 없으므로, 짧은 문서는 세지 않고 그대로 쓴다.
+    if len(content) < token_budget or count_tokens(content) <= token_budget:
+        return content
+
+    segments = [(match.start(), match.group().strip()) for match in _SEGMENT_PATTERN.finditer(content)]
+    segments = [(position, text) for position, text in segments if text]
+    selected: dict[int, str] = {}
+    used = 0
+
+    def take(position: int, text: str, limit: float) -> bool:
+        nonlocal used
+        tokens = count_tokens(text)
+        if used + tokens > limit:
+            return False
+        selected[position] = text
+        used += tokens
+        return True
+
+    for position, text in segments:
+        if not take(position, text, token_budget * OPENING_SHARE):
+            break
+
+    for position, text in segments:
+        if text.startswith("#") and position not in selected:
+            if not take(position, text, token_budget * (OPENING_SHARE + HEADING_SHARE)):
+                break
+
+    for position, text in _rank_sentences(segments):
+        if position not in selected:
+            take(position, text, token_budget)
+
+    return "\n".join(text for _, text in sorted(selected.items()))
+
+
+def _rank_sentences(segments: list[tuple[int, str]]) -> list[tuple[int, str]]:
+    """Sentences ordered by how well they cover the note's recurring terms.
+
+    A word weighs tf * log(N / sf) with sentences as documents, so words found in almost every sentence
+    (particles, articles) and one-off words both count little.
+    """
+    sentence_words = [{word.casefold() for word in _WORD_PATTERN.findall(text)} for _, text in segments]
+    sentence_frequency = Counter(word for words in sentence_words for word in words)
+    count = len(segments)
+    weights = {word: frequency * math.log(count / frequency) for word, frequency in sentence_frequency.items()}
+
+    scored = [
+        (sum(weights[word] for word in words) / math.sqrt(len(words)), position, text)
+        for (position, text), words in zip(segments, sentence_words)
+        if len(words) >= MIN_SENTENCE_WORDS and not text.startswith("#")
+    ]
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [(position, text) for _, position, text in scored]
@@ -0,0 +1,104 @@
+import os
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import chain
+
+from core.s3.s3_client import S3Client
+from core.database.database_manager import DatabaseManager
+from core.llm.openai import ChatMessage
+from core.llm.template import PromptTemplate, get_prompt_template
+from core.llm.utils import content_splitter, iter_content_splits, packed_content_splitter, estimate_chunking_cost
+from core.tracing.tracer import TRACING_MODE, current_span, traced
+
+
+# 이보다 큰 문서는 메모리에 한 번에 올리지 않고 S3에서 읽는 대로 chunk를 만든다.
+STREAMING_THRESHOLD_BYTES = 1024 * 1024
+# streaming 모드에서 문서 데이터(emoji, title, category) 생성에 사용하는 앞부분 길이
+STREAMING_CONTENT_PREFIX_LENGTH = 20_000
+# fixed: 1000자 chunk + 150자 overlap, packed: 요청당 prompt token budget을 채우도록 문단 단위로 묶는다.
+CHUNKING_MODE = os.environ.get("PICKTOSS_CHUNKING_MODE", "fixed")
+CHUNK_TOKEN_BUDGET = int(os.environ.get("PICKTOSS_CHUNK_TOKEN_BUDGET", "4000"))
+
+
+@dataclass
+class JobContext:
+    """Everything one outbox message needs, loaded once and shared by the generators."""
+
+    s3_key: str
+    db_pk: int
+    member_id: int
+    star_count: int
+    content: str
+    language: str
+    document_prompt: PromptTemplate
+    quiz_prompt: PromptTemplate
+    # streaming 모드에서는 S3 body를 읽어가며 chunk를 만드는 generator이고, 한 번만 순회할 수 있다.
+    content_splits: Iterable[str] = field(default_factory=list)
+    # 필요한 퀴즈 수. None이면 모든 chunk로 퀴즈를 만든다.
+    target_quiz_count: int | None = None
+
+
+@traced("load_job_context")
+def load_job_context(
+    s3_client: S3Client,
+    db_manager: DatabaseManager,
+    s3_key: str,
+    db_pk: int,
+    member_id: int,
+    star_count: int,
+    target_quiz_count: int | None = None
+    ) -> JobContext:
+    bucket_obj = s3_client.open_object(key=s3_key)
+
+    language = "en"
+
+    document_select_query = f"SELECT * FROM document WHERE id = {db_pk}"
+    document = db_manager.execute_query(document_select_query)
+    if document and len(document) > 0:
+        language = document[0]['language']
+
+    document_prompt = get_prompt_template("document_data", language)
+    quiz_prompt = get_prompt_template("quiz", language)
+
+    splitter = _content_splitter_for(quiz_prompt.messages)
+    if bucket_obj.content_length > STREAMING_THRESHOLD_BYTES:
+        content, content_splits = _stream_content(bucket_obj.iter_content_str(), splitter)
+    else:
+        content = bucket_obj.read().decode_content_str()
+        content_splits = splitter(content)
+        current_span().add("chunks", len(content_splits))
+        # 문서 전체의 토큰을 한 번 더 세야 하므로 tracing이 켜져 있을 때만 예상 비용을 기록한다.
+        if TRACING_MODE:
+            for key, value in estimate_chunking_cost(content, quiz_prompt.messages, content_splits).items():
+                current_span().add(f"estimated_{key}", value)
+
+    return JobContext(
+        s3_key=s3_key,
+        db_pk=db_pk,
+        member_id=member_id,
+        star_count=star_count,
+        content=content,
+        language=language,
+        document_prompt=document_prompt,
+        quiz_prompt=quiz_prompt,
+        content_splits=content_splits,
+        target_quiz_count=target_quiz_count,
+    )
+
+
+def _content_splitter_for(quiz_prompt_messages: list[ChatMessage]) -> Callable[[str], list[str]]:
+    if CHUNKING_MODE == "packed":
+        return partial(packed_content_splitter, prompt_messages=quiz_prompt_messages, token_budget=CHUNK_TOKEN_BUDGET)
+    return content_splitter
+
+
+def _stream_content(text_stream: Iterable[str], splitter: Callable[[str], list[str]]) -> tuple[str, Iterable[str]]:
+    text_stream = iter(text_stream)
+    prefix = ""
+    for text in text_stream:
+        prefix += text
+        if len(prefix) >= STREAMING_CONTENT_PREFIX_LENGTH:
+            break
+
+    return prefix[:STREAMING_CONTENT_PREFIX_LENGTH], iter_content_splits(chain([prefix], text_stream), splitter=splitter)
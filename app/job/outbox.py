@@ -0,0 +1,90 @@
+"""Claiming outbox rows with a lease, so one document is processed by one worker at a time.
+
+Requires two columns on `outbox`:
+
+    ALTER TABLE outbox
+        ADD COLUMN worker_id VARCHAR(255) NULL,
+        ADD COLUMN lease_expires_at DATETIME(6) NULL,
+        ADD INDEX idx_outbox_status_lease_expires_at (status, lease_expires_at);
+
+Times are UTC and computed by the worker, so the same statements also run on the SQLite bench database.
+"""
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+
+from core.database.database_manager import DatabaseManager
+
+
+# Lambda 최대 실행 시간(15분)보다 길어야 정상 실행 중인 job을 sweeper가 빼앗지 않는다.
+OUTBOX_LEASE_SECONDS = int(os.environ.get("PICKTOSS_OUTBOX_LEASE_SECONDS", "960"))
+SWEEP_BATCH_SIZE = 100
+
+# Lambda에서는 log stream 이름으로 어떤 실행 환경이 잡았는지 찾을 수 있다.
+WORKER_HOST = f"{os.environ.get('AWS_LAMBDA_LOG_STREAM_NAME', socket.gethostname())}:{os.getpid()}"
+
+
+def new_worker_id() -> str:
+    # 같은 container의 다른 thread가 중복 전달된 메시지를 받아도 서로 다른 id로 경쟁하도록 job마다 새로 만든다.
+    return f"{WORKER_HOST}:{uuid.uuid4().hex[:12]}"
+
+
+def claim_outbox(db_manager: DatabaseManager, db_pk: int, worker_id: str, lease_seconds: int = OUTBOX_LEASE_SECONDS) -> bool:
+    """Take the outbox row of `db_pk` in one conditional UPDATE and commit.
+
+    Succeeds if the row is WAITING, its lease has expired, or `worker_id` already holds it. A duplicate
+    SQS delivery racing for the same row blocks on the row lock and then matches zero rows.
+    DB errors are raised rather than returned as False, so the message is retried instead of dropped.
+    """
+    now = _utcnow()
+    claim_query = (
+        "UPDATE outbox SET status = 'PROCESSING', worker_id = %s, lease_expires_at = %s "
+        "WHERE document_id = %s AND (status = 'WAITING' OR worker_id = %s OR lease_expires_at < %s)"
+    )
+    claimed = db_manager.execute_update(claim_query, (worker_id, now + timedelta(seconds=lease_seconds), db_pk, worker_id, now))
+    db_manager.commit()
+    return bool(claimed)
+
+
+def release_outbox(db_manager: DatabaseManager, db_pk: int, worker_id: str):
+    """Give a claimed row back as WAITING after a failed job, so the SQS retry can claim it right away."""
+    db_manager.rollback()
+    release_query = "UPDATE outbox SET status = 'WAITING', worker_id = NULL, lease_expires_at = NULL WHERE document_id = %s AND worker_id = %s"
+    db_manager.execute_update(release_query, (db_pk, worker_id))
+    db_manager.commit()
+
+
+def complete_outbox(db_manager: DatabaseManager, db_pk: int, worker_id: str):
+    """Delete the claimed row (commit is left to the caller, to go with the job's last writes)."""
+    # lease가 만료되어 다른 worker가 가져간 row는 지우지 않는다.
+    delete_query = "DELETE FROM outbox WHERE document_id = %s AND worker_id = %s"
+    db_manager.execute_update(delete_query, (db_pk, worker_id))
+
+
+def sweep_expired_leases(db_manager: DatabaseManager, batch_size: int = SWEEP_BATCH_SIZE) -> list[int]:
+    """Put PROCESSING rows whose lease expired (crashed or timed-out jobs) back to WAITING."""
+    now = _utcnow()
+    # 여러 sweeper가 동시에 돌아도 서로 잠근 row는 건너뛴다.
+    select_query = (
+        "SELECT document_id FROM outbox WHERE status = 'PROCESSING' AND lease_expires_at < %s "
+        "ORDER BY lease_expires_at LIMIT %s FOR UPDATE SKIP LOCKED"
+    )
+    rows = db_manager.execute_query(select_query, (now, batch_size)) or []
+    document_ids = [row["document_id"] for row in rows]
+
+    if document_ids:
+        placeholders = ", ".join(["%s"] * len(document_ids))
+        reset_query = (
+            "UPDATE outbox SET status = 'WAITING', worker_id = NULL, lease_expires_at = NULL "
+            f"WHERE document_id IN ({placeholders}) AND status = 'PROCESSING' AND lease_expires_at < %s"
+        )
+        db_manager.execute_update(reset_query, (*document_ids, now))
+    db_manager.commit()
+
+    print(f"Swept {len(document_ids)} expired outbox leases: {document_ids}")
+    return document_ids
+
+
+def _utcnow() -> datetime:
+    return datetime.utcnow()
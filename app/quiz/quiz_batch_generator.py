@@ -0,0 +1,34 @@
+from core.llm.openai import OpenAIChatLLM
+from app.job.job_context import JobContext
+from app.quiz.quiz_generator import CHUNK_PREVIEW_LENGTH
+from app.quiz.quiz_prompt import render_quiz_prompt
+from app.quiz.quiz_schema import QUIZ_RESPONSE_FORMAT
+
+
+def quiz_batch_custom_id(db_pk: int, chunk_index: int) -> str:
+    return f"quiz-{db_pk}-{chunk_index}"
+
+
+def build_quiz_batch_requests(chat_llm: OpenAIChatLLM, job_context: JobContext) -> tuple[list[dict], list[str]]:
+    """Batch API request lines for every chunk of one document, plus chunk previews for error reports."""
+    batch_requests: list[dict] = []
+    chunk_previews: list[str] = []
+
+    for i, split in enumerate(job_context.content_splits):
+        batch_requests.append(chat_llm.build_batch_request(
+            custom_id=quiz_batch_custom_id(job_context.db_pk, i),
+            messages=render_quiz_prompt(job_context.quiz_prompt, split),
+            response_format=QUIZ_RESPONSE_FORMAT,
+        ))
+        chunk_previews.append(split[:CHUNK_PREVIEW_LENGTH])
+
+    return batch_requests, chunk_previews
+
+
+def collect_quiz_batch_results(batch_results: dict[str, dict | Exception], db_pk: int, chunk_count: int) -> list[dict | Exception]:
+    """Per-chunk results of one document in chunk order, in the shape save_quiz_results expects."""
+    results: list[dict | Exception] = []
+    for i in range(chunk_count):
+        custom_id = quiz_batch_custom_id(db_pk, i)
+        results.append(batch_results.get(custom_id, RuntimeError(f"No batch result for {custom_id}")))
+    return results
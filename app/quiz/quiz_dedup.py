@@ -0,0 +1,128 @@
+"""Near-duplicate quiz detection with MinHash signatures and LSH banding.
+
+Overlapping chunks (see content_splitter) often yield almost the same question twice. Texts are compared
+as sets of character 2-grams after dropping whitespace and punctuation, which needs no tokenizer and
+works the same for Korean and English. Each text gets a one-permutation MinHash signature (one hash per
+shingle, densified for empty bins), so adding a quiz costs O(shingles). Quizzes that share an LSH band
+are compared by exact Jaccard similarity against `threshold`.
+"""
+import os
+import unicodedata
+
+
+# 0이면 중복 제거를 하지 않는다.
+QUIZ_DEDUP_THRESHOLD = float(os.environ.get("PICKTOSS_QUIZ_DEDUP_THRESHOLD", "0.7"))
+# 한글은 음절 하나에 정보가 많아서, 조사만 바뀐 문장도 2-gram이 3-gram보다 잘 겹친다.
+SHINGLE_SIZE = 2
+NUM_BINS = 64
+
+_MASK64 = (1 << 64) - 1
+# 빈 bin을 오른쪽 bin 값으로 채울 때 거리마다 더하는 값 (Shrivastava & Li, densified one permutation hashing)
+_DENSIFY_OFFSET = 1 << 58
+
+
+class QuizDeduplicator:
+    """Remembers the quizzes kept so far and tells whether a new one nearly repeats one of them."""
+
+    def __init__(self, threshold: float = QUIZ_DEDUP_THRESHOLD, num_bins: int = NUM_BINS):
+        self.threshold = threshold
+        self.num_bins = num_bins
+        self.rows_per_band = _rows_per_band(threshold, num_bins)
+        self.duplicates = 0
+        self._buckets: dict[tuple, list[int]] = {}
+        self._shingle_sets: list[frozenset[str]] = []
+
+    def add(self, text: str) -> bool:
+        """Keep `text` and return True, or return False if it is a near-duplicate of a kept text."""
+        if self.threshold <= 0:
+            return True
+        shingles = shingle_set(text)
+        signature = minhash_signature(shingles, self.num_bins)
+        band_keys = [
+            (band, *signature[band * self.rows_per_band:(band + 1) * self.rows_per_band])
+            for band in range(self.num_bins // self.rows_per_band)
+        ]
+
+        checked: set[int] = set()
+        for key in band_keys:
+            for candidate in self._buckets.get(key, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                if _similar(shingles, self._shingle_sets[candidate], self.threshold):
+                    self.duplicates += 1
+                    return False
+
+        index = len(self._shingle_sets)
+        self._shingle_sets.append(shingles)
+        for key in band_keys:
+            self._buckets.setdefault(key, []).append(index)
+        return True
+
+
+def quiz_text(quiz: dict) -> str:
+    # 같은 질문이라도 정답이 다르면 다른 퀴즈이므로 정답도 함께 비교한다.
+    return f"{quiz['question']} {quiz['answer']}"
+
+
+def dedupe_quizzes(quizzes: list[dict], threshold: float = QUIZ_DEDUP_THRESHOLD) -> list[dict]:
+    """`quizzes` without near-duplicates, keeping the first of each group."""
+    deduplicator = QuizDeduplicator(threshold)
+    return [quiz for quiz in quizzes if deduplicator.add(quiz_text(quiz))]
+
+
+def shingle_set(text: str) -> frozenset[str]:
+    normalized = "".join(char for char in unicodedata.normalize("NFKC", text).casefold() if char.isalnum())
+    if len(normalized) <= SHINGLE_SIZE:
+        return frozenset([normalized])
+    return frozenset(normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1))
+
+
+def minhash_signature(shingles: frozenset[str], num_bins: int) -> list[int]:
+    """One-permutation MinHash: each shingle is hashed once into one of `num_bins` bins, keeping the minimum."""
+    bins: list[int | None] = [None] * num_bins
+    for shingle in shingles:
+        # str hash는 process마다 달라지지만, 비교는 한 job 안에서만 하므로 문제없다.
+        value = hash(shingle) & _MASK64
+        index = value % num_bins
+        if bins[index] is None or value < bins[index]:
+            bins[index] = value
+    return _densify(bins)
+
+
+def jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    return len(a & b) / len(a | b)
+
+
+def _similar(a: frozenset[str], b: frozenset[str], threshold: float) -> bool:
+    # Jaccard는 작은 집합 크기 / 큰 집합 크기를 넘을 수 없으므로, 크기 차이가 크면 교집합을 구하지 않는다.
+    if min(len(a), len(b)) < threshold * max(len(a), len(b)):
+        return False
+    intersection = len(a & b)
+    return intersection >= threshold * (len(a) + len(b) - intersection)
+
+
+def _densify(bins: list[int | None]) -> list[int]:
+    # 빈 bin은 오른쪽(순환)으로 가장 가까운 채워진 bin의 값을 거리만큼 바꿔서 쓴다.
+    if all(value is None for value in bins):
+        return [0] * len(bins)
+    count = len(bins)
+    signature = list(bins)
+    for i, value in enumerate(bins):
+        if value is not None:
+            continue
+        distance = 1
+        while bins[(i + distance) % count] is None:
+            distance += 1
+        signature[i] = bins[(i + distance) % count] + distance * _DENSIFY_OFFSET
+    return signature
+
+
+def _rows_per_band(threshold: float, num_bins: int) -> int:
+    """Rows per LSH band whose S-curve midpoint (1/bands)^(1/rows) is closest to `threshold`.
+
+    Lower midpoints find a few more duplicates but check many more candidates, since quizzes share stems
+    like "다음 중 ... 옳은 것은?".
+    """
+    divisors = [rows for rows in range(1, num_bins + 1) if num_bins % rows == 0]
+    return min(divisors, key=lambda rows: abs((rows / num_bins) ** (1 / rows) - threshold))
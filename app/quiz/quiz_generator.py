@@ -1,144 +1,344 @@
+import contextvars
+import itertools
+import math
 import os
 import pytz
 import logging
+import queue
+import threading
 import time
+from collections.abc import Iterator, Sequence
 from datetime import datetime
-from langchain_core.runnables import RunnableLambda
 
-from core.s3.s3_client import S3Client
 from core.database.database_manager import DatabaseManager
 from core.discord.discord_client import DiscordClient
 from core.enums.enum import LLMErrorType, QuizType, TransactionType, Source
 from core.llm.openai import ChatMessage, OpenAIChatLLM
+from core.llm.deadline import DeadlineExceededError
 from core.llm.exception import InvalidLLMJsonResponseError
-from core.llm.utils import fill_message_placeholders, load_prompt_messages, content_splitter
+from core.tracing.tracer import current_span, traced
+from app.job.job_context import JobContext
+from app.quiz.quiz_dedup import QuizDeduplicator, quiz_text
+from app.quiz.quiz_prompt import quiz_count_range, render_quiz_prompt
+from app.quiz.quiz_schema import QUIZ_RESPONSE_FORMAT, quiz_error, validate_quiz_response
+from app.quiz.quiz_target import spread_order
 
 
 logging.basicConfig(level=logging.INFO)
 
+CHUNK_PREVIEW_LENGTH = 500
+# 문서 하나에서 다시 요청할 수 있는 chunk 수. 실패한 chunk만 다시 보내고 문서 전체를 다시 돌리지 않는다.
+QUIZ_CHUNK_RETRY_BUDGET = 5
+# true이면 응답을 stream으로 받아 퀴즈가 하나 완성될 때마다 바로 저장한다.
+QUIZ_STREAMING = os.environ.get("PICKTOSS_QUIZ_STREAMING", "false") == "true"
+# 이보다 적은 퀴즈가 만들어지면 별을 돌려준다. (목표 수량 모드에서는 목표 수량)
+MIN_QUIZ_COUNT = 6
+# 예상보다 적게 나오는 chunk가 있어도 한 wave에 채울 수 있도록 조금 더 보낸다.
+QUIZ_WAVE_HEADROOM = 1.25
 
+
+@traced("quiz_generator")
 def quiz_generator(
-    s3_client: S3Client,
     discord_client: DiscordClient, 
     chat_llm: OpenAIChatLLM,
-    s3_key: str,
-    db_pk: int,
-    member_id: int,
-    star_count: int
+    db_manager: DatabaseManager,
+    job_context: JobContext
     ):
     print("Start Quiz Generation Worker")
     start_time = time.time()
-    
-    db_manager = DatabaseManager(host=os.environ["PICKTOSS_DB_HOST"], user=os.environ["PICKTOSS_DB_USER"], password=os.environ["PICKTOSS_DB_PASSWORD"], db=os.environ["PICKTOSS_DB_NAME"])
-
-    bucket_obj = s3_client.get_object(key=s3_key)
-    content = bucket_obj.decode_content_str()
-    content_splits = content_splitter(content)
-
-    language = "en"
-
-    document_select_query = f"SELECT * FROM document WHERE id = {db_pk}"
-    document = db_manager.execute_query(document_select_query)
-    if document and len(document) > 0:
-        language = document[0]['language']
-    
-    if language == "en":
-        # dev & prod
-        prompt_messages = load_prompt_messages(prompt_path="/var/task/core/llm/prompts/generate_en_quiz.txt")
-        # local
-        # prompt_messages = load_prompt_messages("core/llm/prompts/generate_en_quiz.txt")
-    elif language == "ko":
-        # dev & prod
-        prompt_messages = load_prompt_messages(prompt_path="/var/task/core/llm/prompts/generate_ko_quiz.txt")
-        # local
-        # prompt_messages = load_prompt_messages("core/llm/prompts/generate_ko_quiz.txt")
-    else:
-        prompt_messages = load_prompt_messages(prompt_path="/var/task/core/llm/prompts/generate_en_quiz.txt")
 
-    batch_inputs: list[list[ChatMessage]] = []
-    for split in content_splits:
-        filled_messages = fill_message_placeholders(
-            messages=prompt_messages,
-            placeholders={"note": split}
+    content_splits = job_context.content_splits
+    quiz_prompt = job_context.quiz_prompt
+
+    # content_splits는 generator일 수 있으므로, 에러 리포트용으로 chunk 앞부분만 남겨둔다.
+    chunk_previews: list[str] = []
+
+    def iter_batch_inputs() -> Iterator[list[ChatMessage]]:
+        for split in content_splits:
+            chunk_previews.append(split[:CHUNK_PREVIEW_LENGTH])
+            yield render_quiz_prompt(quiz_prompt, split)
+
+    if job_context.target_quiz_count:
+        # 필요한 만큼만 만들기 때문에 streaming 설정과 관계없이 wave 단위로 요청한다.
+        _generate_quizzes_to_target(discord_client, chat_llm, db_manager, job_context, chunk_previews)
+    elif QUIZ_STREAMING:
+        _stream_quizzes(discord_client, chat_llm, db_manager, job_context, iter_batch_inputs(), chunk_previews)
+    else:
+        # chunk가 만들어지는 대로 요청을 보내고, chunk별로 결과 또는 예외를 받는다.
+        results = chat_llm.batch_predict_json(
+            iter_batch_inputs(),
+            response_format=QUIZ_RESPONSE_FORMAT,
+            validate=validate_quiz_response,
+            retry_budget=QUIZ_CHUNK_RETRY_BUDGET,
         )
-        batch_inputs.append(filled_messages)
+        save_quiz_results(discord_client, db_manager, job_context, results, chunk_previews)
 
-    predict_json_runnable = RunnableLambda(chat_llm.predict_json)
-    results = []
+    current_span().add("chunks", len(chunk_previews))
+    end_time = time.time()
+    print(f"퀴즈 생성 함수 걸린 시간: {end_time - start_time}")
+    print("End Quiz Generation Worker")
 
-    success_at_least_once = False
-    failed_at_least_once = False
 
+def _generate_quizzes_to_target(
+    discord_client: DiscordClient,
+    chat_llm: OpenAIChatLLM,
+    db_manager: DatabaseManager,
+    job_context: JobContext,
+    chunk_previews: list[str]
+    ):
+    """Generate from chunks spread across the document, in waves, until `target_quiz_count` valid quizzes exist.
+
+    Prompts are rendered only for the chunks a wave sends. Streamed chunks are used in document order.
+    """
+    target = job_context.target_quiz_count
+    content_splits = job_context.content_splits
+    if isinstance(content_splits, Sequence):
+        chunks = ((i, content_splits[i]) for i in (spread_order(len(content_splits)) if content_splits else []))
+    else:
+        # streaming 모드의 chunk는 S3에서 읽는 대로 만들어지므로 모두 읽어 두지 않고 앞에서부터 쓴다.
+        chunks = enumerate(content_splits)
+    first_chunk = next(chunks, None)
+    # 보낸 순서대로 (문서 안의 chunk 번호, chunk 앞부분)
+    sent_chunks: list[tuple[int, str]] = []
+
+    def iter_batch_inputs() -> Iterator[list[ChatMessage]]:
+        for index, split in itertools.chain([first_chunk] if first_chunk else [], chunks):
+            sent_chunks.append((index, split[:CHUNK_PREVIEW_LENGTH]))
+            yield render_quiz_prompt(job_context.quiz_prompt, split)
+
+    # 저장할 때 중복은 빠지므로, 중복을 뺀 수로 목표를 채웠는지 본다. (event loop thread에서만 호출된다)
+    deduplicator = QuizDeduplicator()
+    counted: set[int] = set()
+    valid = 0
+    # 첫 wave는 첫 chunk에 요청하는 최소 개수로 추정한다.
+    first_per_chunk = quiz_count_range(first_chunk[1])[0] if first_chunk else 1
+
+    def wave_size(results: dict[int, dict | Exception]) -> int:
+        nonlocal valid
+        for position, result in results.items():
+            if position not in counted:
+                counted.add(position)
+                if not isinstance(result, Exception):
+                    valid += sum(deduplicator.add(quiz_text(q_set)) for q_set in result["quizzes"])
+        needed = target - valid
+        if needed <= 0:
+            return 0
+        # 실패한 chunk까지 포함해서 지금까지 chunk당 실제로 나온 수로 남은 chunk 수를 추정한다.
+        per_chunk = valid / len(results) if results else first_per_chunk
+        return math.ceil(needed / max(per_chunk, 1) * QUIZ_WAVE_HEADROOM)
+
+    results = chat_llm.predict_json_in_waves(
+        iter_batch_inputs(),
+        wave_size,
+        response_format=QUIZ_RESPONSE_FORMAT,
+        validate=validate_quiz_response,
+        retry_budget=QUIZ_CHUNK_RETRY_BUDGET,
+    )
+    print(f"Target {target} quizzes: results from {len(results)} of {len(sent_chunks)} sent chunks")
+
+    # 결과는 문서 순서대로 저장한다.
+    positions = sorted(results, key=lambda position: sent_chunks[position][0])
+    chunk_previews.extend(sent_chunks[position][1] for position in positions)
+    save_quiz_results(
+        discord_client, db_manager, job_context, [results[position] for position in positions], chunk_previews,
+        # 목표 수량은 생성을 멈추는 기준이고, 짧은 문서라 목표에 못 미쳐도 MIN_QUIZ_COUNT를 넘으면 저장한다.
+        min_quizzes=min(target, MIN_QUIZ_COUNT), max_quizzes=target,
+    )
+
+
+def _stream_quizzes(
+    discord_client: DiscordClient,
+    chat_llm: OpenAIChatLLM,
+    db_manager: DatabaseManager,
+    job_context: JobContext,
+    batch_inputs: Iterator[list[ChatMessage]],
+    chunk_previews: list[str]
+    ):
+    quiz_writer = QuizWriter(db_manager, job_context.db_pk)
+    deduplicator = QuizDeduplicator()
+
+    def on_quiz(q_set: dict):
+        # event loop thread에서 호출되므로 검증과 중복 확인만 하고 저장은 writer thread에 맡긴다.
+        error = quiz_error(q_set)
+        if error:
+            print(f"Skipping invalid quiz: {error}")
+            return
+        if not deduplicator.add(quiz_text(q_set)):
+            return
+        quiz_writer.put(quiz_from_response(q_set))
+
+    quiz_writer.start()
     try:
-        results = predict_json_runnable.batch(batch_inputs)
-    except InvalidLLMJsonResponseError as e:
-        discord_client.report_llm_error(
-            task="Question Generation",
-            error_type=LLMErrorType.INVALID_JSON_FORMAT,
-            document_content=content_splits[0],
-            llm_response=e.llm_response,
-            error_message="LLM Response is not JSON-decodable",
-            info=f"* s3_key: `{s3_key}`\n* document_id: `{db_pk}`",
+        results = chat_llm.batch_stream_json_items(
+            batch_inputs,
+            array_key="quizzes",
+            on_item=on_quiz,
+            response_format=QUIZ_RESPONSE_FORMAT,
+            retry_budget=QUIZ_CHUNK_RETRY_BUDGET,
         )
-        failed_at_least_once = True
-    except Exception as e:
-        discord_client.report_llm_error(
-            task="Question Generation",
-            error_type=LLMErrorType.GENERAL,
-            document_content=content_splits[0],
-            error_message="Failed to generate questions",
-            info=f"* s3_key: `{s3_key}`\n* document_id: `{db_pk}`",
-        )
-        failed_at_least_once = True
+    finally:
+        quiz_writer.close()
+    current_span().add("duplicate_quizzes", deduplicator.duplicates)
+
+    save_quiz_results(discord_client, db_manager, job_context, results, chunk_previews, quiz_writer=quiz_writer)
+
+
+class QuizWriter:
+    """Stores streamed quizzes on a background thread, committing whatever has arrived since the last write.
+
+    It uses the caller's db_manager, so the caller must not touch it between start() and close().
+    """
+
+    def __init__(self, db_manager: DatabaseManager, db_pk: int):
+        self.db_manager = db_manager
+        self.db_pk = db_pk
+        self.timestamp = datetime.now(pytz.timezone('Asia/Seoul'))
+        self.quiz_ids: list[int] = []
+
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=contextvars.copy_context().run, args=(self._run,), name=f"quiz-writer-{db_pk}", daemon=True)
+        self._error: Exception | None = None
+        self._start_time = time.time()
+
+    def start(self):
+        self._start_time = time.time()
+        self._thread.start()
+
+    def put(self, quiz: dict):
+        self._queue.put(quiz)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        if self._error:
+            raise self._error
+
+    def discard(self):
+        """Delete everything this writer stored (commit is left to the caller)."""
+        if not self.quiz_ids:
+            return
+        placeholders = ", ".join(["%s"] * len(self.quiz_ids))
+        self.db_manager.execute_query(f"DELETE FROM options WHERE quiz_id IN ({placeholders})", self.quiz_ids)
+        self.db_manager.execute_query(f"DELETE FROM quiz WHERE id IN ({placeholders})", self.quiz_ids)
+        self.quiz_ids = []
+
+    def _run(self):
+        done = False
+        while not done:
+            quizzes = []
+            # 첫 퀴즈는 기다리고, 그동안 쌓인 나머지는 한 번에 저장한다.
+            for quiz in self._drain():
+                if quiz is None:
+                    done = True
+                    break
+                quizzes.append(quiz)
+            if not quizzes or self._error:
+                continue
+
+            try:
+                self.quiz_ids += insert_quizzes(self.db_manager, quizzes, self.db_pk, self.timestamp, after_id=self.quiz_ids[-1] if self.quiz_ids else 0)
+                self.db_manager.commit()
+            except Exception as e:
+                # 퀴즈만 들어가고 보기는 빠진 채로 남지 않도록 이번 묶음을 되돌린다.
+                self.db_manager.rollback()
+                self._error = e
+                continue
+
+            if len(self.quiz_ids) == len(quizzes):
+                print(f"First quizzes stored in {time.time() - self._start_time:.2f}s")
+
+    def _drain(self) -> Iterator[dict | None]:
+        yield self._queue.get()
+        while True:
+            try:
+                yield self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+
+@traced("save_quiz_results")
+def save_quiz_results(
+    discord_client: DiscordClient,
+    db_manager: DatabaseManager,
+    job_context: JobContext,
+    results: list[dict | Exception],
+    chunk_previews: list[str],
+    quiz_writer: "QuizWriter | None" = None,
+    min_quizzes: int = MIN_QUIZ_COUNT,
+    max_quizzes: int | None = None
+    ):
+    """Validate per-chunk LLM results, then store the quizzes or refund stars if fewer than `min_quizzes` are usable.
+
+    With a `quiz_writer`, the quizzes were already stored while streaming, so the stored ones are counted
+    and deleted again on refund.
+    With `max_quizzes`, at most that many are stored, taken from the chunks in turn, and storing fewer is a
+    PARTIAL_SUCCESS.
+    """
+    s3_key, db_pk = job_context.s3_key, job_context.db_pk
+    member_id, star_count = job_context.member_id, job_context.star_count
+    language = job_context.language
+
+    success_at_least_once = False
+    failed_at_least_once = False
 
     timestamp = datetime.now(pytz.timezone('Asia/Seoul'))
 
-    total_quiz_count = 0
+    # 검증된 퀴즈를 먼저 모두 모은 뒤, 한 transaction 안에서 한꺼번에 저장한다.
+    quizzes: list[dict] = []
+    quizzes_by_chunk: dict[int, list[dict]] = {}
+    # chunk가 겹치는 부분에서 거의 같은 퀴즈가 다시 나오므로 먼저 나온 것만 남긴다.
+    deduplicator = QuizDeduplicator()
 
     for i, result in enumerate(results):
         print(f"Chunk {i + 1} result:", result)
 
+        if isinstance(result, InvalidLLMJsonResponseError):
+            discord_client.report_llm_error(
+                task="Question Generation",
+                error_type=LLMErrorType.INVALID_JSON_FORMAT,
+                document_content=chunk_previews[i],
+                llm_response=result.llm_response,
+                error_message="LLM Response is not JSON-decodable",
+                info=f"* s3_key: `{s3_key}`\n* document_id: `{db_pk}`",
+            )
+            failed_at_least_once = True
+            continue
+
+        if isinstance(result, DeadlineExceededError):
+            # LLM 오류가 아니라 시간이 부족했던 것이므로 Discord에 보고하지 않는다.
+            print(f"Chunk {i + 1} was cut off by the job deadline")
+            failed_at_least_once = True
+            continue
+
+        if isinstance(result, Exception):
+            discord_client.report_llm_error(
+                task="Question Generation",
+                error_type=LLMErrorType.GENERAL,
+                document_content=chunk_previews[i],
+                error_message=f"Failed to generate questions\n{type(result).__name__}: {result}",
+                info=f"* s3_key: `{s3_key}`\n* document_id: `{db_pk}`",
+            )
+            failed_at_least_once = True
+            continue
+
         try:
             for q_set in result['quizzes']:
+                # batch 모드 결과는 아직 검증되지 않았으므로 여기서도 확인한다.
+                error = quiz_error(q_set)
+                if error:
+                    print(f"Skipping invalid quiz: {error}")
+                    continue
 
-                if q_set["type"] == "multiple_choice":
-                    question, answer, options, explanation = q_set["question"], q_set["answer"], q_set["options"], q_set["explanation"]
-                    correct_answer_count = 0
-                    delivered_count = 0
-                    
-                    quiz_insert_query = "INSERT INTO quiz (question, answer, explanation, delivered_count, quiz_type, correct_answer_count, is_review_needed, is_latest, document_id, created_at, updated_at) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
-                    
-                    db_manager.execute_query(quiz_insert_query, (question, answer, explanation, delivered_count, QuizType.MULTIPLE_CHOICE.value, correct_answer_count, False, True, db_pk, timestamp, timestamp))
-                    quiz_id = db_manager.last_insert_id()
-
-                    if len(options) == 4:
-                        for option in options:
-                            option_insert_query = "INSERT INTO options (options, quiz_id, created_at, updated_at) VALUES (%s, %s, %s, %s)"
-                            db_manager.execute_query(option_insert_query, (option, quiz_id, timestamp, timestamp))                    
-                    else:
-                        # options가 4개가 아니라면 record에 기록하기
-                        continue
-                    total_quiz_count += 1
-                
-                elif q_set["type"] == "ox":
-                    question, answer, explanation = q_set["question"], q_set["answer"], q_set["explanation"]
-                    correct_answer_count = 0
-                    delivered_count = 0
-                    
-                    question_insert_query = "INSERT INTO quiz (question, answer, explanation, delivered_count, quiz_type, correct_answer_count, is_review_needed, is_latest, document_id, created_at, updated_at) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
-                    db_manager.execute_query(question_insert_query, (question, answer, explanation, delivered_count, QuizType.MIX_UP.value, correct_answer_count, False, True, db_pk, timestamp, timestamp))
-
-                    total_quiz_count += 1
-                
-                else:
-                    print("퀴즈 타입 에러")
+                if not deduplicator.add(quiz_text(q_set)):
                     continue
+                quizzes.append(quiz_from_response(q_set))
+                quizzes_by_chunk.setdefault(i, []).append(quizzes[-1])
 
         except Exception as e:
             discord_client.report_llm_error(
                 task="Question Generation",
                 error_type=LLMErrorType.GENERAL,
-                document_content=content_splits[i],
+                document_content=chunk_previews[i],
                 error_message=f"LLM Response is JSON decodable but does not have 'question' and 'answer' keys.\nresp_dict: {result}",
                 info=f"* s3_key: `{s3_key}`\n* document_id: `{db_pk}`",
             )
@@ -147,14 +347,23 @@ def quiz_generator(
 
         success_at_least_once = True
 
-    db_manager.commit()
+    if max_quizzes is not None and len(quizzes) > max_quizzes:
+        # 한 chunk에 몰리지 않도록 chunk마다 하나씩 돌아가며 고른다.
+        quizzes = [quiz for group in itertools.zip_longest(*quizzes_by_chunk.values()) for quiz in group if quiz is not None][:max_quizzes]
 
+    # streaming 모드에서는 on_quiz에서 이미 검증과 중복 제거를 거쳐 저장된 퀴즈 수를 기준으로 판단한다.
+    total_quiz_count = len(quiz_writer.quiz_ids) if quiz_writer else len(quizzes)
     print(total_quiz_count)
+    current_span().add("quizzes", total_quiz_count)
+    if not quiz_writer:
+        current_span().add("duplicate_quizzes", deduplicator.duplicates)
 
-    # Failed at every single generation
-    if not success_at_least_once or total_quiz_count <= 5:
-        db_manager.rollback()
+    # 목표 수량을 채웠다면 실패한 chunk가 있어도 문서는 완전히 처리된 것이고, 못 채웠다면 일부만 성공한 것이다.
+    if max_quizzes is not None:
+        failed_at_least_once = total_quiz_count < max_quizzes
 
+    # Failed at every single generation
+    if not success_at_least_once or total_quiz_count < min_quizzes:
         description = "퀴즈 생성 실패로 인한 별 반환"
         if language == "en":
             description = "Star return due to quiz generation failure"
@@ -168,6 +377,8 @@ def quiz_generator(
         star_history_update_query = "INSERT INTO star_history (description, change_amount, balance_after, transaction_type, source, star_id, created_at, updated_at) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"
         document_update_query = f"UPDATE document SET quiz_generation_status = 'QUIZ_GENERATION_ERROR', is_public = false WHERE id = {db_pk}"
         
+        if quiz_writer:
+            quiz_writer.discard()
         db_manager.execute_query(star_update_query)
         db_manager.execute_query(star_history_update_query, (description, star_count, cur_star_count + star_count, TransactionType.DEPOSIT.value, Source.SERVICE.value, star_id, timestamp, timestamp))
         db_manager.execute_query(document_update_query)
@@ -176,6 +387,9 @@ def quiz_generator(
         logging.info(f"Quiz: QUIZ_GENERATION_ERROR")
         return
 
+    if not quiz_writer:
+        insert_quizzes(db_manager, quizzes, db_pk, timestamp)
+
     # Failed at least one chunk question generation
     if failed_at_least_once:
         document_status_update_query = f"UPDATE document SET quiz_generation_status = 'PARTIAL_SUCCESS' WHERE id = {db_pk}"
@@ -190,7 +404,48 @@ def quiz_generator(
         db_manager.commit()
         logging.info(f"Quiz: PROCESSED")
 
-    db_manager.close()
-    end_time = time.time()
-    print(f"퀴즈 생성 함수 걸린 시간: {end_time - start_time}")
-    print("End Quiz Generation Worker")
\ No newline at end of file
+
+def quiz_from_response(q_set: dict) -> dict:
+    """Row data for a quiz that passed quiz_error."""
+    is_multiple_choice = q_set["type"] == "multiple_choice"
+    return {
+        "question": q_set["question"],
+        "answer": q_set["answer"],
+        "explanation": q_set["explanation"],
+        "quiz_type": QuizType.MULTIPLE_CHOICE if is_multiple_choice else QuizType.MIX_UP,
+        "options": q_set["options"] if is_multiple_choice else [],
+    }
+
+
+def insert_quizzes(db_manager: DatabaseManager, quizzes: list[dict], db_pk: int, timestamp: datetime, after_id: int = 0) -> list[int]:
+    """Insert quizzes and their options with one multi-row INSERT each (commit is left to the caller).
+
+    `after_id` is the last quiz id already stored for this document by an earlier call of the same job.
+    """
+    if not quizzes:
+        return []
+
+    quiz_insert_query = "INSERT INTO quiz (question, answer, explanation, delivered_count, quiz_type, correct_answer_count, is_review_needed, is_latest, document_id, created_at, updated_at) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+    db_manager.execute_many(quiz_insert_query, [
+        (quiz["question"], quiz["answer"], quiz["explanation"], 0, quiz["quiz_type"].value, 0, False, True, db_pk, timestamp, timestamp)
+        for quiz in quizzes
+    ])
+
+    # 이전 퀴즈는 handler에서 is_latest = false로 바뀌어 있고, auto-increment id는 삽입 순서대로 증가하므로
+    # id 순으로 조회하면 quizzes와 같은 순서가 된다. (innodb_autoinc_lock_mode와 무관)
+    quiz_id_select_query = "SELECT id FROM quiz WHERE document_id = %s AND is_latest = true AND id > %s ORDER BY id"
+    rows = db_manager.execute_query(quiz_id_select_query, (db_pk, after_id))
+    if not rows or len(rows) != len(quizzes):
+        raise RuntimeError(f"Inserted {len(quizzes)} quizzes but found {len(rows or [])} latest quizzes. document_id: {db_pk}")
+    quiz_ids = [row["id"] for row in rows]
+
+    option_rows = [
+        (option, quiz_id, timestamp, timestamp)
+        for quiz, quiz_id in zip(quizzes, quiz_ids)
+        for option in quiz["options"]
+    ]
+    if option_rows:
+        option_insert_query = "INSERT INTO options (options, quiz_id, created_at, updated_at) VALUES (%s, %s, %s, %s)"
+        db_manager.execute_many(option_insert_query, option_rows)
+
+    return quiz_ids
@@ -0,0 +1,24 @@
+from core.llm.openai import ChatMessage
+from core.llm.template import PromptTemplate
+from core.llm.utils import CONTENT_CHUNK_SIZE
+
+
+# fixed chunk 하나(CONTENT_CHUNK_SIZE자)에서 요청하는 퀴즈 수
+QUIZ_COUNT_PER_CHUNK = (4, 5)
+# packed chunk가 아무리 길어도 요청 하나에서 받는 퀴즈는 이 배수까지만 늘린다. (응답이 길수록 늦게 끝난다)
+MAX_QUIZ_COUNT_SCALE = 4
+
+
+def quiz_count_range(chunk: str) -> tuple[int, int]:
+    """How many quizzes to ask for from `chunk`: QUIZ_COUNT_PER_CHUNK for every CONTENT_CHUNK_SIZE characters.
+
+    Fixed chunks get 4-5 quizzes as before. Packed chunks hold several fixed chunks' worth of text and get
+    proportionally more, up to MAX_QUIZ_COUNT_SCALE times.
+    """
+    scale = min(MAX_QUIZ_COUNT_SCALE, max(1, round(len(chunk) / CONTENT_CHUNK_SIZE)))
+    return QUIZ_COUNT_PER_CHUNK[0] * scale, QUIZ_COUNT_PER_CHUNK[1] * scale
+
+
+def render_quiz_prompt(quiz_prompt: PromptTemplate, chunk: str) -> list[ChatMessage]:
+    min_quizzes, max_quizzes = quiz_count_range(chunk)
+    return quiz_prompt.render(note=chunk, min_quizzes=str(min_quizzes), max_quizzes=str(max_quizzes))
@@ -0,0 +1,85 @@
+QUIZ_TYPES = ("ox", "multiple_choice")
+OX_ANSWERS = ("correct", "incorrect")
+MULTIPLE_CHOICE_OPTION_COUNT = 4
+# chunk 하나에서 이보다 적은 퀴즈만 쓸 수 있으면 그 chunk만 다시 요청한다.
+MIN_VALID_QUIZZES_PER_CHUNK = 2
+
+# OpenAI Structured Outputs용 schema. strict mode에서는 모든 field가 required여야 하므로 ox 퀴즈의 options는 빈 배열이다.
+QUIZ_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "quizzes",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "additionalProperties": False,
+            "required": ["quizzes"],
+            "properties": {
+                "quizzes": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "additionalProperties": False,
+                        "required": ["type", "question", "options", "answer", "explanation"],
+                        "properties": {
+                            "type": {"type": "string", "enum": list(QUIZ_TYPES)},
+                            "question": {"type": "string"},
+                            "options": {"type": "array", "items": {"type": "string"}},
+                            "answer": {"type": "string"},
+                            "explanation": {"type": "string"},
+                        },
+                    },
+                },
+            },
+        },
+    },
+}
+
+
+def quiz_error(q_set) -> str | None:
+    """Why a quiz from the LLM cannot be stored, or None if it is valid."""
+    if not isinstance(q_set, dict):
+        return "quiz is not an object"
+    if q_set.get("type") not in QUIZ_TYPES:
+        return f"unknown quiz type: {q_set.get('type')}"
+    for key in ("question", "answer", "explanation"):
+        if not isinstance(q_set.get(key), str) or not q_set[key].strip():
+            return f"'{key}' must be a non-empty string"
+
+    if q_set["type"] == "ox":
+        if q_set["answer"] not in OX_ANSWERS:
+            return f"ox answer must be one of {OX_ANSWERS}"
+        return None
+
+    options = q_set.get("options")
+    if not isinstance(options, list) or len(options) != MULTIPLE_CHOICE_OPTION_COUNT:
+        return f"multiple choice quiz must have {MULTIPLE_CHOICE_OPTION_COUNT} options"
+    if not all(isinstance(option, str) and option.strip() for option in options):
+        return "options must be non-empty strings"
+    if len(set(options)) != len(options):
+        return "options must be distinct"
+    if q_set["answer"] not in options:
+        return "answer must be one of the options"
+    return None
+
+
+def validate_quiz_response(resp_dict: dict) -> tuple[dict, bool]:
+    """Drop invalid quizzes from a chunk response.
+
+    Returns the cleaned response and whether it holds enough valid quizzes to be accepted without a retry.
+    """
+    quizzes = resp_dict.get("quizzes") if isinstance(resp_dict, dict) else None
+    if not isinstance(quizzes, list):
+        return {"quizzes": []}, False
+
+    valid_quizzes = []
+    errors = []
+    for q_set in quizzes:
+        error = quiz_error(q_set)
+        if error:
+            errors.append(error)
+        else:
+            valid_quizzes.append(q_set)
+    if errors:
+        print(f"Dropped {len(errors)} invalid quizzes: {errors}")
+    return {"quizzes": valid_quizzes}, len(valid_quizzes) >= MIN_VALID_QUIZZES_PER_CHUNK
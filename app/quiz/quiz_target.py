@@ -0,0 +1,47 @@
+import math
+
+from constant.constant import FIRST_GENERATION_QUIZ_NUM
+from core.enums.enum import QuizQuestionNum, SubscriptionPlanType
+
+
+PLAN_QUIZ_QUESTION_NUM = {
+    SubscriptionPlanType.FREE: QuizQuestionNum.FREE_PLAN_QUIZ_QUESTION_NUM.value,
+    SubscriptionPlanType.PRO: QuizQuestionNum.PRO_PLAN_QUIZ_QUESTION_NUM.value,
+}
+
+
+def target_quiz_count(body: dict) -> int | None:
+    """How many quizzes the outbox message asks for, or None to generate from every chunk.
+
+    An explicit `quiz_count` wins, then `is_first_generation`, then the member's `subscription_plan`.
+    An unknown plan is treated like no plan.
+    """
+    if body.get("quiz_count"):
+        return int(body["quiz_count"])
+    if body.get("is_first_generation"):
+        return FIRST_GENERATION_QUIZ_NUM
+    if body.get("subscription_plan"):
+        try:
+            return PLAN_QUIZ_QUESTION_NUM[SubscriptionPlanType(body["subscription_plan"])]
+        except (ValueError, KeyError):
+            # 모르는 요금제 때문에 job을 실패시키지 않고 기본 동작(모든 chunk 사용)으로 처리한다.
+            print(f"Unknown subscription_plan: {body['subscription_plan']}, generating from every chunk")
+    return None
+
+
+def spread_order(count: int) -> list[int]:
+    """Chunk indices ordered so that every prefix is spread evenly across the document.
+
+    Uses the base-2 van der Corput sequence: 0, 1/2, 1/4, 3/4, ... scaled to `count`, skipping repeats.
+    """
+    order: list[int] = []
+    seen: set[int] = set()
+    bits = max(1, math.ceil(math.log2(count))) if count > 1 else 1
+    for i in range(2 ** bits):
+        # i의 bit를 뒤집으면 [0, 1) 구간을 점점 촘촘하게 나누는 순서가 된다.
+        position = int(format(i, f"0{bits}b")[::-1], 2) / 2 ** bits
+        index = int(position * count)
+        if index not in seen:
+            seen.add(index)
+            order.append(index)
+    return order
@@ -0,0 +1,44 @@
+"""Compare LLM calls and prompt tokens per document for fixed vs token-budget-packed chunking.
+
+    python -m bench.bench_chunk_packing [--budgets 2000 4000 8000] [--concurrency 8]
+"""
+import argparse
+import math
+
+from bench.corpus import make_corpus
+from core.llm.tokenizer import _get_encoding
+from core.llm.template import get_prompt_template
+from core.llm.utils import content_splitter, estimate_chunking_cost, packed_content_splitter
+
+
+DOCUMENT_SIZES = (5_000, 20_000, 100_000, 500_000)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budgets", type=int, nargs="+", default=[2000, 4000, 8000])
+    parser.add_argument("--concurrency", type=int, default=8, help="used to report request waves per document")
+    args = parser.parse_args()
+
+    print(f"token counter: {'tiktoken' if _get_encoding() is not None else 'estimate'}")
+    print(f"{'doc':>12} {'mode':>12} | {'calls':>6} {'waves':>5} {'prompt tok':>11} {'overhead tok':>12} {'dup tok':>8}")
+    for language in ("en", "ko"):
+        prompt_messages = get_prompt_template("quiz", language).messages
+        for size in DOCUMENT_SIZES:
+            content = make_corpus(language, size)
+            modes = [("fixed", content_splitter(content))]
+            modes += [
+                (f"packed@{budget}", packed_content_splitter(content, prompt_messages=prompt_messages, token_budget=budget))
+                for budget in args.budgets
+            ]
+            for mode, chunks in modes:
+                cost = estimate_chunking_cost(content, prompt_messages, chunks)
+                waves = math.ceil(cost["calls"] / args.concurrency)
+                print(
+                    f"{language + ' ' + str(size):>12} {mode:>12} | {cost['calls']:>6} {waves:>5} {cost['prompt_tokens']:>11} "
+                    f"{cost['prompt_overhead_tokens']:>12} {cost['duplicated_content_tokens']:>8}"
+                )
+
+
+if __name__ == "__main__":
+    main()
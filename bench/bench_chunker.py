@@ -0,0 +1,64 @@
+"""Check chunk parity with LangChain's RecursiveCharacterTextSplitter and time both on large corpora.
+
+Exits 1 on any mismatch. tests/test_chunker.py checks the same parity on smaller and random inputs.
+
+    python -m bench.bench_chunker [--size 2000000]
+"""
+import argparse
+import sys
+import time
+
+from bench.corpus import make_corpus
+from core.llm.tokenizer import estimate_tokens
+from core.llm.utils import CONTENT_CHUNK_OVERLAP, CONTENT_CHUNK_SIZE, CONTENT_SEPARATORS, content_splitter
+
+
+def langchain_content_splitter(content: str) -> list[str]:
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CONTENT_CHUNK_SIZE, chunk_overlap=CONTENT_CHUNK_OVERLAP, separators=CONTENT_SEPARATORS
+    )
+    return splitter.split_text(content)
+
+
+def timed(fn, *args, **kwargs):
+    start_time = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=2_000_000, help="characters per corpus")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    try:
+        import langchain_text_splitters  # noqa: F401
+        has_langchain = True
+    except ImportError:
+        has_langchain = False
+    print(f"langchain_text_splitters import: {time.perf_counter() - start_time:.3f}s (installed: {has_langchain})")
+
+    mismatches = 0
+    for language in ("en", "ko"):
+        for seed in range(3):
+            corpus = make_corpus(language, args.size, seed=seed)
+            native_chunks, native_time = timed(content_splitter, corpus)
+            _, token_time = timed(content_splitter, corpus, length_function=estimate_tokens)
+            line = f"{language} seed={seed} chars={len(corpus)} chunks={len(native_chunks)} native={native_time:.3f}s tokens-mode={token_time:.3f}s"
+
+            if has_langchain:
+                langchain_chunks, langchain_time = timed(langchain_content_splitter, corpus)
+                parity = "OK" if native_chunks == langchain_chunks else "MISMATCH"
+                mismatches += parity == "MISMATCH"
+                line += f" langchain={langchain_time:.3f}s parity={parity}"
+            print(line)
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Run worker.consumer against an in-memory SQS queue and the local fakes, and check that every job finishes.
+
+The consumer's worker processes are spawned, so they install the S3/DB/OpenAI/Discord fakes themselves
+through `install_fakes` (the process initializer) from what the parent left in a temp directory. A short
+visibility timeout makes the consumer extend visibility while jobs run. `--sigterm-after` sends SIGTERM
+mid-run, then starts a second consumer to drain what the first returned to the queue.
+
+    python -m bench.bench_consumer [--documents 24] [--processes 2] [--threads-per-process 4]
+        [--prefetch 10] [--max-in-flight 8] [--visibility-timeout 4] [--sigterm-after 3]
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+
+from bench.bench_end_to_end import seed_documents
+from bench.bench_handler_startup import DUMMY_ENV
+from bench.fakes import FakeDiscordServer, FakeOpenAIServer, FakeS3Client, FakeSQSClient
+from bench.sqlite_database_manager import SQLiteDatabaseManager
+from worker.consumer import SQSConsumer
+
+
+QUEUE_URL = "https://sqs.us-east-1.amazonaws.com/000000000000/bench"
+
+
+def install_fakes():
+    """Process initializer: point the worker process's clients at the fakes the parent started."""
+    bench_dir = os.environ["BENCH_CONSUMER_DIR"]
+    db_latency = float(os.environ["BENCH_DB_LATENCY"])
+    sys.stdout = open(os.devnull, "w")
+    logging.disable(logging.INFO)
+
+    import worker.worker as worker_module
+    from worker.clients import registry
+    from core.discord.discord_client import DiscordClient
+    from core.llm.openai import OpenAIChatLLM
+
+    s3_client = FakeS3Client(latency=float(os.environ["BENCH_S3_LATENCY"]))
+    with open(os.path.join(bench_dir, "objects.json")) as f:
+        for key, content in json.load(f).items():
+            s3_client.upload_bytes_obj(content.encode("utf-8"), key)
+
+    registry.get("s3", lambda: s3_client)
+    registry.get("discord", lambda: DiscordClient(channel_id="0", bot_token="bench", base_url=os.environ["BENCH_DISCORD_URL"]))
+    registry.get("chat_llm", lambda: OpenAIChatLLM(api_key="bench"))
+    worker_module.create_db_manager = lambda: SQLiteDatabaseManager(os.path.join(bench_dir, "bench.sqlite3"), round_trip_latency=db_latency)
+
+
+def run_consumer(sqs_client: FakeSQSClient, args, stop_after: float | None = None) -> tuple[SQSConsumer, float]:
+    consumer = SQSConsumer(
+        sqs_client=sqs_client,
+        queue_url=QUEUE_URL,
+        processes=args.processes,
+        threads_per_process=args.threads_per_process,
+        prefetch=args.prefetch,
+        max_in_flight=args.max_in_flight,
+        visibility_timeout=args.visibility_timeout,
+        wait_time_seconds=1,
+        failure_visibility_timeout=1,
+        shutdown_timeout=args.shutdown_timeout,
+        process_initializer=install_fakes,
+        # 강제 종료한 job의 lease를 풀 때 worker process와 같은 SQLite 파일을 쓴다.
+        db_manager_factory=lambda: SQLiteDatabaseManager(os.path.join(os.environ["BENCH_CONSUMER_DIR"], "bench.sqlite3")),
+    )
+
+    def stop_when_drained():
+        while consumer._stopping.wait(0.2) is False:
+            if not sqs_client.messages:
+                consumer.stop()
+
+    threading.Thread(target=stop_when_drained, daemon=True).start()
+    if stop_after is not None:
+        threading.Timer(stop_after, os.kill, (os.getpid(), signal.SIGTERM)).start()
+
+    start_time = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        consumer.run()
+    return consumer, time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=24)
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--threads-per-process", type=int, default=4)
+    parser.add_argument("--prefetch", type=int, default=10)
+    parser.add_argument("--max-in-flight", type=int, default=None)
+    parser.add_argument("--visibility-timeout", type=int, default=4)
+    parser.add_argument("--shutdown-timeout", type=float, default=25.0)
+    parser.add_argument("--sigterm-after", type=float, default=None, help="send SIGTERM after this many seconds, then drain with a second consumer")
+    parser.add_argument("--llm-latency-ms", type=float, default=500.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=200.0)
+    parser.add_argument("--db-latency-ms", type=float, default=1.0)
+    parser.add_argument("--s3-latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    openai_server = FakeOpenAIServer(latency=args.llm_latency_ms / 1000, latency_jitter=args.llm_jitter_ms / 1000).start()
+    discord_server = FakeDiscordServer().start()
+    sqs_client = FakeSQSClient()
+
+    with tempfile.TemporaryDirectory() as bench_dir:
+        s3_client = FakeS3Client()
+        seed_manager = SQLiteDatabaseManager(os.path.join(bench_dir, "bench.sqlite3"))
+        for record in seed_documents(seed_manager, s3_client, args.documents, args.size):
+            sqs_client.send_message(QueueUrl=QUEUE_URL, MessageBody=record["body"])
+        with open(os.path.join(bench_dir, "objects.json"), "w") as f:
+            json.dump({key: content.decode("utf-8") for key, content in s3_client.objects.items()}, f)
+
+        # spawn된 worker process는 이 환경 변수를 물려받아 install_fakes에서 사용한다.
+        os.environ.update(DUMMY_ENV)
+        os.environ.update({
+            "OPENAI_BASE_URL": openai_server.base_url,
+            "BENCH_CONSUMER_DIR": bench_dir,
+            "BENCH_DISCORD_URL": discord_server.base_url,
+            "BENCH_DB_LATENCY": str(args.db_latency_ms / 1000),
+            "BENCH_S3_LATENCY": str(args.s3_latency_ms / 1000),
+        })
+
+        runs = [run_consumer(sqs_client, args, stop_after=args.sigterm_after)]
+        if args.sigterm_after is not None:
+            print(f"after SIGTERM: {len(sqs_client.messages)} messages left, {sqs_client.visible_count()} visible right away")
+            runs.append(run_consumer(sqs_client, args))
+
+        for i, (consumer, wall_time) in enumerate(runs, start=1):
+            print(f"consumer {i}: {wall_time:.1f}s, succeeded {consumer.succeeded}, failed {consumer.failed}, "
+                  f"{consumer.succeeded / wall_time * 60:.1f} docs/min")
+
+        statuses = seed_manager.execute_query("SELECT quiz_generation_status AS status, COUNT(*) AS count FROM document GROUP BY quiz_generation_status")
+        outbox_left = seed_manager.execute_query("SELECT COUNT(*) AS count FROM outbox")[0]["count"]
+        quizzes = seed_manager.execute_query("SELECT COUNT(*) AS count FROM quiz WHERE is_latest = true")[0]["count"]
+        seed_manager.close()
+
+    print(f"sqs: received {sqs_client.received}, redelivered {sqs_client.redelivered}, deleted {sqs_client.deleted}, "
+          f"visibility changes {sqs_client.visibility_changes}, left {len(sqs_client.messages)}")
+    print(f"db: statuses {({row['status']: row['count'] for row in statuses})}, outbox rows left {outbox_left}, "
+          f"quizzes/doc {quizzes / args.documents:.1f}, llm calls {openai_server.calls}")
+
+    openai_server.stop()
+    discord_server.stop()
+
+
+if __name__ == "__main__":
+    main()
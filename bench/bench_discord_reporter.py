@@ -0,0 +1,95 @@
+"""Report a burst of LLM errors against a local Discord stub and compare time spent in the caller
+with the number of messages that reach Discord.
+
+The stub answers the first POST with 429 and `retry_after`, then 200, and checks every body against
+Discord's message limits.
+
+    python -m bench.bench_discord_reporter [--reports 40] [--latency-ms 150]
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core.discord.discord_client import (
+    DISCORD_CONTENT_LIMIT,
+    DISCORD_EMBED_DESCRIPTION_LIMIT,
+    DISCORD_EMBEDS_TOTAL_LIMIT,
+    DiscordClient,
+)
+from core.enums.enum import LLMErrorType
+
+
+class DiscordStub(BaseHTTPRequestHandler):
+    latency = 0.0
+    messages: list[dict] = []
+    rate_limited = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.latency)
+        with self.lock:
+            if not DiscordStub.rate_limited:
+                DiscordStub.rate_limited += 1
+                self._respond(429, {"message": "You are being rate limited.", "retry_after": 0.2, "global": False})
+                return
+            DiscordStub.messages.append(body)
+        check_limits(body)
+        self._respond(200, {"id": str(len(DiscordStub.messages))})
+
+    def _respond(self, status: int, payload: dict):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def check_limits(body: dict):
+    assert len(body["content"]) <= DISCORD_CONTENT_LIMIT, len(body["content"])
+    assert all(len(embed["description"]) <= DISCORD_EMBED_DESCRIPTION_LIMIT for embed in body["embeds"])
+    assert sum(len(embed["title"]) + len(embed["description"]) for embed in body["embeds"]) <= DISCORD_EMBEDS_TOTAL_LIMIT
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reports", type=int, default=40)
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    args = parser.parse_args()
+
+    DiscordStub.latency = args.latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), DiscordStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    client = DiscordClient(channel_id="1", bot_token="token", base_url=f"http://127.0.0.1:{server.server_port}", coalesce_window=1.0)
+
+    start_time = time.perf_counter()
+    for i in range(args.reports):
+        client.report_llm_error(
+            task="Question Generation",
+            error_type=LLMErrorType.INVALID_JSON_FORMAT if i % 2 else LLMErrorType.GENERAL,
+            document_content="본문 " * 5000,
+            llm_response="{" * 10000,
+            error_message="Failed to generate questions\nAPITimeoutError: Request timed out.",
+            info=f"* s3_key: `doc-{i % 4}`\n* document_id: `{i % 4}`",
+        )
+    enqueue_time = time.perf_counter() - start_time
+
+    flushed = client.flush()
+    total_time = time.perf_counter() - start_time
+    server.shutdown()
+
+    print(f"reports: {args.reports}, time in caller: {enqueue_time * 1000:.2f}ms "
+          f"(inline posting: ~{args.reports * args.latency_ms:.0f}ms)")
+    print(f"flushed: {flushed} in {total_time * 1000:.0f}ms, 429 responses: {DiscordStub.rate_limited}, "
+          f"messages delivered: {len(DiscordStub.messages)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Compare document data (emoji, title, category) generation from the whole note with the compact digest.
+
+For each language and note size it reports the prompt tokens of the document data call in both modes,
+what share of the document's total prompt tokens (quiz chunks included) that call is, how long the digest
+takes to build, and the call's wall-clock time against the fake OpenAI server, whose latency grows with
+the prompt and which rejects prompts over the context window like the real API.
+
+    python -m bench.bench_document_digest [--sizes 5000,50000,300000] [--prefill-ms-per-1k 15] [--context-window 128000]
+"""
+import argparse
+import os
+import time
+
+from bench.bench_handler_startup import DUMMY_ENV
+from bench.corpus import make_corpus
+from bench.fakes import FakeOpenAIServer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="5000,50000,300000")
+    parser.add_argument("--llm-latency-ms", type=float, default=400.0)
+    parser.add_argument("--prefill-ms-per-1k", type=float, default=15.0, help="extra latency per 1k prompt tokens")
+    parser.add_argument("--context-window", type=int, default=128_000)
+    args = parser.parse_args()
+
+    openai_server = FakeOpenAIServer(
+        latency=args.llm_latency_ms / 1000,
+        latency_jitter=0.0,
+        latency_per_1k_prompt_tokens=args.prefill_ms_per_1k / 1000,
+        context_window=args.context_window,
+    ).start()
+    os.environ.update(DUMMY_ENV)
+    os.environ["OPENAI_BASE_URL"] = openai_server.base_url
+
+    from app.document.document_digest import build_digest
+    from app.quiz.quiz_prompt import render_quiz_prompt
+    from core.llm.openai import OpenAIChatLLM
+    from core.llm.template import get_prompt_template
+    from core.llm.tokenizer import estimate_message_tokens
+    from core.llm.utils import content_splitter
+
+    chat_llm = OpenAIChatLLM(api_key="bench", max_retries=0)
+
+    print(f"{'lang':>4} {'size':>7} {'mode':>6} {'tokens':>7} {'% of doc':>8} {'build ms':>8} {'call s':>7}  result")
+    for language in ("en", "ko"):
+        document_prompt = get_prompt_template("document_data", language)
+        quiz_prompt = get_prompt_template("quiz", language)
+        for size in (int(size) for size in args.sizes.split(",")):
+            content = make_corpus(language, size, seed=size)
+            quiz_tokens = sum(estimate_message_tokens(render_quiz_prompt(quiz_prompt, split)) for split in content_splitter(content))
+
+            for mode in ("full", "digest"):
+                start_time = time.perf_counter()
+                note = build_digest(content) if mode == "digest" else content
+                build_time = time.perf_counter() - start_time
+
+                messages = document_prompt.render(note=note)
+                tokens = estimate_message_tokens(messages)
+                start_time = time.perf_counter()
+                try:
+                    chat_llm.predict_json(messages)
+                    result = "ok"
+                except Exception as e:
+                    result = type(e).__name__
+                call_time = time.perf_counter() - start_time
+
+                print(f"{language:>4} {size:>7} {mode:>6} {tokens:>7} {tokens / (tokens + quiz_tokens) * 100:>7.1f}% "
+                      f"{build_time * 1000:>8.1f} {call_time:>7.2f}  {result}", flush=True)
+
+    chat_llm.close()
+    openai_server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Drive worker.worker.handler end-to-end against local fakes and report throughput and latency.
+
+S3 is in memory, MySQL is a shared SQLite file (with simulated round-trip latency), and OpenAI and
+Discord are local HTTP servers (see bench/fakes.py). Every combination of document size and worker
+concurrency processes one SQS batch of `--documents` records.
+
+    python -m bench.bench_end_to_end [--sizes 5000,50000,300000] [--concurrency 1,4,8] [--documents 8]
+        [--llm-latency-ms 500] [--error-rate 0.02] [--invalid-json-rate 0.02] [--db-latency-ms 1]
+        [--slow-rate 0.03 --slow-latency-ms 8000] [--no-hedge] [--lambda-timeout-s 60] [--quiz-count 10]
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import logging
+import os
+import tempfile
+import time
+
+from bench.bench_handler_startup import DUMMY_ENV
+from bench.corpus import make_corpus
+from bench.fakes import FakeDiscordServer, FakeLambdaContext, FakeOpenAIServer, FakeS3Client
+from bench.sqlite_database_manager import SQLiteDatabaseManager
+
+
+def seed_documents(db_manager: SQLiteDatabaseManager, s3_client: FakeS3Client, count: int, size: int, quiz_count: int | None = None) -> list[dict]:
+    records = []
+    for db_pk in range(1, count + 1):
+        language = "ko" if db_pk % 2 == 0 else "en"
+        s3_key = f"bench/{size}/{db_pk}.txt"
+        s3_client.upload_bytes_obj(make_corpus(language, size, seed=db_pk).encode("utf-8"), s3_key)
+
+        db_manager.execute_query("INSERT INTO document (id, language) VALUES (%s, %s)", (db_pk, language))
+        db_manager.execute_query("INSERT INTO outbox (document_id, status) VALUES (%s, 'WAITING')", (db_pk,))
+        db_manager.execute_query("INSERT INTO star (member_id, star) VALUES (%s, 100)", (db_pk,))
+
+        body = {"s3_key": s3_key, "db_pk": db_pk, "star_count": 5, "member_id": db_pk}
+        if quiz_count:
+            body["quiz_count"] = quiz_count
+        records.append({"messageId": f"bench-{db_pk}", "body": json.dumps(body)})
+    db_manager.commit()
+    return records
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def run_batch(
+    worker_module, s3_client, openai_server, discord_server, size: int, concurrency: int, documents: int, db_latency: float,
+    duplicates: bool = False, lambda_timeout: float | None = None, quiz_count: int | None = None,
+) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench.sqlite3")
+        # next()가 지금까지 호출된 횟수를 돌려주므로 thread 간 lock 없이 round-trip을 센다.
+        round_trips = itertools.count()
+
+        def create_db_manager():
+            return SQLiteDatabaseManager(db_path, round_trip_latency=db_latency, on_round_trip=lambda: next(round_trips))
+
+        seed_manager = SQLiteDatabaseManager(db_path)
+        records = seed_documents(seed_manager, s3_client, documents, size, quiz_count)
+        if duplicates:
+            # SQS at-least-once 전달로 같은 메시지가 두 번 오는 경우
+            records += [{**record, "messageId": record["messageId"] + "-dup"} for record in records]
+
+        job_latencies: list[float] = []
+        process_record = worker_module.process_record
+
+        def timed_process_record(record, context):
+            start_time = time.perf_counter()
+            try:
+                return process_record(record, context)
+            finally:
+                job_latencies.append(time.perf_counter() - start_time)
+
+        worker_module.create_db_manager = create_db_manager
+        worker_module.WORKER_CONCURRENCY = concurrency
+        worker_module.process_record = timed_process_record
+        openai_server.reset_counters()
+        discord_messages = len(discord_server.messages)
+
+        try:
+            start_time = time.perf_counter()
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                context = FakeLambdaContext(lambda_timeout) if lambda_timeout else None
+                result = worker_module.handler({"Records": records}, context)
+            wall_time = time.perf_counter() - start_time
+        finally:
+            worker_module.process_record = process_record
+
+        stored = seed_manager.execute_query("SELECT COUNT(*) AS count FROM quiz WHERE is_latest = true")[0]["count"]
+        statuses = seed_manager.execute_query("SELECT quiz_generation_status AS status, COUNT(*) AS count FROM document GROUP BY quiz_generation_status")
+        seed_manager.close()
+
+    return {
+        "size": size,
+        "concurrency": concurrency,
+        "docs_per_min": documents / wall_time * 60,
+        "p50": percentile(job_latencies, 0.5),
+        "p95": percentile(job_latencies, 0.95),
+        "p99": percentile(job_latencies, 0.99),
+        "db_round_trips": next(round_trips) / documents,
+        "llm_calls": openai_server.calls / documents,
+        "llm_failures": openai_server.failures / documents,
+        "quizzes": stored / documents,
+        "failed_records": len(result["batchItemFailures"]),
+        "discord_messages": len(discord_server.messages) - discord_messages,
+        "statuses": {row["status"]: row["count"] for row in statuses},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="5000,50000,300000")
+    parser.add_argument("--concurrency", default="1,4,8")
+    parser.add_argument("--documents", type=int, default=8)
+    parser.add_argument("--llm-latency-ms", type=float, default=500.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=200.0)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--invalid-json-rate", type=float, default=0.02)
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of LLM requests that take --slow-latency-ms")
+    parser.add_argument("--slow-latency-ms", type=float, default=8000.0)
+    parser.add_argument("--hedge", action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument("--quiz-count", type=int, default=None, help="ask for this many quizzes per document (target-driven mode)")
+    parser.add_argument("--lambda-timeout-s", type=float, default=None, help="pass a Lambda context that times out after this many seconds")
+    parser.add_argument("--db-latency-ms", type=float, default=1.0)
+    parser.add_argument("--s3-latency-ms", type=float, default=20.0)
+    parser.add_argument("--duplicates", action="store_true", help="deliver every record twice in the same batch")
+    args = parser.parse_args()
+
+    openai_server = FakeOpenAIServer(
+        latency=args.llm_latency_ms / 1000,
+        latency_jitter=args.llm_jitter_ms / 1000,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        invalid_json_rate=args.invalid_json_rate,
+        slow_rate=args.slow_rate,
+        slow_latency=args.slow_latency_ms / 1000,
+    ).start()
+    discord_server = FakeDiscordServer().start()
+    s3_client = FakeS3Client(latency=args.s3_latency_ms / 1000)
+
+    # client는 worker.clients의 registry에 먼저 넣어두어 handler가 그대로 가져다 쓰게 한다.
+    os.environ.update(DUMMY_ENV)
+    os.environ["OPENAI_BASE_URL"] = openai_server.base_url
+    import worker.worker as worker_module
+    from worker.clients import registry
+    from core.discord.discord_client import DiscordClient
+    from core.llm.openai import OpenAIChatLLM
+
+    # worker 모듈들이 INFO로 남기는 로그(httpx 요청 포함)가 결과 표를 가리지 않게 한다.
+    logging.disable(logging.INFO)
+
+    registry.get("s3", lambda: s3_client)
+    registry.get("discord", lambda: DiscordClient(channel_id="0", bot_token="bench", base_url=discord_server.base_url))
+    registry.get("chat_llm", lambda: OpenAIChatLLM(api_key="bench", hedge_requests=args.hedge))
+
+    print(f"{'size':>8} {'conc':>4} {'docs/min':>9} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'db rt/doc':>9} {'llm/doc':>8} "
+          f"{'fail/doc':>8} {'quiz/doc':>8} {'failed':>6} {'discord':>7}  statuses")
+    for size in (int(size) for size in args.sizes.split(",")):
+        for concurrency in (int(concurrency) for concurrency in args.concurrency.split(",")):
+            row = run_batch(
+                worker_module, s3_client, openai_server, discord_server, size, concurrency, args.documents, args.db_latency_ms / 1000,
+                args.duplicates, args.lambda_timeout_s, args.quiz_count,
+            )
+            print(f"{row['size']:>8} {row['concurrency']:>4} {row['docs_per_min']:>9.1f} {row['p50']:>7.2f} {row['p95']:>7.2f} {row['p99']:>7.2f} "
+                  f"{row['db_round_trips']:>9.1f} {row['llm_calls']:>8.1f} {row['llm_failures']:>8.2f} {row['quizzes']:>8.1f} "
+                  f"{row['failed_records']:>6} {row['discord_messages']:>7}  {row['statuses']}", flush=True)
+
+    registry.close()
+    openai_server.stop()
+    discord_server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Report cold-start vs warm-path time of worker.worker.handler, excluding S3/LLM work.
+
+Each run starts a fresh interpreter so the cold path includes module imports and client construction.
+
+    python -m bench.bench_handler_startup [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+DUMMY_ENV = {
+    "PICKTOSS_AWS_ACCESS_KEY": "bench",
+    "PICKTOSS_AWS_SECRET_KEY": "bench",
+    "PICKTOSS_S3_BUCKET_NAME": "bench",
+    "PICKTOSS_DISCORD_BOT_TOKEN": "bench",
+    "PICKTOSS_DISCORD_CHANNEL_ID": "0",
+    "PICKTOSS_OPENAI_API_KEY": "bench",
+    "PICKTOSS_DB_HOST": "localhost",
+    "PICKTOSS_DB_USER": "bench",
+    "PICKTOSS_DB_PASSWORD": "bench",
+    "PICKTOSS_DB_NAME": "bench",
+}
+
+
+def measure_once() -> dict:
+    # 빈 outbox에 대한 메시지를 보내 client 준비 비용만 측정한다.
+    start_time = time.perf_counter()
+    import worker.worker as worker_module
+    import_time = time.perf_counter() - start_time
+
+    from bench.sqlite_database_manager import SQLiteDatabaseManager
+    worker_module.create_db_manager = SQLiteDatabaseManager
+
+    event = {"Records": [{"messageId": "bench", "body": json.dumps({"s3_key": "bench", "db_pk": 1, "star_count": 0, "member_id": 1})}]}
+
+    start_time = time.perf_counter()
+    worker_module.handler(event, None)
+    cold_handler_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    worker_module.handler(event, None)
+    warm_handler_time = time.perf_counter() - start_time
+
+    return {"import": import_time, "cold_handler": cold_handler_time, "warm_handler": warm_handler_time}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.stdout = open(os.devnull, "w")
+        result = measure_once()
+        sys.stdout = sys.__stdout__
+        print(json.dumps(result))
+        return
+
+    env = {**os.environ, **DUMMY_ENV}
+    samples = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-m", "bench.bench_handler_startup", "--child"],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    for name in ("import", "cold_handler", "warm_handler"):
+        values = [sample[name] * 1000 for sample in samples]
+        print(f"{name:>13}: median {statistics.median(values):8.2f}ms  min {min(values):8.2f}ms  max {max(values):8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
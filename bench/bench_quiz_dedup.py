@@ -0,0 +1,116 @@
+"""Measure quiz near-duplicate removal (app.quiz.quiz_dedup) against all-pairs exact Jaccard.
+
+Quizzes are built from shared question stems (as real ones are, e.g. "다음 중 ... 옳은 것은?") filled with
+random topic words, in Korean and English. A share of them is repeated with small edits (particles,
+articles, word order, endings), the way overlapping chunks repeat a question, so every quiz has a known group.
+
+    python -m bench.bench_quiz_dedup [--quizzes 3000] [--duplicate-rate 0.3] [--thresholds 0.5,0.6,0.7,0.8]
+"""
+import argparse
+import random
+import time
+
+from app.quiz.quiz_dedup import QuizDeduplicator, jaccard, quiz_text, shingle_set
+from bench.corpus import EN_WORDS, KO_WORDS
+
+
+EN_STEMS = [
+    "Which of the following best describes {0} {1} in {2}?",
+    "What is the main purpose of {0} when using {1} {2}?",
+    "{0} {1} always improves {2} {3}.",
+    "Which statement about {0} and {1} is correct?",
+]
+KO_STEMS = [
+    "다음 중 {0} {1}에 대한 설명으로 옳은 것은?",
+    "{0}에서 {1} {2}의 주된 목적은 무엇인가?",
+    "{0} {1}는 항상 {2} {3}을 개선한다.",
+    "{0}와 {1}에 관한 설명 중 맞는 것은?",
+]
+EN_EDITS = [("Which", "What"), (" the ", " "), ("best ", ""), ("?", " exactly?"), (" is ", " was ")]
+KO_EDITS = [("옳은", "맞는"), ("것은?", "것은 무엇인가요?"), ("에 대한", "에 관한"), ("는 ", "은 "), ("다음 중 ", "")]
+
+
+def make_quizzes(count: int, duplicate_rate: float, seed: int = 0) -> list[tuple[dict, int]]:
+    """(quiz, group) pairs; quizzes of the same group are near-duplicates of each other."""
+    rng = random.Random(seed)
+    quizzes: list[tuple[dict, int]] = []
+    while len(quizzes) < count:
+        group = len(quizzes)
+        if quizzes and rng.random() < duplicate_rate:
+            # 앞쪽 chunk에서 나온 퀴즈를 조금 바꿔서 다시 만든다.
+            original, group = quizzes[rng.randrange(max(0, len(quizzes) - 20), len(quizzes))]
+            language = "ko" if any("가" <= char <= "힣" for char in original["question"]) else "en"
+            question = original["question"]
+            for old, new in rng.sample(KO_EDITS if language == "ko" else EN_EDITS, k=2):
+                question = question.replace(old, new, 1)
+            quizzes.append(({"question": question, "answer": original["answer"]}, group))
+            continue
+
+        language = rng.choice(["ko", "en"])
+        words = KO_WORDS if language == "ko" else EN_WORDS
+        stem = rng.choice(KO_STEMS if language == "ko" else EN_STEMS)
+        # 빈칸마다 두세 단어짜리 구절을 넣어 같은 stem이라도 주제가 다른 퀴즈가 되게 한다.
+        question = stem.format(*(" ".join(rng.sample(words, rng.randint(2, 3))) for _ in range(4)))
+        quizzes.append(({"question": question, "answer": " ".join(rng.sample(words, rng.randint(2, 4)))}, group))
+    return quizzes
+
+
+def dedupe_all_pairs(texts: list[str], threshold: float) -> list[bool]:
+    kept: list[frozenset[str]] = []
+    keep_flags = []
+    for text in texts:
+        shingles = shingle_set(text)
+        keep = all(jaccard(shingles, other) < threshold for other in kept)
+        if keep:
+            kept.append(shingles)
+        keep_flags.append(keep)
+    return keep_flags
+
+
+def score(groups: list[int], keep_flags: list[bool]) -> tuple[float, float]:
+    """Precision and recall of the removed quizzes against the known groups."""
+    seen: set[int] = set()
+    true_duplicates = removed = correctly_removed = 0
+    for group, keep in zip(groups, keep_flags):
+        is_duplicate = group in seen
+        seen.add(group)
+        true_duplicates += is_duplicate
+        if not keep:
+            removed += 1
+            correctly_removed += is_duplicate
+    precision = correctly_removed / removed if removed else 1.0
+    recall = correctly_removed / true_duplicates if true_duplicates else 1.0
+    return precision, recall
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--quizzes", type=int, default=3000)
+    parser.add_argument("--duplicate-rate", type=float, default=0.3)
+    parser.add_argument("--thresholds", default="0.5,0.6,0.7,0.8")
+    args = parser.parse_args()
+
+    pairs = make_quizzes(args.quizzes, args.duplicate_rate)
+    texts = [quiz_text(quiz) for quiz, _ in pairs]
+    groups = [group for _, group in pairs]
+    print(f"{len(texts)} quizzes in {len(set(groups))} groups")
+
+    print(f"{'threshold':>9} {'method':>9} {'ms total':>9} {'µs/quiz':>8} {'removed':>8} {'precision':>9} {'recall':>7}")
+    for threshold in (float(value) for value in args.thresholds.split(",")):
+        start_time = time.perf_counter()
+        deduplicator = QuizDeduplicator(threshold)
+        keep_flags = [deduplicator.add(text) for text in texts]
+        minhash_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        exact_flags = dedupe_all_pairs(texts, threshold)
+        exact_time = time.perf_counter() - start_time
+
+        for method, flags, elapsed in (("minhash", keep_flags, minhash_time), ("all-pairs", exact_flags, exact_time)):
+            precision, recall = score(groups, flags)
+            print(f"{threshold:>9.2f} {method:>9} {elapsed * 1000:>9.1f} {elapsed / len(texts) * 1e6:>8.1f} "
+                  f"{flags.count(False):>8} {precision:>9.3f} {recall:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
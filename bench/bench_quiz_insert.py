@@ -0,0 +1,60 @@
+"""Compare per-row quiz/options inserts with the batched persistence stage of quiz_generator.
+
+    python -m bench.bench_quiz_insert [--latency-ms 1.0]
+"""
+import argparse
+import time
+from datetime import datetime
+
+from app.quiz.quiz_generator import insert_quizzes
+from bench.sqlite_database_manager import SQLiteDatabaseManager
+from core.enums.enum import QuizType
+
+
+def make_quizzes(count: int) -> list[dict]:
+    quizzes = []
+    for i in range(count):
+        if i % 2 == 0:
+            quizzes.append({"question": f"question {i}", "answer": "A", "explanation": "...", "quiz_type": QuizType.MULTIPLE_CHOICE, "options": ["A", "B", "C", "D"]})
+        else:
+            quizzes.append({"question": f"question {i}", "answer": "correct", "explanation": "...", "quiz_type": QuizType.MIX_UP, "options": []})
+    return quizzes
+
+
+def insert_quizzes_row_by_row(db_manager, quizzes: list[dict], db_pk: int, timestamp: datetime):
+    # 이전 quiz_generator의 저장 방식
+    for quiz in quizzes:
+        quiz_insert_query = "INSERT INTO quiz (question, answer, explanation, delivered_count, quiz_type, correct_answer_count, is_review_needed, is_latest, document_id, created_at, updated_at) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+        db_manager.execute_query(quiz_insert_query, (quiz["question"], quiz["answer"], quiz["explanation"], 0, quiz["quiz_type"].value, 0, False, True, db_pk, timestamp, timestamp))
+        quiz_id = db_manager.last_insert_id()
+        for option in quiz["options"]:
+            option_insert_query = "INSERT INTO options (options, quiz_id, created_at, updated_at) VALUES (%s, %s, %s, %s)"
+            db_manager.execute_query(option_insert_query, (option, quiz_id, timestamp, timestamp))
+
+
+def run(insert_fn, quiz_count: int, latency: float) -> tuple[int, float]:
+    db_manager = SQLiteDatabaseManager(round_trip_latency=latency)
+    db_manager.connect()
+    start_time = time.perf_counter()
+    insert_fn(db_manager, make_quizzes(quiz_count), 1, datetime.now())
+    db_manager.commit()
+    elapsed = time.perf_counter() - start_time
+    db_manager.close()
+    return db_manager.round_trips, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="simulated DB round-trip latency")
+    args = parser.parse_args()
+    latency = args.latency_ms / 1000
+
+    print(f"{'quizzes':>8} | {'row-by-row trips':>16} {'time':>8} | {'batched trips':>13} {'time':>8}")
+    for quiz_count in (10, 40, 100, 400):
+        row_trips, row_time = run(insert_quizzes_row_by_row, quiz_count, latency)
+        batch_trips, batch_time = run(insert_quizzes, quiz_count, latency)
+        print(f"{quiz_count:>8} | {row_trips:>16} {row_time:>7.3f}s | {batch_trips:>13} {batch_time:>7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
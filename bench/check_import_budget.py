@@ -0,0 +1,51 @@
+"""Fail (exit 1) if importing the Lambda entry point gets slower than a budget or pulls in heavy modules.
+
+SDKs are imported by the code paths that use them, so `import worker.worker` must not load any of
+HEAVY_MODULES. Import time is the median of several fresh interpreters, read from `-X importtime`.
+
+    python -m bench.check_import_budget [--budget-ms 250] [--runs 5] [--module worker.worker]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+
+HEAVY_MODULES = ("openai", "boto3", "botocore", "fastapi", "langchain", "langchain_text_splitters", "pymysql", "requests", "tiktoken")
+IMPORT_BUDGET_MS = 250.0
+
+
+def measure_import_ms(module: str) -> float:
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000
+    raise RuntimeError(f"{module} not found in -X importtime output")
+
+
+def loaded_heavy_modules(module: str) -> list[str]:
+    code = f"import json, sys, {module}; print(json.dumps(sorted({{name.split('.')[0] for name in sys.modules}} & set({list(HEAVY_MODULES)!r}))))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="worker.worker")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    import_ms = statistics.median(measure_import_ms(args.module) for _ in range(args.runs))
+    heavy = loaded_heavy_modules(args.module)
+
+    print(f"import {args.module}: {import_ms:.1f}ms (budget {args.budget_ms:.0f}ms), heavy modules loaded: {heavy or 'none'}")
+    if import_ms > args.budget_ms or heavy:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
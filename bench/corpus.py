@@ -0,0 +1,35 @@
+import random
+
+
+EN_WORDS = (
+    "the of and to in is was for on that with as by at from this which are be it an or have not were "
+    "quiz document memory process network protocol algorithm database transaction index cache latency "
+    "throughput function variable object class inheritance polymorphism recursion iteration"
+).split()
+KO_WORDS = (
+    "그리고 하지만 따라서 데이터 베이스 트랜잭션 인덱스 캐시 지연 시간 처리량 함수 변수 객체 클래스 상속 "
+    "다형성 재귀 반복 운영체제 프로세스 스레드 메모리 네트워크 프로토콜 알고리즘 자료구조 정렬 탐색 문서 퀴즈 "
+    "학습 복습 개념 정리 예시 설명 중요한 내용은 다음과 같다 이다 한다 있다 없다 된다"
+).split()
+
+
+def make_corpus(language: str, size: int, seed: int = 0) -> str:
+    """Note-like text with headers, paragraphs, bullet lists and the odd separator-free run."""
+    rng = random.Random(seed)
+    words = KO_WORDS if language == "ko" else EN_WORDS
+    parts: list[str] = []
+    length = 0
+    while length < size:
+        roll = rng.random()
+        if roll < 0.05:
+            block = "# " + " ".join(rng.choices(words, k=rng.randint(2, 6)))
+        elif roll < 0.25:
+            block = "\n".join("- " + " ".join(rng.choices(words, k=rng.randint(3, 12))) for _ in range(rng.randint(2, 8)))
+        elif roll < 0.27:
+            block = "".join(rng.choices(words, k=rng.randint(100, 400)))
+        else:
+            sentences = [" ".join(rng.choices(words, k=rng.randint(5, 25))) + "." for _ in range(rng.randint(1, 12))]
+            block = " ".join(sentences)
+        parts.append(block)
+        length += len(block) + 2
+    return "\n\n".join(parts)[:size]
@@ -0,0 +1,496 @@
+"""In-process stand-ins for S3, SQS, OpenAI and Discord used by the end-to-end benchmarks and tests.
+
+OpenAI and Discord are real local HTTP servers, so the SDK, connection reuse, retries and rate-limit
+handling run exactly as in production. S3 is an in-memory object store behind the S3Client interface,
+and SQS an in-memory queue behind the subset of the boto3 SQS client that worker.consumer uses.
+"""
+import email
+import email.policy
+import io
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core.llm.tokenizer import estimate_tokens
+from core.s3.s3_client import BucketObject, StreamingBucketObject
+
+
+_QUIZ_COUNT_PATTERN = re.compile(r"(\d+)(?: and |~)(\d+)")
+
+
+class FakeStreamingBody(io.BytesIO):
+    """The subset of botocore's StreamingBody that S3Client and StreamingBucketObject use."""
+
+    def iter_chunks(self, chunk_size: int = 1024):
+        while True:
+            chunk = self.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+class FakeS3Client:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.objects: dict[str, bytes] = {}
+        self.get_count = 0
+
+    def upload_bytes_obj(self, obj_bytes: bytes, key: str, metadata: dict[str, str] | None = None) -> None:
+        self.objects[key] = obj_bytes
+
+    def get_object(self, key: str) -> BucketObject:
+        return self.open_object(key).read()
+
+    def open_object(self, key: str) -> StreamingBucketObject:
+        self.get_count += 1
+        time.sleep(self.latency)
+        content = self.objects[key]
+        return StreamingBucketObject(body=FakeStreamingBody(content), content_length=len(content), metadata={})
+
+
+@dataclass
+class FakeSQSMessage:
+    message_id: str
+    body: str
+    visible_at: float = 0.0
+    receipt_handle: str = ""
+    receive_count: int = 0
+
+
+class FakeSQSClient:
+    """In-memory standard queue with visibility timeouts, long polling and receipt handles.
+
+    A receipt handle is only valid until the message is received again, like a real queue.
+    """
+
+    def __init__(self, default_visibility_timeout: int = 30):
+        self.default_visibility_timeout = default_visibility_timeout
+        self.messages: dict[str, FakeSQSMessage] = {}
+        self.received = 0
+        self.redelivered = 0
+        self.deleted = 0
+        self.visibility_changes = 0
+        self._condition = threading.Condition()
+
+    def send_message(self, QueueUrl: str, MessageBody: str, **kwargs) -> dict:
+        message = FakeSQSMessage(message_id=uuid.uuid4().hex, body=MessageBody)
+        with self._condition:
+            self.messages[message.message_id] = message
+            self._condition.notify_all()
+        return {"MessageId": message.message_id}
+
+    def receive_message(self, QueueUrl: str, MaxNumberOfMessages: int = 1, WaitTimeSeconds: int = 0, VisibilityTimeout: int | None = None, **kwargs) -> dict:
+        visibility_timeout = self.default_visibility_timeout if VisibilityTimeout is None else VisibilityTimeout
+        deadline = time.monotonic() + WaitTimeSeconds
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                visible = [message for message in self.messages.values() if message.visible_at <= now][:MaxNumberOfMessages]
+                if visible or now >= deadline:
+                    break
+                next_visible = min((message.visible_at for message in self.messages.values()), default=deadline)
+                self._condition.wait(timeout=max(0.01, min(deadline, next_visible) - now))
+
+            for message in visible:
+                message.visible_at = now + visibility_timeout
+                message.receipt_handle = uuid.uuid4().hex
+                message.receive_count += 1
+                self.received += 1
+                self.redelivered += message.receive_count > 1
+        return {"Messages": [{"MessageId": message.message_id, "ReceiptHandle": message.receipt_handle, "Body": message.body} for message in visible]}
+
+    def delete_message_batch(self, QueueUrl: str, Entries: list[dict]) -> dict:
+        return self._batch(Entries, self._delete)
+
+    def change_message_visibility_batch(self, QueueUrl: str, Entries: list[dict]) -> dict:
+        return self._batch(Entries, self._change_visibility)
+
+    def visible_count(self) -> int:
+        now = time.monotonic()
+        with self._condition:
+            return sum(message.visible_at <= now for message in self.messages.values())
+
+    def _batch(self, entries: list[dict], apply) -> dict:
+        successful, failed = [], []
+        with self._condition:
+            for entry in entries:
+                message = next((message for message in self.messages.values() if message.receipt_handle == entry["ReceiptHandle"]), None)
+                if message is None:
+                    failed.append({"Id": entry["Id"], "Code": "ReceiptHandleIsInvalid", "Message": "The receipt handle is not valid", "SenderFault": True})
+                    continue
+                apply(message, entry)
+                successful.append({"Id": entry["Id"]})
+            self._condition.notify_all()
+        return {"Successful": successful, "Failed": failed}
+
+    def _delete(self, message: FakeSQSMessage, entry: dict):
+        del self.messages[message.message_id]
+        self.deleted += 1
+
+    def _change_visibility(self, message: FakeSQSMessage, entry: dict):
+        message.visible_at = time.monotonic() + entry["VisibilityTimeout"]
+        self.visibility_changes += 1
+
+
+class FakeLambdaContext:
+    """The part of the Lambda context object the worker reads: the time left before the function times out."""
+
+    def __init__(self, timeout_seconds: float):
+        self.deadline = time.monotonic() + timeout_seconds
+
+    def get_remaining_time_in_millis(self) -> int:
+        return int(max(0.0, self.deadline - time.monotonic()) * 1000)
+
+
+def canned_quizzes(chunk: str, count: int = 5) -> dict:
+    """A valid quiz answer for one chunk: multiple choice and OX alternating, each about a different part of the chunk."""
+    words = chunk.split() or ["note"]
+    quizzes = []
+    for i in range(count):
+        # 퀴즈마다 chunk의 다른 구간을 주제로 삼아서, 짧은 chunk가 아니면 서로 중복으로 걸러지지 않게 한다.
+        start = i * len(words) // count
+        topic = " ".join(words[start:start + 6])
+        if i % 2 == 0:
+            quizzes.append({
+                "type": "multiple_choice",
+                "question": f"Which statement about '{topic}' is true? ({i})",
+                "options": [f"option {i}-{j}" for j in range(4)],
+                "answer": f"option {i}-0",
+                "explanation": "Based on the note.",
+            })
+        else:
+            quizzes.append({
+                "type": "ox",
+                "question": f"'{topic}' is discussed in the note. ({i})",
+                "options": [],
+                "answer": "correct",
+                "explanation": "Based on the note.",
+            })
+    return {"quizzes": quizzes}
+
+
+class FakeOpenAIServer:
+    """Local server for POST /v1/chat/completions with configurable latency and failure rates.
+
+    Quiz prompts (json_schema "quizzes") get `canned_quizzes`, anything else gets document data.
+    `stream=True` is answered with server-sent events like the real API.
+
+    The Batch API is served too: POST /v1/files, POST /v1/batches, GET /v1/batches/{id} and
+    GET /v1/files/{id}/content. A batch reports "in_progress" for `batch_polls` retrievals, then answers
+    every request of its input file like a chat completion, with failed requests in the error file.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.5,
+        latency_jitter: float = 0.2,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        invalid_json_rate: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_latency: float = 0.0,
+        latency_per_1k_prompt_tokens: float = 0.0,
+        context_window: int | None = None,
+        quizzes_per_chunk: int = 5,
+        batch_polls: int = 1,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        # 일부 요청만 아주 느린 tail latency
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        # prompt가 길수록 prefill에 드는 시간과, 넘으면 400을 돌려주는 context 한도
+        self.latency_per_1k_prompt_tokens = latency_per_1k_prompt_tokens
+        self.context_window = context_window
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.invalid_json_rate = invalid_json_rate
+        self.quizzes_per_chunk = quizzes_per_chunk
+        self.batch_polls = batch_polls
+
+        self.files: dict[str, bytes] = {}
+        self.batches: dict[str, dict] = {}
+        self.batch_retrievals = 0
+        self._batch_lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.prompt_tokens = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        # hedging이나 deadline으로 취소된 요청은 응답을 쓰기 전에 연결이 끊기므로 traceback을 남기지 않는다.
+        self._server.handle_error = lambda request, client_address: None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+
+    def reset_counters(self):
+        with self._lock:
+            self.calls = self.failures = self.prompt_tokens = 0
+
+    def _draw(self) -> tuple[float, str]:
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.latency + self._rng.uniform(-self.latency_jitter, self.latency_jitter))
+            if self._rng.random() < self.slow_rate:
+                delay = self.slow_latency
+            roll = self._rng.random()
+            if roll < self.error_rate:
+                outcome = "error"
+            elif roll < self.error_rate + self.rate_limit_rate:
+                outcome = "rate_limit"
+            elif roll < self.error_rate + self.rate_limit_rate + self.invalid_json_rate:
+                outcome = "invalid_json"
+            else:
+                outcome = "ok"
+            if outcome != "ok":
+                self.failures += 1
+            return delay, outcome
+
+    def _answer(self, body: dict, outcome: str) -> str:
+        if outcome == "invalid_json":
+            return "Sorry, I can only answer in plain text."
+        response_format = body.get("response_format") or {}
+        if response_format.get("json_schema", {}).get("name") == "quizzes":
+            count = self.quizzes_per_chunk
+            # 모델처럼 prompt가 요청한 개수 범위("between 4 and 5", "4~5개")를 지킨다.
+            requested = _QUIZ_COUNT_PATTERN.search(body["messages"][0]["content"])
+            if requested:
+                count = min(max(count, int(requested.group(1))), int(requested.group(2)))
+            return json.dumps(canned_quizzes(body["messages"][-1]["content"], count), ensure_ascii=False)
+        return json.dumps({"emoji": "📘", "title": "Bench Note", "category_id": 9})
+
+    def _create_file(self, filename: str, purpose: str, data: bytes) -> dict:
+        file_id = f"file-{uuid.uuid4().hex[:24]}"
+        with self._lock:
+            self.files[file_id] = data
+        return {"id": file_id, "object": "file", "bytes": len(data), "created_at": int(time.time()), "filename": filename, "purpose": purpose, "status": "processed"}
+
+    def _create_batch(self, request: dict) -> dict:
+        batch = {
+            "id": f"batch_{uuid.uuid4().hex[:24]}", "object": "batch", "endpoint": request["endpoint"],
+            "input_file_id": request["input_file_id"], "completion_window": request["completion_window"],
+            "created_at": int(time.time()), "status": "validating", "output_file_id": None, "error_file_id": None,
+            "errors": None, "request_counts": {"total": 0, "completed": 0, "failed": 0},
+        }
+        with self._batch_lock:
+            self.batches[batch["id"]] = {"batch": batch, "polls_left": self.batch_polls}
+        return batch
+
+    def _retrieve_batch(self, batch_id: str) -> dict | None:
+        with self._batch_lock:
+            self.batch_retrievals += 1
+            entry = self.batches.get(batch_id)
+            if entry is None:
+                return None
+            if entry["polls_left"] > 0:
+                entry["polls_left"] -= 1
+                entry["batch"]["status"] = "in_progress"
+            elif entry["batch"]["status"] != "completed":
+                self._run_batch(entry["batch"])
+            return entry["batch"]
+
+    def _run_batch(self, batch: dict):
+        outputs, errors = [], []
+        for line in self.files[batch["input_file_id"]].decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            _, outcome = self._draw()
+            item = {"id": f"batch_req_{uuid.uuid4().hex[:24]}", "custom_id": request["custom_id"], "error": None}
+            if outcome in ("error", "rate_limit"):
+                status_code = 500 if outcome == "error" else 429
+                errors.append({**item, "response": {"status_code": status_code, "request_id": "req_bench", "body": {"error": {"message": outcome}}}})
+                continue
+            body = request["body"]
+            prompt_tokens = sum(estimate_tokens(message["content"]) for message in body["messages"])
+            outputs.append({**item, "response": {"status_code": 200, "request_id": "req_bench", "body": self._completion(body, self._answer(body, outcome), prompt_tokens)}})
+
+        for key, items, filename in (("output_file_id", outputs, "batch_output.jsonl"), ("error_file_id", errors, "batch_errors.jsonl")):
+            if items:
+                data = "\n".join(json.dumps(item, ensure_ascii=False) for item in items).encode("utf-8")
+                batch[key] = self._create_file(filename, "batch_output", data)["id"]
+        batch["status"] = "completed"
+        batch["request_counts"] = {"total": len(outputs) + len(errors), "completed": len(outputs), "failed": len(errors)}
+
+    @staticmethod
+    def _completion(body: dict, content: str, prompt_tokens: int) -> dict:
+        return {
+            "id": "chatcmpl-bench", "object": "chat.completion", "created": int(time.time()), "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4, "total_tokens": prompt_tokens + len(content) // 4},
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                data = self.rfile.read(int(self.headers["Content-Length"]))
+                if self.path == "/v1/files":
+                    fields = _parse_multipart(self.headers["Content-Type"], data)
+                    filename, file_data = fields["file"]
+                    self._send_json(200, server._create_file(filename, fields["purpose"][1].decode(), file_data))
+                    return
+                if self.path == "/v1/batches":
+                    self._send_json(200, server._create_batch(json.loads(data)))
+                    return
+
+                body = json.loads(data)
+                delay, outcome = server._draw()
+                prompt_tokens = sum(estimate_tokens(message["content"]) for message in body["messages"])
+                if server.context_window and prompt_tokens > server.context_window:
+                    self._send_json(400, {"error": {
+                        "message": f"This model's maximum context length is {server.context_window} tokens, your messages resulted in {prompt_tokens} tokens.",
+                        "type": "invalid_request_error", "code": "context_length_exceeded",
+                    }})
+                    return
+                with server._lock:
+                    server.prompt_tokens += prompt_tokens
+                delay += prompt_tokens / 1000 * server.latency_per_1k_prompt_tokens
+
+                if outcome == "error":
+                    time.sleep(delay / 4)
+                    self._send_json(500, {"error": {"message": "The server had an error", "type": "server_error"}})
+                    return
+                if outcome == "rate_limit":
+                    self._send_json(429, {"error": {"message": "Rate limit reached", "type": "requests"}}, {"retry-after-ms": "200"})
+                    return
+
+                time.sleep(delay)
+                content = server._answer(body, outcome)
+                completion = server._completion(body, content, prompt_tokens)
+                if body.get("stream"):
+                    self._send_stream(content, completion["usage"])
+                    return
+                self._send_json(200, completion)
+
+            def do_GET(self):
+                batch_match = re.fullmatch(r"/v1/batches/([^/]+)", self.path)
+                if batch_match:
+                    batch = server._retrieve_batch(batch_match.group(1))
+                    if batch is None:
+                        self._send_json(404, {"error": {"message": "No such batch", "type": "invalid_request_error"}})
+                        return
+                    self._send_json(200, batch)
+                    return
+
+                file_match = re.fullmatch(r"/v1/files/([^/]+)/content", self.path)
+                if file_match and file_match.group(1) in server.files:
+                    data = server.files[file_match.group(1)]
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/octet-stream")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                    return
+                self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+
+            def _send_json(self, status: int, payload: dict, headers: dict | None = None):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, content: str, usage: dict):
+                events = []
+                for i in range(0, len(content), 32):
+                    events.append({"choices": [{"index": 0, "delta": {"content": content[i:i + 32]}, "finish_reason": None}]})
+                events.append({"choices": [], "usage": usage})
+                data = "".join(
+                    "data: " + json.dumps({"id": "chatcmpl-bench", "object": "chat.completion.chunk", "created": 0, "model": "bench", **event}) + "\n\n"
+                    for event in events
+                ) + "data: [DONE]\n\n"
+                data = data.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def _parse_multipart(content_type: str, data: bytes) -> dict[str, tuple[str | None, bytes]]:
+    """{field name: (filename, content)} of a multipart/form-data body."""
+    message = email.message_from_bytes(f"Content-Type: {content_type}\r\n\r\n".encode() + data, policy=email.policy.HTTP)
+    return {
+        part.get_param("name", header="content-disposition"): (part.get_filename(), part.get_payload(decode=True))
+        for part in message.iter_parts()
+    }
+
+
+class FakeDiscordServer:
+    """Local server for POST /channels/<id>/messages that counts delivered messages.
+
+    The first `rate_limited_requests` POSTs get a 429 asking the client to retry after `retry_after` seconds.
+    """
+
+    def __init__(self, rate_limited_requests: int = 0, retry_after: float = 0.05):
+        self.rate_limited_requests = rate_limited_requests
+        self.retry_after = retry_after
+        self.messages: list[dict] = []
+        self.post_times: list[float] = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self) -> "FakeDiscordServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                server.post_times.append(time.monotonic())
+                if len(server.post_times) <= server.rate_limited_requests:
+                    data = json.dumps({"message": "You are being rate limited.", "retry_after": server.retry_after, "global": False}).encode()
+                    self.send_response(429)
+                else:
+                    server.messages.append(body)
+                    data = b'{"id": "1"}'
+                    self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,86 @@
+import sqlite3
+import time
+
+from core.database.database_manager import DatabaseManager
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quiz (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, question TEXT, answer TEXT, explanation TEXT, delivered_count INTEGER,
+    quiz_type TEXT, correct_answer_count INTEGER, is_review_needed BOOLEAN, is_latest BOOLEAN, document_id INTEGER,
+    created_at TEXT, updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS options (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, options TEXT, quiz_id INTEGER, created_at TEXT, updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, document_id INTEGER, status TEXT, worker_id TEXT, lease_expires_at TEXT
+);
+CREATE TABLE IF NOT EXISTS document (
+    id INTEGER PRIMARY KEY, language TEXT, emoji TEXT, name TEXT, category_id INTEGER,
+    quiz_generation_status TEXT, is_public BOOLEAN
+);
+CREATE TABLE IF NOT EXISTS star (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, member_id INTEGER, star INTEGER
+);
+CREATE TABLE IF NOT EXISTS star_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, description TEXT, change_amount INTEGER, balance_after INTEGER,
+    transaction_type TEXT, source TEXT, star_id INTEGER, created_at TEXT, updated_at TEXT
+);
+"""
+
+
+class SQLiteDatabaseManager(DatabaseManager):
+    """DatabaseManager stand-in backed by SQLite that counts round-trips and can simulate network latency."""
+
+    def __init__(self, path: str = ":memory:", round_trip_latency: float = 0.0, on_round_trip=None):
+        super().__init__(host=None, user=None, password=None, db=path)
+        self.round_trip_latency = round_trip_latency
+        self.round_trips = 0
+        # 여러 manager가 하나의 SQLite 파일을 나눠 쓸 때 전체 round-trip을 세기 위한 callback
+        self.on_round_trip = on_round_trip
+
+    def connect(self):
+        # 여러 thread가 같은 파일에 쓰면 lock이 풀릴 때까지 기다린다.
+        self.connection = sqlite3.connect(self.db, check_same_thread=False, timeout=60)
+        self.connection.row_factory = lambda cursor, row: {col[0]: row[i] for i, col in enumerate(cursor.description)}
+        self.connection.executescript(SCHEMA)
+        self.cursor = self.connection.cursor()
+
+    def _round_trip(self):
+        self.round_trips += 1
+        if self.on_round_trip:
+            self.on_round_trip()
+        if self.round_trip_latency:
+            time.sleep(self.round_trip_latency)
+
+    def execute_query(self, query, params=None):
+        self._round_trip()
+        if not self.connection or not self.cursor:
+            self.connect()
+        # SQLite에는 row lock이 없으므로 MySQL 전용 locking 구문은 떼고 실행한다.
+        query = query.replace(" FOR UPDATE SKIP LOCKED", "")
+        self.cursor.execute(query.replace("%s", "?"), _adapt(params or ()))
+        return self.cursor.fetchall()
+
+    def execute_update(self, query, params=None):
+        self.execute_query(query, params)
+        return self.cursor.rowcount
+
+    def execute_many(self, query, params_seq):
+        self._round_trip()
+        if not self.connection or not self.cursor:
+            self.connect()
+        self.cursor.executemany(query.replace("%s", "?"), [_adapt(params) for params in params_seq])
+        return self.cursor.rowcount
+
+    def last_insert_id(self):
+        return self.cursor.lastrowid
+
+    def commit(self):
+        self._round_trip()
+        super().commit()
+
+
+def _adapt(params):
+    return tuple(str(param) if hasattr(param, "isoformat") else param for param in params)
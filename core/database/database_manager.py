@@ -1,45 +1,182 @@
-import pymysql
+import queue
+import threading
+import time
 
-class DatabaseManager:
-    def __init__(self, host, user, password, db, charset='utf8mb4'):
+from core.tracing.tracer import span
+
+
+class ConnectionPool:
+    """Thread-safe pool of pymysql connections that lives as long as the container."""
+
+    def __init__(self, host, user, password, db, charset='utf8mb4', max_size=4, acquire_timeout=30):
         self.host = host
         self.user = user
         self.password = password
         self.db = db
         self.charset = charset
-        self.connection = None
-        self.cursor = None
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
 
-    def connect(self):
-        self.connection = pymysql.connect(
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _create_connection(self):
+        import pymysql
+
+        return pymysql.connect(
             host=self.host,
             user=self.user,
             password=self.password,
             db=self.db,
             charset=self.charset
         )
+
+    def acquire(self):
+        with span("db.acquire") as acquire_span:
+            connection, reused = self._acquire()
+            acquire_span.set("reused", reused)
+        return connection
+
+    def _acquire(self):
+        start_time = time.perf_counter()
+        reused = True
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            connection = None
+            with self._lock:
+                if self._size < self.max_size:
+                    self._size += 1
+                    reused = False
+            if reused:
+                connection = self._idle.get(timeout=self.acquire_timeout)
+
+        try:
+            if connection is None:
+                connection = self._create_connection()
+            else:
+                # warm container에서 오래 쉬던 connection은 끊겨 있을 수 있으므로 ping으로 확인하고 다시 연결한다.
+                connection.ping(reconnect=True)
+        except Exception:
+            with self._lock:
+                self._size -= 1
+            raise
+
+        print(f"DB connection acquired in {(time.perf_counter() - start_time) * 1000:.1f}ms (reused: {reused})")
+        return connection, reused
+
+    def release(self, connection):
+        try:
+            # commit되지 않은 작업이 다음 job의 transaction에 섞이지 않도록 rollback한다.
+            connection.rollback()
+        except Exception:
+            self.discard(connection)
+            return
+        self._idle.put(connection)
+
+    def discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._size -= 1
+
+
+_pools: dict[tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_connection_pool(host, user, password, db, charset='utf8mb4', max_size=4) -> ConnectionPool:
+    key = (host, user, db, charset)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(host=host, user=user, password=password, db=db, charset=charset, max_size=max_size)
+        return _pools[key]
+
+
+class DatabaseManager:
+    def __init__(self, host, user, password, db, charset='utf8mb4', pool: ConnectionPool | None = None):
+        self.host = host
+        self.user = user
+        self.password = password
+        self.db = db
+        self.charset = charset
+        self.pool = pool
+        self.connection = None
+        self.cursor = None
+
+    def connect(self):
+        # pymysql은 실제로 연결할 때 불러온다.
+        import pymysql
+
+        if self.pool:
+            self.connection = self.pool.acquire()
+        else:
+            self.connection = pymysql.connect(
+                host=self.host,
+                user=self.user,
+                password=self.password,
+                db=self.db,
+                charset=self.charset
+            )
         self.cursor = self.connection.cursor(pymysql.cursors.DictCursor)
 
     def execute_query(self, query, params=None):
         if not self.connection or not self.cursor:
             self.connect()
         try:
-            self.cursor.execute(query, params)
-            return self.cursor.fetchall()
+            with span("db.execute_query", statement=_statement_kind(query)) as query_span:
+                self.cursor.execute(query, params)
+                rows = self.cursor.fetchall()
+                query_span.add("rows", self.cursor.rowcount)
+            return rows
         except Exception as e:
             print("Error executing query:", e)
             return None
 
+    def execute_update(self, query, params=None):
+        """Run an INSERT/UPDATE/DELETE and return the number of affected rows.
+
+        Unlike execute_query, DB errors are raised, so a failed statement is not mistaken for zero affected rows.
+        """
+        if not self.connection or not self.cursor:
+            self.connect()
+        with span("db.execute_update", statement=_statement_kind(query)) as query_span:
+            rowcount = self.cursor.execute(query, params)
+            query_span.add("rows", rowcount)
+        return rowcount
+
+    def execute_many(self, query, params_seq):
+        """Run one statement for every params in `params_seq` and return the number of affected rows.
+
+        DB errors are raised like in execute_update, so the caller's transaction can be rolled back.
+        """
+        # INSERT ... VALUES 구문은 pymysql이 multi-row INSERT 한 번으로 보낸다.
+        if not self.connection or not self.cursor:
+            self.connect()
+        with span("db.execute_many", statement=_statement_kind(query)) as query_span:
+            rowcount = self.cursor.executemany(query, params_seq)
+            query_span.add("rows", rowcount or 0)
+        return rowcount
+
     def commit(self):
         if self.connection:
-            self.connection.commit()
+            with span("db.commit"):
+                self.connection.commit()
 
     def close(self):
         if self.cursor:
             self.cursor.close()
         if self.connection:
-            self.connection.close()
-            
+            if self.pool:
+                self.pool.release(self.connection)
+            else:
+                self.connection.close()
+        self.cursor = None
+        self.connection = None
+
     def last_insert_id(self):
         if not self.connection or not self.cursor:
             self.connect()
@@ -48,7 +185,12 @@ class DatabaseManager:
         except Exception as e:
             print("Error fetching last insert id:", e)
             return None
-        
+
     def rollback(self):
         if self.connection:
-            self.connection.rollback()
\ No newline at end of file
+            self.connection.rollback()
+
+
+def _statement_kind(query: str) -> str:
+    # 값이 들어간 query 전체 대신 "SELECT", "UPDATE" 같은 첫 단어만 기록한다.
+    return query.lstrip().split(" ", 1)[0].upper()
@@ -1,21 +1,65 @@
-from enum import Enum
+import queue
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime
-import requests
-from requests import HTTPError
+from typing import TYPE_CHECKING
 import pytz
 
 from core.enums.enum import LLMErrorType
 
+if TYPE_CHECKING:
+    import requests
+
+
+# https://discord.com/developers/docs/resources/message#embed-object-embed-limits
+DISCORD_CONTENT_LIMIT = 2000
+DISCORD_EMBED_DESCRIPTION_LIMIT = 4096
+DISCORD_EMBEDS_TOTAL_LIMIT = 6000
+TRUNCATION_SUFFIX = "\n…(truncated)"
+
+
+@dataclass
+class LLMErrorReport:
+    task: str
+    error_type: LLMErrorType
+    document_content: str
+    error_message: str
+    info: str = ""
+    llm_response: str = ""
+
+
 class DiscordClient:
+    """Posts LLM error reports to a Discord channel from a background thread.
+
+    Reports with the same task and error type that arrive within `coalesce_window` seconds are sent
+    as one message. Call `flush()` before the process may be frozen (e.g. at the end of a Lambda handler).
+    """
+
     def __init__(
         self,
         channel_id: str,
         bot_token: str,
         base_url: str = "https://discord.com/api/v10",
+        coalesce_window: float = 5.0,
+        request_timeout: float = 5.0,
+        max_send_attempts: int = 3,
     ):
         self.base_url = base_url
         self.url = base_url + f"/channels/{channel_id}/messages"
         self.headers = {"Authorization": f"Bot {bot_token}"}
+        # requests는 import 비용이 커서 client를 만들 때 불러온다.
+        import requests
+
+        # warm invocation 사이에도 keep-alive connection을 재사용한다.
+        self.session = requests.Session()
+        self.coalesce_window = coalesce_window
+        self.request_timeout = request_timeout
+        self.max_send_attempts = max_send_attempts
+
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._thread_lock = threading.Lock()
 
     def report_llm_error(
         self,
@@ -26,7 +70,7 @@ class DiscordClient:
         info: str = "",
         llm_response: str = "",
     ):
-        """Report LLM Error
+        """Report LLM Error (queued, does not block on Discord)
 
         Args:
             error_type (str): LLM task type
@@ -35,27 +79,128 @@ class DiscordClient:
             error_message (str): OpenAI Error message
             info (str, optional): Extra optional information. Defaults to "".
         """
-        korea_tz = pytz.timezone("Asia/Seoul")
-        korea_now = datetime.now(korea_tz).strftime("%Y/%m/%d, %H:%M:%S")
-        utc_now = datetime.utcnow().strftime("%Y/%m/%d, %H:%M:%S")
+        self._ensure_thread()
+        self._queue.put(LLMErrorReport(
+            task=task,
+            error_type=error_type,
+            document_content=document_content,
+            error_message=error_message,
+            info=info,
+            llm_response=llm_response,
+        ))
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Send every queued report now. Returns False if they could not all be sent within `timeout`."""
+        if self._thread is None:
+            return True
+        flushed = threading.Event()
+        self._queue.put(flushed)
+        return flushed.wait(timeout)
+
+    def post_message(self, body: dict):
+        """POST one message, waiting out 429 responses up to `max_send_attempts` times."""
+        for attempt in range(self.max_send_attempts):
+            response = self.session.post(url=self.url, json=body, headers=self.headers, timeout=self.request_timeout)
+            if response.status_code != 429:
+                response.raise_for_status()
+                return
+            retry_after = _retry_after_seconds(response)
+            print(f"Discord rate limited, retrying in {retry_after:.2f}s (attempt {attempt + 1}/{self.max_send_attempts})")
+            time.sleep(retry_after)
+        response.raise_for_status()
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="discord-reporter", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        # (task, error_type) -> (window가 열린 시각, 모인 report 목록)
+        pending: dict[tuple, tuple[float, list[LLMErrorReport]]] = {}
 
-        content = f"# Task: {task}\n## Error Type: {error_type.value}\n* KST: `{korea_now}`\n* UTC: `{utc_now}`\n{info}"
-        embeds = [
-            {"title": "Document Content", "description": document_content},
-            {"title": "Error Message", "description": error_message},
-        ]
+        while True:
+            timeout = None
+            if pending:
+                timeout = max(0.0, min(opened_at for opened_at, _ in pending.values()) + self.coalesce_window - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
 
-        if error_type == LLMErrorType.INVALID_JSON_FORMAT:
-            embeds.insert(
-                1,
-                {"title": "LLM Response", "description": llm_response},
-            )
+            if isinstance(item, LLMErrorReport):
+                key = (item.task, item.error_type)
+                pending.setdefault(key, (time.monotonic(), []))[1].append(item)
 
-        body = {"content": content, "tts": False, "embeds": embeds}
+            now = time.monotonic()
+            flush_all = isinstance(item, threading.Event)
+            for key in list(pending):
+                opened_at, reports = pending[key]
+                if flush_all or now - opened_at >= self.coalesce_window:
+                    del pending[key]
+                    self._send(reports)
 
-        response = requests.post(url=self.url, json=body, headers=self.headers)
+            if flush_all:
+                item.set()
 
+    def _send(self, reports: list[LLMErrorReport]):
         try:
-            response.raise_for_status()
-        except HTTPError as e:
-            pass
+            self.post_message(build_error_message(reports))
+        except Exception as e:
+            # 에러 리포트 실패가 worker를 멈추게 해서는 안 된다.
+            print(f"Failed to report {len(reports)} LLM errors to Discord: {type(e).__name__}: {e}")
+
+
+def build_error_message(reports: list[LLMErrorReport]) -> dict:
+    """One Discord message for reports of the same task and error type, truncated to Discord limits."""
+    first = reports[0]
+    korea_tz = pytz.timezone("Asia/Seoul")
+    korea_now = datetime.now(korea_tz).strftime("%Y/%m/%d, %H:%M:%S")
+    utc_now = datetime.utcnow().strftime("%Y/%m/%d, %H:%M:%S")
+
+    content = f"# Task: {first.task}\n## Error Type: {first.error_type.value}\n* KST: `{korea_now}`\n* UTC: `{utc_now}`\n"
+    if len(reports) > 1:
+        content += f"* Occurrences: `{len(reports)}`\n"
+    content += "\n".join(_count_duplicates([report.info for report in reports if report.info]))
+
+    embeds = [
+        {"title": "Document Content", "description": first.document_content},
+        {"title": "Error Message", "description": "\n".join(_count_duplicates([report.error_message for report in reports]))},
+    ]
+
+    if first.error_type == LLMErrorType.INVALID_JSON_FORMAT:
+        embeds.insert(
+            1,
+            {"title": "LLM Response", "description": first.llm_response},
+        )
+
+    description_limit = min(
+        DISCORD_EMBED_DESCRIPTION_LIMIT,
+        (DISCORD_EMBEDS_TOTAL_LIMIT - sum(len(embed["title"]) for embed in embeds)) // len(embeds),
+    )
+    for embed in embeds:
+        embed["description"] = _truncate(embed["description"] or "(empty)", description_limit)
+
+    return {"content": _truncate(content, DISCORD_CONTENT_LIMIT), "tts": False, "embeds": embeds}
+
+
+def _count_duplicates(values: list[str]) -> list[str]:
+    counts: dict[str, int] = {}
+    for value in values:
+        counts[value] = counts.get(value, 0) + 1
+    return [value if count == 1 else f"(x{count}) {value}" for value, count in counts.items()]
+
+
+def _truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    return text[:limit - len(TRUNCATION_SUFFIX)] + TRUNCATION_SUFFIX
+
+
+def _retry_after_seconds(response: "requests.Response") -> float:
+    try:
+        return float(response.json()["retry_after"])
+    except Exception:
+        return float(response.headers.get("Retry-After", 1.0))
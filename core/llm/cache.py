@@ -0,0 +1,189 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict
+
+from core.database.database_manager import DatabaseManager
+
+
+def make_cache_key(model_kwargs: dict, messages: list) -> str:
+    payload = json.dumps(
+        {"model_kwargs": model_kwargs, "messages": [asdict(message) for message in messages]},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache(ABC):
+    """Content-addressed store of parsed LLM JSON responses with TTL and size-based eviction."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float | None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> dict | None:
+        value = self._get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value)
+
+    def set(self, key: str, value: dict):
+        self._set(key, json.dumps(value, ensure_ascii=False))
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _expires_at(self) -> float | None:
+        return time.time() + self.ttl_seconds if self.ttl_seconds else None
+
+    @abstractmethod
+    def _get(self, key: str) -> str | None:
+        ...
+
+    @abstractmethod
+    def _set(self, key: str, value: str):
+        ...
+
+
+class InMemoryLRUCache(ResponseCache):
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float | None = 60 * 60 * 24):
+        super().__init__(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._entries: OrderedDict[str, tuple[str, float | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: str):
+        with self._lock:
+            self._entries[key] = (value, self._expires_at())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SQLiteResponseCache(ResponseCache):
+    def __init__(self, path: str, max_entries: int = 100_000, ttl_seconds: float | None = 60 * 60 * 24 * 7):
+        super().__init__(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS llm_response_cache ("
+            "cache_key TEXT PRIMARY KEY, response TEXT NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS llm_response_cache_accessed_at ON llm_response_cache (accessed_at)"
+        )
+        self._connection.commit()
+
+    def _get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response FROM llm_response_cache WHERE cache_key = ? AND (expires_at IS NULL OR expires_at >= ?)",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute("UPDATE llm_response_cache SET accessed_at = ? WHERE cache_key = ?", (now, key))
+            self._connection.commit()
+            return row[0]
+
+    def _set(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO llm_response_cache (cache_key, response, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, self._expires_at(), now),
+            )
+            self._connection.execute("DELETE FROM llm_response_cache WHERE expires_at < ?", (now,))
+            self._connection.execute(
+                "DELETE FROM llm_response_cache WHERE cache_key IN ("
+                "SELECT cache_key FROM llm_response_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._connection.commit()
+
+
+class MySQLResponseCache(ResponseCache):
+    CREATE_TABLE_QUERY = (
+        "CREATE TABLE IF NOT EXISTS llm_response_cache ("
+        "cache_key CHAR(64) PRIMARY KEY, response MEDIUMTEXT NOT NULL, expires_at DOUBLE NULL, "
+        "accessed_at DOUBLE NOT NULL, INDEX idx_llm_response_cache_accessed_at (accessed_at))"
+    )
+
+    def __init__(self, db_manager: DatabaseManager, max_entries: int = 100_000, ttl_seconds: float | None = 60 * 60 * 24 * 7):
+        super().__init__(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.db_manager = db_manager
+        self._lock = threading.Lock()
+        self._table_created = False
+
+    def _ensure_table(self):
+        if not self._table_created:
+            self.db_manager.execute_query(self.CREATE_TABLE_QUERY)
+            self.db_manager.commit()
+            self._table_created = True
+
+    def _get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            self._ensure_table()
+            rows = self.db_manager.execute_query(
+                "SELECT response FROM llm_response_cache WHERE cache_key = %s AND (expires_at IS NULL OR expires_at >= %s)",
+                (key, now),
+            )
+            if not rows:
+                self.db_manager.commit()
+                return None
+            self.db_manager.execute_query("UPDATE llm_response_cache SET accessed_at = %s WHERE cache_key = %s", (now, key))
+            self.db_manager.commit()
+            return rows[0]["response"]
+
+    def _set(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._ensure_table()
+            self.db_manager.execute_query(
+                "REPLACE INTO llm_response_cache (cache_key, response, expires_at, accessed_at) VALUES (%s, %s, %s, %s)",
+                (key, value, self._expires_at(), now),
+            )
+            self.db_manager.execute_query("DELETE FROM llm_response_cache WHERE expires_at < %s", (now,))
+            rows = self.db_manager.execute_query(
+                "SELECT accessed_at FROM llm_response_cache ORDER BY accessed_at DESC LIMIT 1 OFFSET %s",
+                (self.max_entries,),
+            )
+            if rows:
+                self.db_manager.execute_query(
+                    "DELETE FROM llm_response_cache WHERE accessed_at <= %s", (rows[0]["accessed_at"],)
+                )
+            self.db_manager.commit()
+
+
+def create_response_cache(backend: str | None, **kwargs) -> ResponseCache | None:
+    if not backend:
+        return None
+    if backend == "memory":
+        return InMemoryLRUCache(**kwargs)
+    if backend == "sqlite":
+        return SQLiteResponseCache(**kwargs)
+    if backend == "mysql":
+        return MySQLResponseCache(**kwargs)
+    raise ValueError(f"Unknown LLM response cache backend: {backend}")
@@ -0,0 +1,39 @@
+import contextlib
+import contextvars
+import time
+
+
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar("picktoss_deadline", default=None)
+
+
+class DeadlineExceededError(TimeoutError):
+    """The job's deadline passed before the LLM request could be (re)sent or finished."""
+
+
+@contextlib.contextmanager
+def deadline_after(seconds: float | None):
+    """Give every LLM call made in this context (and in tasks/threads copied from it) `seconds` at most.
+
+    Nested deadlines keep the earlier one. `None` leaves the current deadline as is.
+    """
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_seconds() -> float | None:
+    """Seconds left until the current deadline, or None without one. Negative once it has passed."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def deadline_exceeded() -> bool:
+    remaining = remaining_seconds()
+    return remaining is not None and remaining <= 0
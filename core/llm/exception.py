@@ -1,5 +1,8 @@
 from core.exception.base import BaseCustomException
-from fastapi import status
+
+
+# fastapi.status를 쓰기 위해 fastapi 전체를 import하지 않도록 값만 둔다.
+HTTP_500_INTERNAL_SERVER_ERROR = 500
 
 
 class InvalidLLMJsonResponseError(BaseCustomException):
@@ -8,5 +11,5 @@ class InvalidLLMJsonResponseError(BaseCustomException):
     def __init__(self, llm_response: str):
         self.llm_response = llm_response
         super().__init__(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Invalid LLM Response: {llm_response}"
+            status_code=HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Invalid LLM Response: {llm_response}"
         )
@@ -0,0 +1,40 @@
+import collections
+
+
+class LatencyTracker:
+    """Recent completion latencies of one kind of request, used to decide when to hedge.
+
+    Written only from the OpenAIChatLLM event loop, so it needs no lock. Other threads only read quantiles.
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20, percentile: float = 0.95, min_hedge_delay: float = 1.0, max_hedge_ratio: float = 0.1):
+        self.samples: collections.deque[float] = collections.deque(maxlen=window)
+        self.min_samples = min_samples
+        self.percentile = percentile
+        self.min_hedge_delay = min_hedge_delay
+        # 중복 요청이 전체 요청의 이 비율을 넘지 않게 해서 비용과 rate limit 소모를 제한한다.
+        self.max_hedge_ratio = max_hedge_ratio
+        self.requests = 0
+        self.hedges = 0
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def quantile(self, q: float) -> float | None:
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def hedge_delay(self) -> float | None:
+        """How long to wait for the first request before sending a duplicate, or None to never hedge."""
+        latency = self.quantile(self.percentile)
+        if latency is None:
+            return None
+        return max(self.min_hedge_delay, latency)
+
+    def try_hedge(self) -> bool:
+        if self.hedges + 1 > self.max_hedge_ratio * self.requests:
+            return False
+        self.hedges += 1
+        return True
@@ -0,0 +1,77 @@
+import json
+
+
+class JsonArrayItemParser:
+    """Incremental parser that yields the objects of a top-level array as soon as each one is closed.
+
+    For `{"quizzes": [{...}, {...}]}` with `array_key="quizzes"`, every `{...}` is returned by the `feed`
+    call that receives its closing brace. Only the object being parsed is buffered, not the whole response.
+    """
+
+    # 앞부분만 남겨두고 JSON이 아닌 응답을 받았을 때 에러 리포트에 사용한다.
+    HEAD_LENGTH = 2000
+
+    def __init__(self, array_key: str):
+        self.array_key = array_key
+        self.head = ""
+        self.completed = False
+
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_chars: list[str] = []
+        self._last_key: str | None = None
+        self._in_array = False
+        self._item_chars: list[str] | None = None
+
+    def feed(self, text: str) -> list[dict]:
+        if len(self.head) < self.HEAD_LENGTH:
+            self.head += text[:self.HEAD_LENGTH - len(self.head)]
+
+        items: list[dict] = []
+        for ch in text:
+            if self._item_chars is not None:
+                self._item_chars.append(ch)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = "".join(self._string_chars)
+                elif self._depth == 1:
+                    self._string_chars.append(ch)
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_chars = []
+            elif ch in "{[":
+                self._depth += 1
+                if ch == "[" and self._depth == 2 and self._last_key == self.array_key:
+                    self._in_array = True
+                elif ch == "{" and self._depth == 3 and self._in_array:
+                    self._item_chars = [ch]
+            elif ch in "}]":
+                self._depth -= 1
+                if ch == "}" and self._depth == 2 and self._item_chars is not None:
+                    item = self._parse_item("".join(self._item_chars))
+                    if item is not None:
+                        items.append(item)
+                    self._item_chars = None
+                elif ch == "]" and self._depth == 1:
+                    self._in_array = False
+                elif self._depth == 0:
+                    self.completed = True
+        return items
+
+    @staticmethod
+    def _parse_item(text: str) -> dict | None:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            print(f"Skipping unparsable streamed item: {text[:200]}")
+            return None
@@ -1,9 +1,31 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import itertools
 import json
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterable
 from dataclasses import asdict, dataclass
-from typing import Literal
-from openai import AsyncOpenAI, OpenAI
+from typing import TYPE_CHECKING, Literal
 
+from core.llm.cache import ResponseCache, make_cache_key
+from core.llm.deadline import DeadlineExceededError, deadline_exceeded, remaining_seconds
 from core.llm.exception import InvalidLLMJsonResponseError
+from core.llm.hedging import LatencyTracker
+from core.llm.json_stream import JsonArrayItemParser
+from core.llm.rate_limit import AdaptiveConcurrencyLimiter, RateLimiter, backoff_delay, retry_after_seconds
+from core.llm.tokenizer import aload_encoding, estimate_message_tokens
+from core.tracing.tracer import current_span, span
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_MAX_REQUESTS = 50_000
+JSON_OBJECT_RESPONSE_FORMAT = {"type": "json_object"}
 
 
 @dataclass
@@ -18,39 +40,546 @@ class OpenAIChatLLM:
         api_key: str, 
         model: str = "gpt-4o-mini", 
         temperature: float = 0.3,
-        top_p: float = 0.2
+        top_p: float = 0.2,
+        max_concurrency: int = 8,
+        request_timeout: float = 60.0,
+        requests_per_minute: int | None = None,
+        tokens_per_minute: int | None = None,
+        expected_completion_tokens: int = 1000,
+        max_retries: int = 4,
+        cache: ResponseCache | None = None,
+        hedge_requests: bool = True,
         ):
-        self.async_client = AsyncOpenAI(api_key=api_key)
-        self.sync_client = OpenAI(api_key=api_key)
+        # openai SDK는 import 비용이 커서 client를 만들 때 불러온다.
+        from openai import AsyncOpenAI
+
+        # 재시도는 rate limiter와 함께 직접 처리하므로 SDK 자체 재시도는 끈다.
+        self.async_client: AsyncOpenAI = AsyncOpenAI(api_key=api_key, max_retries=0)
 
         self.model_kwargs = {"model": model, "temperature": temperature, "top_p": top_p}
+        self.max_concurrency = max_concurrency
+        self.request_timeout = request_timeout
+        self.expected_completion_tokens = expected_completion_tokens
+        self.max_retries = max_retries
+        self.cache = cache
+        self.hedge_requests = hedge_requests
 
-    async def apredict_json(self, messages: list[ChatMessage]) -> dict:
-        extra_params = {}
-        if self.model_kwargs["model"] == "gpt-4o-mini":
-            extra_params["response_format"] = {"type": "json_object"}
+        # response format(= 요청 종류)마다 응답 시간 분포가 달라서 따로 기록한다.
+        self._latency_trackers: dict[str, LatencyTracker] = {}
+        self.rate_limiter = RateLimiter(requests_per_minute=requests_per_minute, tokens_per_minute=tokens_per_minute)
+        self.concurrency_limiter = AdaptiveConcurrencyLimiter(max_limit=max_concurrency)
 
-        resp = await self.async_client.chat.completions.create(
-            messages=[asdict(message) for message in messages], **self.model_kwargs
-        )
-        resp_content = resp.choices[0].message.content
-        resp_content = self.response_to_dict(text=resp_content)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_lock = threading.Lock()
+
+    async def apredict_json(self, messages: list[ChatMessage], response_format: dict | None = None, use_cache: bool = True) -> dict:
+        """Parsed JSON answer for `messages`.
+
+        `response_format` is passed to the API as is (e.g. a strict json_schema); without one, JSON mode is used.
+        With `use_cache=False` the cache is not read, so a retry always gets a fresh answer.
+        """
+        params = {"response_format": response_format or JSON_OBJECT_RESPONSE_FORMAT}
+
+        cache_key = None
+        if self.cache:
+            cache_key = make_cache_key({**self.model_kwargs, **params}, messages)
+            cached = await asyncio.to_thread(self.cache.get, cache_key) if use_cache else None
+            if cached is not None:
+                current_span().add("cache_hits")
+                return cached
+
+        resp = await self._acreate_hedged(messages, **params)
+        message = resp.choices[0].message
+        if message.content is None:
+            # structured output에서 모델이 답변을 거부하면 content 대신 refusal이 온다.
+            raise InvalidLLMJsonResponseError(llm_response=getattr(message, "refusal", None) or "")
+        resp_content = self.response_to_dict(text=message.content)
+
+        if self.cache:
+            await asyncio.to_thread(self.cache.set, cache_key, resp_content)
         return resp_content
 
-    def predict_json(self, messages: list[ChatMessage]) -> dict:
-        extra_params = {}
-        if self.model_kwargs["model"] == "gpt-4o-mini":
-            extra_params["response_format"] = {"type": "json_object"}
+    async def _acreate_hedged(self, messages: list[ChatMessage], **params):
+        """acreate_chat_completion that sends a duplicate request once the first has been out longer than the
+        observed p95 latency (counted from when it was sent, not from when it started waiting for a slot).
 
-        resp = self.sync_client.chat.completions.create(
-            messages=[asdict(message) for message in messages], **self.model_kwargs
-        )
-        resp_content = resp.choices[0].message.content
-        resp_content = self.response_to_dict(text=resp_content)
+        The first successful response wins and the other request is cancelled.
+        """
+        tracker = self._latency_tracker(params.get("response_format"))
+        tracker.requests += 1
+        hedge_delay = tracker.hedge_delay() if self.hedge_requests else None
+
+        sent = asyncio.Event()
+        primary = asyncio.create_task(self.acreate_chat_completion(messages, on_sent=sent.set, **params))
+        sent_waiter = asyncio.create_task(sent.wait())
+        tasks = {primary}
+        try:
+            if hedge_delay is not None:
+                # rate limit과 동시 실행 제한을 기다리는 동안은 느린 것이 아니므로, 실제로 보낸 뒤부터 센다.
+                await asyncio.wait({primary, sent_waiter}, return_when=asyncio.FIRST_COMPLETED)
+                done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+                remaining = remaining_seconds()
+                # 남은 시간이 hedge_delay보다 짧으면 중복 요청도 끝나지 못하므로 보내지 않는다.
+                if not done and (remaining is None or remaining > hedge_delay) and tracker.try_hedge():
+                    current_span().add("hedged")
+                    tasks.add(asyncio.create_task(self.acreate_chat_completion(messages, **params)))
+
+            while True:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            current_span().add("hedge_wins")
+                        return task.result()
+                if not tasks:
+                    # 모두 실패했다면 처음 요청의 예외를 그대로 올린다.
+                    return primary.result()
+        finally:
+            sent_waiter.cancel()
+            for task in tasks:
+                task.cancel()
+
+    def _latency_tracker(self, response_format: dict | None) -> LatencyTracker:
+        response_format = response_format or JSON_OBJECT_RESPONSE_FORMAT
+        key = response_format.get("json_schema", {}).get("name") or response_format["type"]
+        if key not in self._latency_trackers:
+            self._latency_trackers[key] = LatencyTracker()
+        return self._latency_trackers[key]
+
+    def _request_timeout(self) -> float:
+        """request_timeout, shortened to what is left of the job deadline."""
+        remaining = remaining_seconds()
+        if remaining is None:
+            return self.request_timeout
+        if remaining <= 0:
+            raise DeadlineExceededError("The job deadline passed before the LLM request was sent")
+        return min(self.request_timeout, remaining)
+
+    async def acreate_chat_completion(self, messages: list[ChatMessage], on_sent: Callable[[], None] | None = None, **params):
+        """Call chat.completions.create within the RPM/TPM budget and the adaptive concurrency limit.
+
+        429, 5xx and connection errors are retried with exponential backoff and jitter, as long as the job
+        deadline (see core.llm.deadline) allows. Each attempt times out after `request_timeout` (or at the
+        deadline), counted from when it is sent, so waiting for a slot or a retry never uses it up.
+        `on_sent` is called right before every attempt is sent.
+        """
+        from openai import APIConnectionError, InternalServerError, RateLimitError
+
+        await aload_encoding()
+        estimated_tokens = estimate_message_tokens(messages) + self.expected_completion_tokens
+
+        with span("llm.chat_completion", model=self.model_kwargs["model"], stream=bool(params.get("stream"))) as completion_span:
+            for attempt in range(self.max_retries + 1):
+                queue_start_time = time.perf_counter()
+                await self.rate_limiter.acquire(estimated_tokens)
+
+                async with self.concurrency_limiter:
+                    # RPM/TPM 대기와 동시 실행 제한 대기를 합친 시간
+                    completion_span.add("queued_ms", (time.perf_counter() - queue_start_time) * 1000)
+                    if on_sent:
+                        on_sent()
+                    sent_time = time.perf_counter()
+                    timeout = self._request_timeout()
+                    try:
+                        # SDK의 timeout은 읽기 간격마다 적용되므로, 응답 전체에 걸리는 시간은 여기서 제한한다.
+                        async with asyncio.timeout(timeout):
+                            raw_resp = await self.async_client.chat.completions.with_raw_response.create(
+                                messages=[asdict(message) for message in messages], **self.model_kwargs, **params,
+                                timeout=timeout,
+                            )
+                    except RateLimitError as e:
+                        self.concurrency_limiter.on_throttle()
+                        self.rate_limiter.update_from_headers(e.response.headers)
+                        if attempt == self.max_retries:
+                            raise
+                        delay = retry_after_seconds(e.response.headers) or backoff_delay(attempt)
+                    except (InternalServerError, APIConnectionError):
+                        if attempt == self.max_retries:
+                            raise
+                        delay = backoff_delay(attempt)
+                    else:
+                        resp = raw_resp.parse()
+                        self.rate_limiter.update_from_headers(raw_resp.headers)
+                        # stream=True이면 usage는 마지막 chunk에 오므로 호출한 쪽에서 정산한다.
+                        if getattr(resp, "usage", None):
+                            self.rate_limiter.settle(estimated_tokens, resp.usage.total_tokens)
+                            completion_span.add("prompt_tokens", resp.usage.prompt_tokens)
+                            completion_span.add("completion_tokens", resp.usage.completion_tokens)
+                        self.concurrency_limiter.on_success(raw_resp.headers)
+                        if not params.get("stream"):
+                            self._latency_tracker(params.get("response_format")).record(time.perf_counter() - sent_time)
+                        return resp
+
+                remaining = remaining_seconds()
+                if remaining is not None and remaining <= delay:
+                    raise DeadlineExceededError(f"The job deadline passes before the retry in {delay:.2f}s")
+                completion_span.add("retries")
+                print(f"Retrying chat completion in {delay:.2f}s (attempt {attempt + 1}/{self.max_retries})")
+                await asyncio.sleep(delay)
+
+    async def astream_json_items(
+        self,
+        messages: list[ChatMessage],
+        array_key: str,
+        on_item: Callable[[dict], None],
+        response_format: dict | None = None,
+        use_cache: bool = True,
+        ) -> dict:
+        """Stream the answer and pass each object of `array_key` to `on_item` as soon as it is complete.
+
+        Returns `{array_key: [items]}`. If the stream breaks after some items were emitted, the emitted
+        items are returned instead of raising, since the caller has already consumed them.
+        """
+        params = {"response_format": response_format or JSON_OBJECT_RESPONSE_FORMAT}
+
+        cache_key = None
+        if self.cache:
+            cache_key = make_cache_key({**self.model_kwargs, **params}, messages)
+            cached = await asyncio.to_thread(self.cache.get, cache_key) if use_cache else None
+            if cached is not None:
+                current_span().add("cache_hits")
+                for item in cached.get(array_key, []):
+                    on_item(item)
+                return cached
+
+        await aload_encoding()
+        estimated_tokens = estimate_message_tokens(messages) + self.expected_completion_tokens
+        parser = JsonArrayItemParser(array_key=array_key)
+        items: list[dict] = []
+        loop = asyncio.get_running_loop()
+        # 응답을 끝까지 읽는 시간도 마지막 시도를 보낸 시점부터 request_timeout 안에 들어와야 한다.
+        expires_at = [0.0]
+
+        def on_sent():
+            expires_at[0] = loop.time() + self._request_timeout()
+
+        try:
+            stream = await self.acreate_chat_completion(
+                messages, on_sent=on_sent, **params, stream=True, stream_options={"include_usage": True}
+            )
+            async with asyncio.timeout_at(expires_at[0]):
+                async for chunk in stream:
+                    if chunk.usage:
+                        self.rate_limiter.settle(estimated_tokens, chunk.usage.total_tokens)
+                        current_span().add("prompt_tokens", chunk.usage.prompt_tokens)
+                        current_span().add("completion_tokens", chunk.usage.completion_tokens)
+                    if not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+                    for item in parser.feed(chunk.choices[0].delta.content):
+                        items.append(item)
+                        on_item(item)
+        except Exception as e:
+            if not items:
+                raise
+            print(f"Stream stopped after {len(items)} items: {type(e).__name__}: {e}")
+            return {array_key: items}
+
+        if not parser.completed and not items:
+            raise InvalidLLMJsonResponseError(llm_response=parser.head)
+
+        resp_content = {array_key: items}
+        if self.cache and parser.completed:
+            await asyncio.to_thread(self.cache.set, cache_key, resp_content)
         return resp_content
 
+    def batch_predict_json(
+        self,
+        batch_messages: Iterable[list[ChatMessage]],
+        response_format: dict | None = None,
+        validate: Callable[[dict], tuple[dict, bool]] | None = None,
+        retry_budget: int = 0,
+        max_retries_per_prompt: int = 1,
+        ) -> list[dict | Exception]:
+        """Send every prompt, bounded by max_concurrency, and return one result or exception per prompt.
+
+        A single failing chunk does not discard the others. `batch_messages` may be a lazy iterable: each prompt
+        is submitted as soon as the iterable yields it, and at most `max_concurrency * 2` prompts are pending
+        at once, so a generator of chunks is consumed at the pace of the LLM.
+
+        A prompt whose answer is not JSON, times out, or is rejected by `validate` is sent again on its own,
+        at most `max_retries_per_prompt` times and `retry_budget` times for the whole batch.
+        """
+        predict = functools.partial(self._apredict_json, response_format=response_format)
+        return self._run_batch(batch_messages, predict, validate, retry_budget, max_retries_per_prompt, response_format)
+
+    def predict_json_in_waves(
+        self,
+        batch_messages: Iterable[list[ChatMessage]],
+        wave_size: Callable[[dict[int, dict | Exception]], int],
+        response_format: dict | None = None,
+        validate: Callable[[dict], tuple[dict, bool]] | None = None,
+        retry_budget: int = 0,
+        max_retries_per_prompt: int = 1,
+        ) -> dict[int, dict | Exception]:
+        """Send prompts in order, one wave at a time, until `wave_size` says no more are needed.
+
+        `wave_size` gets the results so far ({index in batch_messages: result or exception}) and returns how
+        many prompts the next wave should hold; 0 means there are enough results. It runs on the event loop
+        thread before every wave and after every finished prompt, and once it returns 0 the prompts still in
+        flight are cancelled. Prompts that were never sent or were cancelled are missing from the result.
+        `batch_messages` may be a lazy iterable: each wave takes only the prompts it sends (on a worker
+        thread, so building them does not block the event loop), and prompts never sent are never built.
+        Retries work as in batch_predict_json.
+        """
+        predict = functools.partial(self._apredict_json, response_format=response_format)
+        return self.run_coroutine(self._apredict_in_waves(
+            batch_messages, wave_size, predict, validate, retry_budget, max_retries_per_prompt, response_format
+        ))
+
+    async def _apredict_in_waves(
+        self,
+        batch_messages: Iterable[list[ChatMessage]],
+        wave_size: Callable[[dict[int, dict | Exception]], int],
+        predict: Callable[[list[ChatMessage], bool], Awaitable[dict]],
+        validate: Callable[[dict], tuple[dict, bool]] | None,
+        retry_budget: int,
+        max_retries_per_prompt: int,
+        response_format: dict | None,
+        ) -> dict[int, dict | Exception]:
+        results: dict[int, dict | Exception] = {}
+        budget = {"remaining": retry_budget, "used": 0}
+        prompts = iter(batch_messages)
+        next_index = waves = cancelled = 0
+
+        while True:
+            size = wave_size(results)
+            if size <= 0:
+                break
+            if not self._has_time_for_prompt(response_format):
+                current_span().set("deadline_reached", True)
+                print(f"Job deadline is near: not sending the prompts after the first {next_index}")
+                break
+
+            # prompt를 만드는 데 S3 읽기나 chunking이 들어갈 수 있으므로 event loop 밖에서 이번 wave 만큼만 꺼낸다.
+            wave_messages = await asyncio.to_thread(lambda: list(itertools.islice(prompts, size)))
+            if not wave_messages:
+                break
+            wave = {
+                asyncio.create_task(self._apredict_with_retry(messages, predict, validate, budget, max_retries_per_prompt)): next_index + i
+                for i, messages in enumerate(wave_messages)
+            }
+            next_index += len(wave)
+            waves += 1
+
+            pending = set(wave)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    results[wave[task]] = task.exception() or task.result()
+                if pending and wave_size(results) <= 0:
+                    # 이미 충분하면 남은 요청의 응답은 기다리지 않는다.
+                    for task in pending:
+                        task.cancel()
+                    cancelled += len(pending)
+                    break
+
+        current_span().add("waves", waves)
+        current_span().add("prompts_sent", next_index)
+        current_span().add("prompts_cancelled", cancelled)
+        print(f"Sent {next_index} prompts in {waves} waves ({cancelled} cancelled)")
+        return results
+
+    def batch_stream_json_items(
+        self,
+        batch_messages: Iterable[list[ChatMessage]],
+        array_key: str,
+        on_item: Callable[[dict], None],
+        response_format: dict | None = None,
+        retry_budget: int = 0,
+        max_retries_per_prompt: int = 1,
+        ) -> list[dict | Exception]:
+        """Streaming counterpart of batch_predict_json.
+
+        `on_item` is called on the event loop thread for every complete object of `array_key`, so it must
+        not block. A prompt is retried only when it failed before emitting any item.
+        """
+        async def predict(messages: list[ChatMessage], use_cache: bool) -> dict:
+            return await self.astream_json_items(
+                messages, array_key=array_key, on_item=on_item, response_format=response_format, use_cache=use_cache
+            )
+
+        return self._run_batch(batch_messages, predict, None, retry_budget, max_retries_per_prompt, response_format)
+
+    def _run_batch(
+        self,
+        batch_messages: Iterable[list[ChatMessage]],
+        predict: Callable[[list[ChatMessage], bool], Awaitable[dict]],
+        validate: Callable[[dict], tuple[dict, bool]] | None,
+        retry_budget: int,
+        max_retries_per_prompt: int,
+        response_format: dict | None = None,
+        ) -> list[dict | Exception]:
+        """Submit prompts as the iterable yields them and collect one result or exception per submitted prompt.
+
+        Once the job deadline is too close for a prompt to finish (judged by the median latency seen so far),
+        the remaining prompts are not sent and not consumed from the iterable, so the caller can persist
+        the results it has.
+        """
+        pending = threading.BoundedSemaphore(self.max_concurrency * 2)
+        futures: list[concurrent.futures.Future] = []
+        # 모든 coroutine은 background loop 하나에서 돌기 때문에 lock 없이 budget을 나눠 쓸 수 있다.
+        budget = {"remaining": retry_budget, "used": 0}
+
+        for messages in batch_messages:
+            pending.acquire()
+            if not self._has_time_for_prompt(response_format):
+                pending.release()
+                current_span().set("deadline_reached", True)
+                print(f"Job deadline is near: not sending the prompts after the first {len(futures)}")
+                break
+            future = self.submit_coroutine(self._apredict_with_retry(messages, predict, validate, budget, max_retries_per_prompt))
+            future.add_done_callback(lambda _: pending.release())
+            futures.append(future)
+
+        results: list[dict | Exception] = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+
+        if budget["used"]:
+            print(f"Retried {budget['used']} of {len(futures)} prompts (retry budget: {retry_budget})")
+        return results
+
+    async def _apredict_json(self, messages: list[ChatMessage], use_cache: bool, response_format: dict | None) -> dict:
+        # 시간 제한은 acreate_chat_completion이 시도마다 걸기 때문에 여기서 prompt 전체에 걸지 않는다.
+        return await self.apredict_json(messages, response_format=response_format, use_cache=use_cache)
+
+    def _has_time_for_prompt(self, response_format: dict | None) -> bool:
+        remaining = remaining_seconds()
+        if remaining is None:
+            return True
+        median_latency = self._latency_tracker(response_format).quantile(0.5) or 0.0
+        return remaining > median_latency
+
+    async def _apredict_with_retry(
+        self,
+        messages: list[ChatMessage],
+        predict: Callable[[list[ChatMessage], bool], Awaitable[dict]],
+        validate: Callable[[dict], tuple[dict, bool]] | None,
+        budget: dict,
+        max_retries: int,
+        ) -> dict:
+        with span("llm.prompt") as prompt_span:
+            best_result = None
+            for attempt in range(max_retries + 1):
+                try:
+                    result = await predict(messages, attempt == 0)
+                except (InvalidLLMJsonResponseError, asyncio.TimeoutError):
+                    if not self._can_retry(attempt, max_retries, budget):
+                        if best_result is not None:
+                            return best_result
+                        raise
+                else:
+                    if validate is None:
+                        return result
+                    result, ok = validate(result)
+                    if ok or not self._can_retry(attempt, max_retries, budget):
+                        return result
+                    # 재시도도 실패하면 지금까지 검증을 통과한 일부라도 돌려준다.
+                    best_result = result
+
+                budget["remaining"] -= 1
+                budget["used"] += 1
+                prompt_span.add("retries")
+                print(f"Retrying prompt (attempt {attempt + 2}/{max_retries + 1}, retry budget left: {budget['remaining']})")
+            return best_result
+
+    @staticmethod
+    def _can_retry(attempt: int, max_retries: int, budget: dict) -> bool:
+        # 응답을 받은 뒤에 확인하고 await 없이 바로 차감해야, 동시에 실패한 prompt들이 같은 budget을 나눠 쓰지 않는다.
+        return attempt < max_retries and budget["remaining"] > 0 and not deadline_exceeded()
+
+    def run_coroutine(self, coro):
+        return self.submit_coroutine(coro).result()
+
+    def submit_coroutine(self, coro) -> concurrent.futures.Future:
+        # AsyncOpenAI의 connection pool은 처음 사용한 event loop에 묶이므로,
+        # 모든 async 호출은 이 인스턴스가 소유한 background loop 하나에서 실행한다.
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._run_loop, args=(self._loop,), name="openai-chat-llm-loop", daemon=True).start()
+        # tracing span 같은 contextvar가 호출한 thread에서 이어지도록 호출 시점의 context에서 task를 만든다.
+        return asyncio.run_coroutine_threadsafe(_run_in_context(coro, contextvars.copy_context()), self._loop)
+
+    def close(self):
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.async_client.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+        loop.close()
+
+    def predict_json(self, messages: list[ChatMessage], response_format: dict | None = None) -> dict:
+        return self.run_coroutine(self.apredict_json(messages, response_format=response_format))
+
+    def build_batch_request(self, custom_id: str, messages: list[ChatMessage], response_format: dict | None = None) -> dict:
+        """One line of a Batch API input file, equivalent to an apredict_json call."""
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {
+                "messages": [asdict(message) for message in messages],
+                **self.model_kwargs,
+                "response_format": response_format or JSON_OBJECT_RESPONSE_FORMAT,
+            },
+        }
+
+    def submit_batch(self, batch_requests: list[dict]) -> str:
+        return self.run_coroutine(self.asubmit_batch(batch_requests))
+
+    async def asubmit_batch(self, batch_requests: list[dict]) -> str:
+        if len(batch_requests) > BATCH_MAX_REQUESTS:
+            raise ValueError(f"A batch can hold at most {BATCH_MAX_REQUESTS} requests, got {len(batch_requests)}")
+
+        batch_file = "\n".join(json.dumps(request, ensure_ascii=False) for request in batch_requests).encode("utf-8")
+        input_file = await self.async_client.files.create(file=("batch.jsonl", batch_file), purpose="batch")
+        batch = await self.async_client.batches.create(
+            input_file_id=input_file.id, endpoint=BATCH_ENDPOINT, completion_window="24h"
+        )
+        return batch.id
+
+    def retrieve_batch(self, batch_id: str):
+        return self.run_coroutine(self.async_client.batches.retrieve(batch_id))
+
+    def download_batch_results(self, file_id: str) -> dict[str, dict | Exception]:
+        return self.run_coroutine(self.adownload_batch_results(file_id))
+
+    async def adownload_batch_results(self, file_id: str) -> dict[str, dict | Exception]:
+        """Parse a batch output/error file into {custom_id: parsed response or exception}."""
+        content = await self.async_client.files.content(file_id)
+
+        results: dict[str, dict | Exception] = {}
+        for line in content.text.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            response = item.get("response") or {}
+            if item.get("error") or response.get("status_code") != 200:
+                results[item["custom_id"]] = RuntimeError(f"Batch request failed: {item.get('error') or response}")
+                continue
+            try:
+                resp_content = response["body"]["choices"][0]["message"]["content"]
+                results[item["custom_id"]] = self.response_to_dict(text=resp_content)
+            except Exception as e:
+                results[item["custom_id"]] = e
+        return results
+
     def response_to_dict(self, text: str) -> dict:
         try:
             return json.loads(text)
         except json.JSONDecodeError:
-            raise InvalidLLMJsonResponseError(llm_response=text)
\ No newline at end of file
+            raise InvalidLLMJsonResponseError(llm_response=text)
+
+
+async def _run_in_context(coro, context: contextvars.Context):
+    return await asyncio.create_task(coro, context=context)
@@ -0,0 +1,163 @@
+import asyncio
+import random
+import time
+from collections.abc import Mapping
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `capacity_per_minute / 60` per second.
+
+    Reservations may drive the bucket negative; the caller then waits until the debt is refilled.
+    """
+
+    def __init__(self, capacity_per_minute: float):
+        self.capacity = float(capacity_per_minute)
+        self.available = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated_at) * self.capacity / 60)
+        self.updated_at = now
+
+    def reserve(self, amount: float) -> float:
+        """Reserve `amount` and return how many seconds the caller must wait before using it."""
+        self._refill()
+        self.available -= min(amount, self.capacity)
+        if self.available >= 0:
+            return 0.0
+        return -self.available * 60 / self.capacity
+
+    def refund(self, amount: float):
+        self._refill()
+        self.available = min(self.capacity, self.available + amount)
+
+    def sync_remaining(self, remaining: float):
+        # 서버가 알려준 남은 양이 더 적다면(다른 Lambda들도 같은 한도를 쓰는 중) 그 값에 맞춘다.
+        self._refill()
+        self.available = min(self.available, remaining)
+
+
+class RateLimiter:
+    """Client-side RPM/TPM budget, kept in line with OpenAI's `x-ratelimit-*` response headers.
+
+    A budget left as None is learned from the `x-ratelimit-limit-*` headers of the first response.
+    """
+
+    def __init__(self, requests_per_minute: int | None = None, tokens_per_minute: int | None = None):
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    async def acquire(self, tokens: int):
+        wait_seconds = 0.0
+        if self.request_bucket:
+            wait_seconds = max(wait_seconds, self.request_bucket.reserve(1))
+        if self.token_bucket:
+            wait_seconds = max(wait_seconds, self.token_bucket.reserve(tokens))
+        if wait_seconds > 0:
+            await asyncio.sleep(wait_seconds)
+
+    def settle(self, estimated_tokens: int, used_tokens: int):
+        # 요청 전에 추정해서 예약한 토큰과 실제 사용량(resp.usage)의 차이를 돌려준다.
+        if self.token_bucket and used_tokens < estimated_tokens:
+            self.token_bucket.refund(estimated_tokens - used_tokens)
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        limit_requests = _parse_float(headers.get("x-ratelimit-limit-requests"))
+        limit_tokens = _parse_float(headers.get("x-ratelimit-limit-tokens"))
+        remaining_requests = _parse_float(headers.get("x-ratelimit-remaining-requests"))
+        remaining_tokens = _parse_float(headers.get("x-ratelimit-remaining-tokens"))
+
+        if self.request_bucket is None and limit_requests:
+            self.request_bucket = TokenBucket(limit_requests)
+        if self.token_bucket is None and limit_tokens:
+            self.token_bucket = TokenBucket(limit_tokens)
+
+        if self.request_bucket and remaining_requests is not None:
+            self.request_bucket.sync_remaining(remaining_requests)
+        if self.token_bucket and remaining_tokens is not None:
+            self.token_bucket.sync_remaining(remaining_tokens)
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limit: grows by `increase_step` per window of successes, shrinks by
+    `decrease_factor` on throttling.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        increase_step: float = 1.0,
+        decrease_factor: float = 0.5,
+        decrease_cooldown: float = 1.0,
+        low_watermark: float = 0.1,
+    ):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self.low_watermark = low_watermark
+
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.last_decreased_at = 0.0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def __aexit__(self, exc_type, exc, tb):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self, headers: Mapping[str, str] | None = None):
+        if headers and _is_near_limit(headers, self.low_watermark):
+            self.on_throttle()
+            return
+        # limit개의 요청이 성공할 때마다 increase_step만큼 늘어난다.
+        self.limit = min(self.max_limit, self.limit + self.increase_step / self.limit)
+
+    def on_throttle(self):
+        # 같은 burst에서 연달아 받은 429로 limit이 한 번에 바닥까지 떨어지지 않도록 cooldown을 둔다.
+        now = time.monotonic()
+        if now - self.last_decreased_at < self.decrease_cooldown:
+            return
+        self.last_decreased_at = now
+        self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 20.0) -> float:
+    # exponential backoff with full jitter
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after_seconds(headers: Mapping[str, str] | None) -> float | None:
+    if not headers:
+        return None
+    retry_after_ms = _parse_float(headers.get("retry-after-ms"))
+    if retry_after_ms is not None:
+        return retry_after_ms / 1000
+    return _parse_float(headers.get("retry-after"))
+
+
+def _is_near_limit(headers: Mapping[str, str], low_watermark: float) -> bool:
+    for kind in ("requests", "tokens"):
+        limit = _parse_float(headers.get(f"x-ratelimit-limit-{kind}"))
+        remaining = _parse_float(headers.get(f"x-ratelimit-remaining-{kind}"))
+        if limit and remaining is not None and remaining / limit < low_watermark:
+            return True
+    return False
+
+
+def _parse_float(value: str | None) -> float | None:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
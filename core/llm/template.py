@@ -0,0 +1,60 @@
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+from core.llm.openai import ChatMessage
+from core.llm.utils import load_prompt_messages
+
+
+# Lambda(/var/task/core/llm/prompts)와 로컬 실행 모두 이 파일 기준으로 prompt 경로를 찾는다.
+PROMPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompts")
+SUPPORTED_LANGUAGES = ("en", "ko")
+DEFAULT_LANGUAGE = "en"
+
+_PLACEHOLDER_PATTERN = re.compile(r"\{\{\$(\w+)\}\}")
+
+
+@dataclass(frozen=True)
+class CompiledMessage:
+    role: str
+    # literal 조각 사이사이에 placeholder가 들어간다. len(parts) == len(placeholders) + 1
+    parts: tuple[str, ...]
+    placeholders: tuple[str, ...]
+
+    def render(self, values: dict[str, str]) -> str:
+        if not self.placeholders:
+            return self.parts[0]
+
+        pieces = [self.parts[0]]
+        for name, part in zip(self.placeholders, self.parts[1:]):
+            # 값이 주어지지 않은 placeholder는 fill_message_placeholders처럼 그대로 남긴다.
+            pieces.append(str(values[name]) if name in values else "{{$%s}}" % name)
+            pieces.append(part)
+        return "".join(pieces)
+
+
+class PromptTemplate:
+    """Prompt messages pre-split at their `{{$name}}` placeholders."""
+
+    def __init__(self, messages: list[ChatMessage]):
+        self.messages = messages
+        self.compiled_messages = [_compile_message(message) for message in messages]
+
+    def render(self, **values: str) -> list[ChatMessage]:
+        return [ChatMessage(role=message.role, content=message.render(values)) for message in self.compiled_messages]
+
+
+def _compile_message(message: ChatMessage) -> CompiledMessage:
+    # re.split은 capture group을 결과에 끼워 넣으므로 짝수 index는 literal, 홀수 index는 placeholder 이름이다.
+    tokens = _PLACEHOLDER_PATTERN.split(message.content)
+    return CompiledMessage(role=message.role, parts=tuple(tokens[0::2]), placeholders=tuple(tokens[1::2]))
+
+
+@lru_cache(maxsize=None)
+def get_prompt_template(task: str, language: str) -> PromptTemplate:
+    """Compiled prompt for `task` ("quiz" | "document_data") in `language`, loaded once per container."""
+    if language not in SUPPORTED_LANGUAGES:
+        language = DEFAULT_LANGUAGE
+    prompt_path = os.path.join(PROMPTS_DIR, f"generate_{language}_{task}.txt")
+    return PromptTemplate(load_prompt_messages(prompt_path=prompt_path))
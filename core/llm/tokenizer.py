@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from core.llm.openai import ChatMessage
+
+# chat format이 메시지마다 붙이는 role/구분자 토큰
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_PRIMING_TOKENS = 3
+# gpt-4o, gpt-4o-mini가 사용하는 encoding
+TIKTOKEN_ENCODING_NAME = "o200k_base"
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if _encoding_loaded:
+        return _encoding
+    # 여러 thread가 처음 토큰을 세더라도 한 번만 불러오고, 불러오기가 끝난 뒤에야 loaded로 표시한다.
+    with _encoding_lock:
+        if not _encoding_loaded:
+            _encoding = _load_encoding()
+            _encoding_loaded = True
+    return _encoding
+
+
+def _load_encoding():
+    # tiktoken은 import 비용이 커서 처음 토큰을 셀 때 불러온다.
+    try:
+        import tiktoken
+    except ImportError:
+        logging.warning("tiktoken is not installed: token counts fall back to estimate_tokens")
+        return None
+    try:
+        return tiktoken.get_encoding(TIKTOKEN_ENCODING_NAME)
+    except Exception as e:
+        # encoding 파일을 받을 수 없는 환경이면 근사치로 대신한다.
+        logging.warning(f"Failed to load tiktoken encoding, token counts fall back to estimate_tokens: {e}")
+        return None
+
+
+async def aload_encoding():
+    """Load the encoding on a worker thread, so that the first count_tokens on an event loop does not block it.
+
+    The first load imports tiktoken and may download the encoding file.
+    """
+    if not _encoding_loaded:
+        await asyncio.to_thread(_get_encoding)
+
+
+def count_tokens(text: str) -> int:
+    """Exact token count with tiktoken, or estimate_tokens if its encoding cannot be loaded."""
+    encoding = _get_encoding()
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def estimate_tokens(text: str) -> int:
+    # 영어는 대략 4글자당 1토큰, 한글 등 non-ascii 문자는 대략 1글자당 1토큰
+    ascii_count = sum(1 for char in text if char.isascii())
+    non_ascii_count = len(text) - ascii_count
+    return ascii_count // 4 + non_ascii_count + 1
+
+
+def estimate_message_tokens(messages: list["ChatMessage"]) -> int:
+    return sum(count_tokens(message.content) + MESSAGE_OVERHEAD_TOKENS for message in messages) + REPLY_PRIMING_TOKENS
@@ -1,5 +1,15 @@
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+
 from core.llm.openai import ChatMessage
-from langchain_text_splitters import MarkdownHeaderTextSplitter, RecursiveCharacterTextSplitter 
+from core.llm.tokenizer import count_tokens, estimate_message_tokens
+
+
+CONTENT_CHUNK_SIZE = 1000 # 2000 ~ 3000
+CONTENT_CHUNK_OVERLAP = 150 # 100 ~ 200
+CONTENT_SEPARATORS = ["\n\n", "\n", ".", " "]
+# iter_content_splits가 chunk를 그대로 유지할 수 있는 경계를 찾지 못해도 buffer를 window_size의 이 배수까지만 키운다.
+MAX_STREAM_WINDOWS = 8
 
 
 def load_prompt_messages(prompt_path: str) -> list[ChatMessage]:
@@ -30,24 +40,231 @@ def fill_message_placeholders(messages: list[ChatMessage], placeholders: dict[st
 
     return messages
 
-def content_splitter(content: str) -> list[str]:
-    content_splits: list[str] = []
-
-    chunk_size = 1000 # 2000 ~ 3000
-    chunk_overlap = 150 # 100 ~ 200
-    separators=["\n\n", "\n", ".", " "]
+def content_splitter(content: str, length_function: Callable[[str], int] = len) -> list[str]:
+    """Split content into overlapping chunks.
 
-    character_text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size, chunk_overlap=chunk_overlap, separators=separators
+    Pass `length_function=estimate_tokens` to measure chunk_size/overlap in tokens instead of characters.
+    """
+    return split_text(
+        content,
+        chunk_size=CONTENT_CHUNK_SIZE,
+        chunk_overlap=CONTENT_CHUNK_OVERLAP,
+        separators=CONTENT_SEPARATORS,
+        length_function=length_function,
     )
-    
-    character_text_splits = character_text_splitter.split_text(content)
-    for content_split in character_text_splits:
-        content_splits.append(content_split)
 
-    return content_splits
+
+def split_text(
+    text: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    separators: list[str],
+    length_function: Callable[[str], int] = len,
+) -> list[str]:
+    """Dependency-free equivalent of LangChain's RecursiveCharacterTextSplitter.split_text.
+
+    Produces the same chunks as RecursiveCharacterTextSplitter(keep_separator=True, strip_whitespace=True)
+    but measures every piece once and pops the overlap window from a deque, so it runs in linear time.
+    """
+    chunks: list[str] = []
+    _split_recursive(text, separators, chunk_size, chunk_overlap, length_function, chunks)
+    return chunks
+
+
+def _split_recursive(
+    text: str,
+    separators: list[str],
+    chunk_size: int,
+    chunk_overlap: int,
+    length_function: Callable[[str], int],
+    chunks: list[str],
+):
+    separator = separators[-1]
+    next_separators: list[str] = []
+    for i, candidate in enumerate(separators):
+        if candidate == "":
+            separator = candidate
+            break
+        if candidate in text:
+            separator = candidate
+            next_separators = separators[i + 1:]
+            break
+
+    good_splits: list[tuple[str, int]] = []
+    for split in _split_keep_separator(text, separator):
+        split_length = length_function(split)
+        if split_length < chunk_size:
+            good_splits.append((split, split_length))
+            continue
+
+        if good_splits:
+            _merge_splits(good_splits, chunk_size, chunk_overlap, chunks)
+            good_splits = []
+        if not next_separators:
+            chunks.append(split)
+        else:
+            _split_recursive(split, next_separators, chunk_size, chunk_overlap, length_function, chunks)
+
+    if good_splits:
+        _merge_splits(good_splits, chunk_size, chunk_overlap, chunks)
+
+
+def _split_keep_separator(text: str, separator: str) -> list[str]:
+    # separator는 뒤 조각의 앞에 붙인다. (keep_separator="start")
+    if not separator:
+        return list(text)
+    parts = text.split(separator)
+    splits = [parts[0]] + [separator + part for part in parts[1:]]
+    return [split for split in splits if split != ""]
+
+
+def _merge_splits(splits: list[tuple[str, int]], chunk_size: int, chunk_overlap: int, chunks: list[str]):
+    # separator는 이미 조각에 붙어 있으므로 조각들은 ""로 이어 붙인다.
+    current: deque[tuple[str, int]] = deque()
+    total = 0
+    for split, split_length in splits:
+        if total + split_length > chunk_size:
+            if current:
+                _append_chunk("".join(piece for piece, _ in current), chunks)
+                while total > chunk_overlap or (total + split_length > chunk_size and total > 0):
+                    total -= current.popleft()[1]
+        current.append((split, split_length))
+        total += split_length
+
+    _append_chunk("".join(piece for piece, _ in current), chunks)
+
+
+def _append_chunk(chunk: str, chunks: list[str]):
+    chunk = chunk.strip()
+    if chunk:
+        chunks.append(chunk)
+
+
+def packed_content_splitter(
+    content: str,
+    prompt_messages: list[ChatMessage],
+    token_budget: int,
+    chunk_overlap: int = 30,
+    length_function: Callable[[str], int] = count_tokens,
+) -> list[str]:
+    """Pack whole paragraphs into chunks so that each request uses up to `token_budget` prompt tokens.
+
+    The prompt's fixed overhead is subtracted from the budget. Chunks only overlap (by `chunk_overlap`
+    tokens) where a single paragraph is longer than the budget and has to be split.
+    """
+    chunk_tokens = token_budget - prompt_overhead_tokens(prompt_messages)
+    if chunk_tokens <= 0:
+        raise ValueError(f"token_budget {token_budget} does not cover the prompt overhead")
+
+    chunks: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+
+    for paragraph in _split_keep_separator(content, CONTENT_SEPARATORS[0]):
+        paragraph_tokens = length_function(paragraph)
+
+        if paragraph_tokens > chunk_tokens:
+            _append_chunk("".join(current), chunks)
+            current, current_tokens = [], 0
+            chunks.extend(split_text(paragraph, chunk_tokens, chunk_overlap, CONTENT_SEPARATORS[1:], length_function))
+            continue
+
+        if current_tokens + paragraph_tokens > chunk_tokens:
+            _append_chunk("".join(current), chunks)
+            current, current_tokens = [], 0
+        current.append(paragraph)
+        current_tokens += paragraph_tokens
+
+    _append_chunk("".join(current), chunks)
+    return chunks
+
+
+def prompt_overhead_tokens(prompt_messages: list[ChatMessage]) -> int:
+    return estimate_message_tokens(fill_message_placeholders(prompt_messages, {"note": ""}))
+
+
+def estimate_chunking_cost(content: str, prompt_messages: list[ChatMessage], chunks: list[str]) -> dict:
+    """Expected LLM calls and prompt tokens for sending `chunks` with `prompt_messages`."""
+    overhead = prompt_overhead_tokens(prompt_messages)
+    chunk_tokens = sum(count_tokens(chunk) for chunk in chunks)
+    return {
+        "calls": len(chunks),
+        "prompt_tokens": overhead * len(chunks) + chunk_tokens,
+        "prompt_overhead_tokens": overhead * len(chunks),
+        "duplicated_content_tokens": max(0, chunk_tokens - count_tokens(content)),
+    }
+
+
+def iter_content_splits(
+    text_stream: Iterable[str],
+    window_size: int = 16_000,
+    splitter: Callable[[str], list[str]] = content_splitter,
+) -> Iterator[str]:
+    """Split a stream of text pieces with `splitter` while holding only about `window_size` characters.
+
+    The chunks are the same as `splitter(whole text)`: the buffer is only cut at a paragraph boundary where
+    `splitter` starts a new chunk without overlap. If no such boundary turns up within
+    `MAX_STREAM_WINDOWS * window_size` characters, the buffer is cut at the start of its last chunk instead,
+    which bounds memory but may split differently around that point.
+    `splitter` must return stripped substrings of its input, as content_splitter and packed_content_splitter do.
+    """
+    buffer = ""
+    for text in text_stream:
+        buffer += text
+        if len(buffer) < window_size:
+            continue
+
+        cut = _find_split_restart(buffer, splitter)
+        if cut is not None:
+            yield from splitter(buffer[:cut])
+            buffer = buffer[cut:]
+            continue
+        if len(buffer) < window_size * MAX_STREAM_WINDOWS:
+            continue
+
+        splits = splitter(buffer)
+        if len(splits) < 2:
+            continue
+
+        # 마지막 chunk는 뒤에 올 text와 이어질 수 있으므로 그 시작 위치부터 buffer에 남긴다.
+        # 마지막 chunk는 앞 chunk와의 overlap을 이미 포함하고 있어 overlap도 유지된다.
+        last_start = buffer.rfind(splits[-1])
+        yield from splits[:-1]
+        buffer = buffer[last_start:]
+
+    if buffer:
+        yield from splitter(buffer)
+
+
+def _find_split_restart(buffer: str, splitter: Callable[[str], list[str]], max_candidates: int = 8) -> int | None:
+    """The last paragraph boundary in `buffer` where splitting the two halves separately gives the same chunks."""
+    separator = CONTENT_SEPARATORS[0]
+    # str.split과 같은 위치를 찾도록 앞에서부터 겹치지 않게 찾는다.
+    boundaries = []
+    position = buffer.find(separator)
+    while position != -1:
+        if position > 0:
+            boundaries.append(position)
+        position = buffer.find(separator, position + len(separator))
+
+    splits = None
+    # 마지막 경계 뒤의 문단은 아직 덜 들어왔을 수 있어, 다음 문단이 온전히 들어온 경계만 본다.
+    for cut in reversed(boundaries[-max_candidates - 1:-1]):
+        head = splitter(buffer[:cut])
+        if not head:
+            continue
+        if splits is None:
+            splits = splitter(buffer)
+        # 앞 chunk와 겹치지 않고 새 chunk가 시작되는 곳이어야, 뒤쪽을 따로 나눠도 전체를 나눈 것과 같다.
+        if splits[:len(head)] == head and splits[len(head):] == splitter(buffer[cut:]):
+            return cut
+    return None
+
 
 def markdown_content_splitter(content: str) -> list[str]:
+    # langchain은 import 비용이 커서 이 함수에서만 불러온다.
+    from langchain_text_splitters import MarkdownHeaderTextSplitter, RecursiveCharacterTextSplitter
+
     content_splits: list[str] = []
 
     headers_to_split_on = [
@@ -1,6 +1,13 @@
+import codecs
+from collections.abc import Iterator
 from dataclasses import dataclass
 
-import boto3
+from typing import TYPE_CHECKING
+
+from core.tracing.tracer import span
+
+if TYPE_CHECKING:
+    from botocore.response import StreamingBody
 
 
 @dataclass
@@ -12,9 +19,38 @@ class BucketObject:
         return self.content_bytes.decode("utf-8")
 
 
+@dataclass
+class StreamingBucketObject:
+    body: "StreamingBody"
+    content_length: int
+    metadata: dict | None = None
+
+    def read(self) -> BucketObject:
+        with span("s3.read_body", bytes=self.content_length):
+            return BucketObject(content_bytes=self.body.read(), metadata=self.metadata)
+
+    def iter_content_str(self, chunk_size: int = 64 * 1024) -> Iterator[str]:
+        # chunk 경계에서 잘린 multibyte 문자는 incremental decoder가 다음 chunk와 이어서 decode한다.
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        try:
+            for chunk in self.body.iter_chunks(chunk_size=chunk_size):
+                text = decoder.decode(chunk)
+                if text:
+                    yield text
+            text = decoder.decode(b"", final=True)
+            if text:
+                yield text
+        finally:
+            self.body.close()
+
+
 class S3Client:
     def __init__(self, access_key: str, secret_key: str, region_name: str, bucket_name: str):
-        self.client = boto3.client(
+        # boto3는 import 비용이 커서 client를 만들 때 불러온다.
+        import boto3
+
+        # boto3의 default session은 thread-safe하지 않으므로 client마다 session을 따로 만든다.
+        self.client = boto3.session.Session().client(
             "s3", aws_access_key_id=access_key, aws_secret_access_key=secret_key, region_name=region_name
         )
         self.bucket_name = bucket_name
@@ -29,7 +65,17 @@ class S3Client:
         self.client.put_object(**params)
 
     def get_object(self, key: str) -> BucketObject:
-        file_obj = self.client.get_object(Bucket=self.bucket_name, Key=key)
-        content_bytes: bytes = file_obj["Body"].read()
+        with span("s3.get_object", key=key) as s3_span:
+            file_obj = self.client.get_object(Bucket=self.bucket_name, Key=key)
+            content_bytes: bytes = file_obj["Body"].read()
+            s3_span.add("bytes", len(content_bytes))
         metadata: dict[str, bytes] = file_obj.get("Metadata", {})
         return BucketObject(content_bytes=content_bytes, metadata=metadata)
+
+    def open_object(self, key: str) -> StreamingBucketObject:
+        """Start a GET without reading the body, so large objects can be consumed incrementally."""
+        with span("s3.open_object", key=key) as s3_span:
+            file_obj = self.client.get_object(Bucket=self.bucket_name, Key=key)
+            s3_span.add("bytes", file_obj["ContentLength"])
+        metadata: dict[str, bytes] = file_obj.get("Metadata", {})
+        return StreamingBucketObject(body=file_obj["Body"], content_length=file_obj["ContentLength"], metadata=metadata)
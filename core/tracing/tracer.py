@@ -0,0 +1,128 @@
+import contextvars
+import functools
+import inspect
+import json
+import os
+import sys
+import time
+import uuid
+
+
+# "" (끄기) | "json": span마다 구조화된 JSON 로그 한 줄 | "emf": CloudWatch Embedded Metric Format
+TRACING_MODE = os.environ.get("PICKTOSS_TRACING", "")
+EMF_NAMESPACE = os.environ.get("PICKTOSS_TRACING_NAMESPACE", "Picktoss/LLMWorker")
+
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar("picktoss_current_span", default=None)
+
+
+class Span:
+    """One timed stage. `set` records a property, `add` accumulates a numeric metric (tokens, retries, rows)."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes", "metrics", "error", "_start", "_token")
+
+    def __init__(self, name: str, attributes: dict):
+        parent = _current_span.get()
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.metrics: dict[str, float] = {}
+        self.error: str | None = None
+
+    def set(self, key: str, value):
+        self.attributes[key] = value
+
+    def add(self, key: str, amount: float = 1):
+        self.metrics[key] = self.metrics.get(key, 0) + amount
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = (time.perf_counter() - self._start) * 1000
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        _emit(self, duration_ms)
+        return False
+
+
+class _NoopSpan:
+    """Returned while tracing is disabled, so instrumented code pays for one function call and nothing else."""
+
+    __slots__ = ()
+
+    def set(self, key: str, value):
+        pass
+
+    def add(self, key: str, amount: float = 1):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, **attributes) -> Span | _NoopSpan:
+    if not TRACING_MODE:
+        return NOOP_SPAN
+    return Span(name, attributes)
+
+
+def current_span() -> Span | _NoopSpan:
+    return _current_span.get() or NOOP_SPAN
+
+
+def traced(name: str):
+    """Decorator form of `span`. Functions are left untouched when tracing is disabled at import time."""
+    def decorator(func):
+        if not TRACING_MODE:
+            return func
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with Span(name, {}):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with Span(name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def _emit(span: Span, duration_ms: float):
+    record = {
+        "span": span.name,
+        "trace_id": span.trace_id,
+        "span_id": span.span_id,
+        "parent_id": span.parent_id,
+        "duration_ms": round(duration_ms, 3),
+        **span.attributes,
+        **span.metrics,
+    }
+    if span.error:
+        record["error"] = span.error
+
+    if TRACING_MODE == "emf":
+        metrics = [{"Name": "duration_ms", "Unit": "Milliseconds"}]
+        metrics += [{"Name": key, "Unit": "Milliseconds" if key.endswith("_ms") else "Count"} for key in span.metrics]
+        record["_aws"] = {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{"Namespace": EMF_NAMESPACE, "Dimensions": [["span"]], "Metrics": metrics}],
+        }
+
+    # 여러 thread가 동시에 써도 한 줄이 섞이지 않도록 write 한 번으로 내보낸다.
+    sys.stdout.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
@@ -0,0 +1,65 @@
+import pytest
+
+from bench.bench_handler_startup import DUMMY_ENV
+from bench.fakes import FakeDiscordServer, FakeOpenAIServer, FakeS3Client
+from bench.sqlite_database_manager import SQLiteDatabaseManager
+
+
+@pytest.fixture
+def openai_server(monkeypatch):
+    server = FakeOpenAIServer(latency=0.01, latency_jitter=0.0).start()
+    monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def discord_server():
+    server = FakeDiscordServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def db_path(tmp_path) -> str:
+    return str(tmp_path / "worker.sqlite3")
+
+
+@pytest.fixture
+def db_manager(db_path):
+    db_manager = SQLiteDatabaseManager(db_path)
+    yield db_manager
+    db_manager.close()
+
+
+@pytest.fixture
+def clients(monkeypatch, openai_server, discord_server):
+    """Fakes registered in worker.clients' registry, the way bench_end_to_end wires them."""
+    for key, value in DUMMY_ENV.items():
+        monkeypatch.setenv(key, value)
+    from core.discord.discord_client import DiscordClient
+    from core.llm.openai import OpenAIChatLLM
+    from worker.clients import registry
+
+    s3_client = FakeS3Client()
+    registry.get("s3", lambda: s3_client)
+    registry.get("discord", lambda: DiscordClient(channel_id="0", bot_token="test", base_url=discord_server.base_url))
+    registry.get("chat_llm", lambda: OpenAIChatLLM(api_key="test", hedge_requests=False))
+    yield registry
+    registry.close()
+
+
+@pytest.fixture
+def seed_document(db_manager, clients):
+    """Make a WAITING document with its note in S3 and a member with stars, and return its job message."""
+    def seed(db_pk: int, content: str, language: str = "en") -> dict:
+        s3_key = f"test/{db_pk}.txt"
+        clients.peek("s3").upload_bytes_obj(content.encode("utf-8"), s3_key)
+        db_manager.execute_query("INSERT INTO document (id, language) VALUES (%s, %s)", (db_pk, language))
+        db_manager.execute_query("INSERT INTO outbox (document_id, status) VALUES (%s, 'WAITING')", (db_pk,))
+        db_manager.execute_query("INSERT INTO star (member_id, star) VALUES (%s, 100)", (db_pk,))
+        db_manager.commit()
+        return {"s3_key": s3_key, "db_pk": db_pk, "star_count": 5, "member_id": db_pk}
+
+    return seed
+
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+import worker.batch_worker as batch_worker
+from bench.corpus import make_corpus
+from bench.sqlite_database_manager import SQLiteDatabaseManager
+
+
+@pytest.fixture
+def jobs_path(tmp_path, seed_document) -> str:
+    jobs = [seed_document(1, make_corpus("en", 4000, seed=1)), seed_document(2, make_corpus("ko", 4000, seed=2), language="ko")]
+    path = tmp_path / "jobs.jsonl"
+    path.write_text("\n".join(json.dumps(job) for job in jobs), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def sqlite_db(monkeypatch, db_path):
+    monkeypatch.setattr(batch_worker, "create_db_manager", lambda: SQLiteDatabaseManager(db_path))
+
+
+def latest_quiz_counts(db_manager) -> dict[int, int]:
+    rows = db_manager.execute_query("SELECT document_id, COUNT(*) AS count FROM quiz WHERE is_latest = true GROUP BY document_id")
+    return {row["document_id"]: row["count"] for row in rows}
+
+
+def test_batch_is_submitted_polled_downloaded_and_persisted(openai_server, db_manager, jobs_path, tmp_path):
+    openai_server.batch_polls = 2
+    state_path = str(tmp_path / "state.json")
+
+    batch_worker.run_quiz_batch(jobs_path, state_path, poll_interval=0.01)
+
+    assert len(openai_server.batches) == 1
+    # 두 번은 in_progress, 세 번째에 completed
+    assert openai_server.batch_retrievals == 3
+    counts = latest_quiz_counts(db_manager)
+    assert set(counts) == {1, 2} and all(count > 0 for count in counts.values())
+    statuses = db_manager.execute_query("SELECT quiz_generation_status AS status FROM document ORDER BY id")
+    assert [row["status"] for row in statuses] == ["PROCESSED", "PROCESSED"]
+    assert db_manager.execute_query("SELECT * FROM outbox") == []
+
+    with open(state_path, encoding="utf-8") as f:
+        state = json.load(f)
+    assert sorted(state["persisted"]) == ["1", "2"]
+
+
+def test_failed_batch_requests_are_stored_as_partial_success(openai_server, db_manager, jobs_path, tmp_path):
+    openai_server.error_rate = 0.3
+
+    batch_worker.run_quiz_batch(jobs_path, str(tmp_path / "state.json"), poll_interval=0.01)
+
+    statuses = {row["status"] for row in db_manager.execute_query("SELECT quiz_generation_status AS status FROM document")}
+    assert "PARTIAL_SUCCESS" in statuses
+    assert db_manager.execute_query("SELECT * FROM outbox") == []
+
+
+def test_restart_while_polling_resumes_the_submitted_batch(monkeypatch, openai_server, db_manager, jobs_path, tmp_path):
+    state_path = str(tmp_path / "state.json")
+    wait_for_batch = batch_worker._wait_for_batch
+
+    def crash(batch_id, poll_interval):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(batch_worker, "_wait_for_batch", crash)
+    with pytest.raises(KeyboardInterrupt):
+        batch_worker.run_quiz_batch(jobs_path, state_path, poll_interval=0.01)
+
+    with open(state_path, encoding="utf-8") as f:
+        state = json.load(f)
+    assert state["batch_id"] in openai_server.batches
+    assert state["persisted"] == []
+
+    monkeypatch.setattr(batch_worker, "_wait_for_batch", wait_for_batch)
+    batch_worker.run_quiz_batch(jobs_path, state_path, poll_interval=0.01)
+
+    # 다시 제출하지 않고 처음 batch의 결과를 저장한다.
+    assert len(openai_server.batches) == 1
+    assert set(latest_quiz_counts(db_manager)) == {1, 2}
+
+
+def test_restart_while_persisting_skips_documents_already_stored(monkeypatch, openai_server, db_manager, jobs_path, tmp_path):
+    state_path = str(tmp_path / "state.json")
+    persist_document = batch_worker._persist_document
+
+    def persist_then_crash(db_pk, *args):
+        if db_pk == 2:
+            raise KeyboardInterrupt
+        persist_document(db_pk, *args)
+
+    monkeypatch.setattr(batch_worker, "_persist_document", persist_then_crash)
+    with pytest.raises(KeyboardInterrupt):
+        batch_worker.run_quiz_batch(jobs_path, state_path, poll_interval=0.01)
+    first_counts = latest_quiz_counts(db_manager)
+    assert set(first_counts) == {1}
+
+    monkeypatch.setattr(batch_worker, "_persist_document", persist_document)
+    batch_worker.run_quiz_batch(jobs_path, state_path, poll_interval=0.01)
+
+    counts = latest_quiz_counts(db_manager)
+    assert counts[1] == first_counts[1]
+    assert counts[2] > 0
+    assert db_manager.execute_query("SELECT COUNT(*) AS count FROM quiz")[0]["count"] == sum(counts.values())
+    assert len(openai_server.batches) == 1
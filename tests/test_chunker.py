@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from bench.corpus import EN_WORDS, KO_WORDS, make_corpus
+from core.llm.tokenizer import estimate_tokens
+from core.llm.utils import CONTENT_CHUNK_OVERLAP, CONTENT_CHUNK_SIZE, CONTENT_SEPARATORS, content_splitter, split_text
+
+text_splitters = pytest.importorskip("langchain_text_splitters")
+
+
+def langchain_split_text(text: str, chunk_size: int, chunk_overlap: int, separators: list[str], length_function=len) -> list[str]:
+    splitter = text_splitters.RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap, separators=separators, length_function=length_function
+    )
+    return splitter.split_text(text)
+
+
+def random_text(rng: random.Random, size: int) -> str:
+    # 구분자가 몰려 있거나 아예 없는 구간, 공백만 있는 줄처럼 경계가 까다로운 조각을 섞는다.
+    pieces = KO_WORDS + EN_WORDS + ["\n\n", "\n", ".", " ", "  ", "\n \n", "...", "가나다라마바사아자차카타파하" * 10]
+    return "".join(rng.choices(pieces, k=size))
+
+
+@pytest.mark.parametrize("language", ["en", "ko"])
+@pytest.mark.parametrize("seed", range(5))
+def test_content_splitter_matches_langchain_on_notes(language, seed):
+    corpus = make_corpus(language, 100_000, seed=seed)
+
+    expected = langchain_split_text(corpus, CONTENT_CHUNK_SIZE, CONTENT_CHUNK_OVERLAP, CONTENT_SEPARATORS)
+
+    assert content_splitter(corpus) == expected
+
+
+@pytest.mark.parametrize("language", ["en", "ko"])
+def test_content_splitter_matches_langchain_in_tokens(language):
+    corpus = make_corpus(language, 50_000, seed=7)
+
+    expected = langchain_split_text(corpus, CONTENT_CHUNK_SIZE, CONTENT_CHUNK_OVERLAP, CONTENT_SEPARATORS, estimate_tokens)
+
+    assert content_splitter(corpus, length_function=estimate_tokens) == expected
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_split_text_matches_langchain_on_random_input(seed):
+    rng = random.Random(seed)
+    text = random_text(rng, rng.randint(0, 400))
+    chunk_size = rng.randint(5, 300)
+    chunk_overlap = rng.randint(0, chunk_size - 1)
+    separators = rng.sample(CONTENT_SEPARATORS, k=rng.randint(1, len(CONTENT_SEPARATORS)))
+    if rng.random() < 0.3:
+        separators.append("")
+
+    expected = langchain_split_text(text, chunk_size, chunk_overlap, separators)
+
+    assert split_text(text, chunk_size, chunk_overlap, separators) == expected
@@ -0,0 +1,126 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from app.job.outbox import claim_outbox, complete_outbox, release_outbox
+from bench.fakes import FakeSQSClient
+from bench.sqlite_database_manager import SQLiteDatabaseManager
+from worker.consumer import SQSConsumer
+
+
+QUEUE_URL = "https://sqs.local/picktoss-llm-worker"
+
+
+def fake_process_record(record: dict, context, worker_id: str | None = None) -> dict:
+    """Claims and completes the outbox row like process_record, without S3 or OpenAI."""
+    body = json.loads(record["body"])
+    db_manager = SQLiteDatabaseManager(os.environ["CONSUMER_TEST_DB"])
+    try:
+        if not claim_outbox(db_manager, body["db_pk"], worker_id):
+            return {"StatusCode": 200, "message": "Outbox is missing or already being processed."}
+        if body.get("hang") and os.environ.get("CONSUMER_TEST_HANG"):
+            time.sleep(3600)
+        if body.get("fail"):
+            release_outbox(db_manager, body["db_pk"], worker_id)
+            raise RuntimeError("boom")
+        complete_outbox(db_manager, body["db_pk"], worker_id)
+        db_manager.commit()
+        return {"statusCode": 200}
+    finally:
+        db_manager.close()
+
+
+def install_fake_process_record():
+    """Process initializer: run the consumer's jobs with fake_process_record."""
+    import worker.worker as worker_module
+
+    worker_module.process_record = fake_process_record
+
+
+@pytest.fixture
+def outbox_db(monkeypatch, db_path, db_manager):
+    # spawn된 worker process는 시작할 때의 환경 변수를 물려받는다.
+    monkeypatch.setenv("CONSUMER_TEST_DB", db_path)
+    for db_pk in range(5):
+        db_manager.execute_query("INSERT INTO outbox (document_id, status) VALUES (%s, 'WAITING')", (db_pk,))
+    db_manager.commit()
+    return db_manager
+
+
+def start_consumer(sqs_client: FakeSQSClient, db_path: str, **kwargs) -> tuple[SQSConsumer, threading.Thread]:
+    consumer = SQSConsumer(
+        sqs_client=sqs_client,
+        queue_url=QUEUE_URL,
+        processes=1,
+        threads_per_process=2,
+        wait_time_seconds=0,
+        process_initializer=install_fake_process_record,
+        db_manager_factory=lambda: SQLiteDatabaseManager(db_path),
+        **kwargs,
+    )
+    # main thread가 아니면 run()이 signal handler를 바꾸지 않는다. 종료가 막혀도 pytest는 끝나도록 daemon으로 띄운다.
+    thread = threading.Thread(target=consumer.run, daemon=True)
+    thread.start()
+    return consumer, thread
+
+
+def send(sqs_client: FakeSQSClient, **body) -> str:
+    return sqs_client.send_message(QueueUrl=QUEUE_URL, MessageBody=json.dumps(body))["MessageId"]
+
+
+def wait_until(condition, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.05)
+
+
+def outbox_rows(db_manager) -> dict[int, str]:
+    return {row["document_id"]: row["status"] for row in db_manager.execute_query("SELECT document_id, status FROM outbox")}
+
+
+def test_succeeded_messages_are_deleted_and_failed_ones_are_kept(outbox_db, db_path):
+    sqs_client = FakeSQSClient()
+    succeeded = [send(sqs_client, db_pk=i) for i in range(3)]
+    failed = send(sqs_client, db_pk=3, fail=True)
+
+    consumer, thread = start_consumer(sqs_client, db_path, failure_visibility_timeout=600)
+    wait_until(lambda: consumer.succeeded + consumer.failed == 4)
+    consumer.stop()
+    thread.join(timeout=30)
+
+    assert not thread.is_alive()
+    assert (consumer.succeeded, consumer.failed) == (3, 1)
+    assert list(sqs_client.messages) == [failed]
+    assert all(message_id not in sqs_client.messages for message_id in succeeded)
+    # 실패한 메시지는 failure_visibility_timeout이 지난 뒤에 다시 보인다.
+    assert sqs_client.messages[failed].visible_at > time.monotonic() + 500
+    assert outbox_rows(outbox_db) == {3: "WAITING", 4: "WAITING"}
+
+
+def test_job_killed_at_shutdown_is_processed_after_redelivery(monkeypatch, outbox_db, db_path):
+    sqs_client = FakeSQSClient()
+    message_id = send(sqs_client, db_pk=1, hang=True)
+
+    monkeypatch.setenv("CONSUMER_TEST_HANG", "1")
+    consumer, thread = start_consumer(sqs_client, db_path, shutdown_timeout=0.5)
+    wait_until(lambda: message_id in consumer._in_flight and consumer._in_flight[message_id].worker_id is not None)
+    consumer.stop()
+    thread.join(timeout=30)
+
+    assert not thread.is_alive()
+    # 강제로 끝난 job의 lease를 풀고 메시지를 바로 다시 보이게 한다.
+    assert outbox_rows(outbox_db)[1] == "WAITING"
+    assert sqs_client.visible_count() == 1
+
+    monkeypatch.delenv("CONSUMER_TEST_HANG")
+    consumer, thread = start_consumer(sqs_client, db_path)
+    wait_until(lambda: consumer.succeeded == 1)
+    consumer.stop()
+    thread.join(timeout=30)
+
+    assert sqs_client.messages == {}
+    assert 1 not in outbox_rows(outbox_db)
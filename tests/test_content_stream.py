@@ -0,0 +1,95 @@
+import random
+from functools import partial
+
+import pytest
+
+from bench.corpus import make_corpus
+from bench.fakes import FakeStreamingBody
+from core.llm.template import get_prompt_template
+from core.llm.utils import content_splitter, iter_content_splits, packed_content_splitter
+from core.s3.s3_client import StreamingBucketObject
+
+
+def bucket_object(content: str) -> StreamingBucketObject:
+    data = content.encode("utf-8")
+    return StreamingBucketObject(body=FakeStreamingBody(data), content_length=len(data))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 64])
+def test_multibyte_characters_split_across_reads_are_decoded(chunk_size):
+    # 2, 3, 4 byte UTF-8 문자가 read 경계에 걸리도록 chunk_size를 작게 잡는다.
+    content = "é한글 노트 😀 mixed ü" * 20 + "끝"
+
+    pieces = list(bucket_object(content).iter_content_str(chunk_size=chunk_size))
+
+    assert "".join(pieces) == content
+    assert all("�" not in piece for piece in pieces)
+
+
+def test_every_split_position_of_a_four_byte_character_is_decoded():
+    content = "a😀b"
+    data = content.encode("utf-8")
+    for cut in range(1, len(data)):
+        body = FakeStreamingBody(data)
+        body.iter_chunks = lambda chunk_size, data=data, cut=cut: iter([data[:cut], data[cut:]])
+        obj = StreamingBucketObject(body=body, content_length=len(data))
+
+        assert "".join(obj.iter_content_str()) == content
+
+
+def test_body_is_closed_after_reading():
+    obj = bucket_object("note")
+
+    list(obj.iter_content_str())
+
+    assert obj.body.closed
+
+
+def random_pieces(content: str, rng: random.Random, max_size: int) -> list[str]:
+    pieces, start = [], 0
+    while start < len(content):
+        size = rng.randint(1, max_size)
+        pieces.append(content[start:start + size])
+        start += size
+    return pieces
+
+
+@pytest.mark.parametrize("language", ["en", "ko"])
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("window_size", [2_000, 16_000])
+def test_iterator_matches_the_eager_splitter(language, seed, window_size):
+    content = make_corpus(language, 60_000, seed=seed)
+    pieces = random_pieces(content, random.Random(seed), max_size=5_000)
+
+    assert list(iter_content_splits(pieces, window_size=window_size)) == content_splitter(content)
+
+
+@pytest.mark.parametrize("language", ["en", "ko"])
+def test_iterator_matches_the_eager_packed_splitter(language):
+    content = make_corpus(language, 60_000, seed=1)
+    splitter = partial(packed_content_splitter, prompt_messages=get_prompt_template("quiz", language).messages, token_budget=4000)
+    pieces = random_pieces(content, random.Random(1), max_size=5_000)
+
+    assert list(iter_content_splits(pieces, splitter=splitter)) == splitter(content)
+
+
+def test_iterator_over_a_decoded_s3_stream_matches_the_eager_splitter():
+    content = make_corpus("ko", 60_000, seed=2)
+
+    streamed = list(iter_content_splits(bucket_object(content).iter_content_str(chunk_size=4099), window_size=8_000))
+
+    assert streamed == content_splitter(content)
+
+
+def test_iterator_is_lazy():
+    consumed = []
+
+    def pieces():
+        for piece in random_pieces(make_corpus("en", 200_000, seed=3), random.Random(3), max_size=1_000):
+            consumed.append(piece)
+            yield piece
+
+    first = next(iter_content_splits(pieces(), window_size=4_000))
+
+    assert first
+    assert sum(len(piece) for piece in consumed) < 10_000
@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+import pytest
+
+from core.llm.deadline import DeadlineExceededError, deadline_after, deadline_exceeded, remaining_seconds
+from core.llm.openai import ChatMessage, OpenAIChatLLM
+
+
+def test_no_deadline_by_default():
+    assert remaining_seconds() is None
+    assert not deadline_exceeded()
+
+
+def test_nested_deadline_keeps_the_earlier_one():
+    with deadline_after(1.0):
+        with deadline_after(100.0):
+            assert remaining_seconds() <= 1.0
+        with deadline_after(0.5):
+            assert remaining_seconds() <= 0.5
+            with deadline_after(None):
+                assert remaining_seconds() <= 0.5
+        assert 0.5 < remaining_seconds() <= 1.0
+    assert remaining_seconds() is None
+
+
+def test_deadline_is_exceeded_once_it_passes():
+    with deadline_after(0.05):
+        assert not deadline_exceeded()
+        time.sleep(0.06)
+        assert deadline_exceeded()
+        assert remaining_seconds() < 0
+
+
+def test_deadline_reaches_tasks_and_threads():
+    async def remaining_in_task_and_thread():
+        return await asyncio.create_task(asyncio.to_thread(remaining_seconds))
+
+    with deadline_after(1.0):
+        assert 0 < asyncio.run(remaining_in_task_and_thread()) <= 1.0
+
+
+@pytest.fixture
+def chat_llm(openai_server):
+    chat_llm = OpenAIChatLLM(api_key="test", max_retries=0, request_timeout=30.0, hedge_requests=False)
+    yield chat_llm
+    chat_llm.close()
+
+
+def test_request_timeout_is_capped_by_the_deadline(chat_llm):
+    assert chat_llm._request_timeout() == 30.0
+    with deadline_after(60.0):
+        assert chat_llm._request_timeout() == 30.0
+    with deadline_after(2.0):
+        assert chat_llm._request_timeout() <= 2.0
+    with deadline_after(0.0):
+        with pytest.raises(DeadlineExceededError):
+            chat_llm._request_timeout()
+
+
+def test_deadline_cuts_a_request_short(openai_server, chat_llm):
+    openai_server.latency = 5.0
+
+    start = time.monotonic()
+    # 호출한 thread의 deadline이 background loop에서 실행되는 요청에도 적용된다.
+    with deadline_after(0.3), pytest.raises(TimeoutError):
+        chat_llm.predict_json([ChatMessage(role="user", content="hi")])
+
+    assert time.monotonic() - start < 2.0
+
+
+def test_request_after_the_deadline_is_not_sent(openai_server, chat_llm):
+    with deadline_after(0.0), pytest.raises(DeadlineExceededError):
+        chat_llm.predict_json([ChatMessage(role="user", content="hi")])
+
+    assert openai_server.calls == 0
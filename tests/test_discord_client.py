@@ -0,0 +1,110 @@
+import time
+
+import pytest
+import requests
+
+from bench.fakes import FakeDiscordServer
+from core.discord.discord_client import (
+    DISCORD_CONTENT_LIMIT,
+    DISCORD_EMBED_DESCRIPTION_LIMIT,
+    DISCORD_EMBEDS_TOTAL_LIMIT,
+    TRUNCATION_SUFFIX,
+    DiscordClient,
+    LLMErrorReport,
+    build_error_message,
+)
+from core.enums.enum import LLMErrorType
+
+
+def make_client(server: FakeDiscordServer, **kwargs) -> DiscordClient:
+    return DiscordClient(channel_id="0", bot_token="test", base_url=server.base_url, **kwargs)
+
+
+def report(client: DiscordClient, error_type: LLMErrorType = LLMErrorType.GENERAL, error_message: str = "boom", info: str = ""):
+    client.report_llm_error(task="Question Generation", error_type=error_type, document_content="note", error_message=error_message, info=info)
+
+
+def test_reports_of_the_same_kind_are_coalesced(discord_server):
+    client = make_client(discord_server, coalesce_window=60)
+
+    for i in range(5):
+        report(client, info=f"* document_id: `{i}`")
+    report(client, error_type=LLMErrorType.INVALID_JSON_FORMAT)
+    assert client.flush()
+
+    assert len(discord_server.messages) == 2
+    general = next(message for message in discord_server.messages if "Occurrences" in message["content"])
+    assert "* Occurrences: `5`" in general["content"]
+    assert all(f"* document_id: `{i}`" in general["content"] for i in range(5))
+    assert general["embeds"][1]["description"] == "(x5) boom"
+
+
+def test_coalesce_window_sends_without_flush(discord_server):
+    client = make_client(discord_server, coalesce_window=0.05)
+
+    report(client)
+    report(client)
+
+    # flush 없이 window가 닫히면 background thread가 보낸다.
+    deadline = time.monotonic() + 2
+    while not discord_server.messages and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(discord_server.messages) == 1
+    assert "* Occurrences: `2`" in discord_server.messages[0]["content"]
+
+
+def test_long_reports_are_truncated_to_discord_limits():
+    reports = [
+        LLMErrorReport(
+            task="Question Generation",
+            error_type=LLMErrorType.INVALID_JSON_FORMAT,
+            document_content="d" * 10_000,
+            error_message=f"error {i} " + "e" * 10_000,
+            info=f"* document_id: `{i}` " + "i" * 1_000,
+            llm_response="r" * 10_000,
+        )
+        for i in range(3)
+    ]
+
+    message = build_error_message(reports)
+
+    assert len(message["content"]) <= DISCORD_CONTENT_LIMIT
+    assert message["content"].endswith(TRUNCATION_SUFFIX)
+    assert all(len(embed["description"]) <= DISCORD_EMBED_DESCRIPTION_LIMIT for embed in message["embeds"])
+    assert sum(len(embed["title"]) + len(embed["description"]) for embed in message["embeds"]) <= DISCORD_EMBEDS_TOTAL_LIMIT
+    assert all(embed["description"].endswith(TRUNCATION_SUFFIX) for embed in message["embeds"])
+
+
+def test_empty_fields_are_replaced():
+    message = build_error_message([LLMErrorReport(task="t", error_type=LLMErrorType.GENERAL, document_content="", error_message="boom")])
+
+    assert message["embeds"][0]["description"] == "(empty)"
+
+
+def test_rate_limited_post_waits_for_retry_after():
+    server = FakeDiscordServer(rate_limited_requests=2, retry_after=0.1).start()
+    try:
+        client = make_client(server, max_send_attempts=3)
+
+        client.post_message({"content": "hello"})
+
+        assert server.messages == [{"content": "hello"}]
+        assert len(server.post_times) == 3
+        gaps = [later - earlier for earlier, later in zip(server.post_times, server.post_times[1:])]
+        assert all(gap >= 0.1 for gap in gaps)
+    finally:
+        server.stop()
+
+
+def test_rate_limited_post_gives_up_after_max_attempts():
+    server = FakeDiscordServer(rate_limited_requests=10, retry_after=0.01).start()
+    try:
+        client = make_client(server, max_send_attempts=2)
+
+        with pytest.raises(requests.HTTPError):
+            client.post_message({"content": "hello"})
+
+        assert len(server.post_times) == 2
+        assert server.messages == []
+    finally:
+        server.stop()
@@ -0,0 +1,67 @@
+import json
+
+import worker.worker as worker_module
+from bench.corpus import make_corpus
+from bench.sqlite_database_manager import SQLiteDatabaseManager
+
+
+def sqs_event(*message_ids: str) -> dict:
+    return {"Records": [
+        {"messageId": message_id, "body": json.dumps({"s3_key": f"{message_id}.txt", "db_pk": i, "star_count": 0, "member_id": 1})}
+        for i, message_id in enumerate(message_ids)
+    ]}
+
+
+def test_batch_item_failures_holds_only_the_failed_record(monkeypatch):
+    processed = []
+
+    def process_record(record, context):
+        processed.append(record["messageId"])
+        if record["messageId"] == "message-2":
+            raise RuntimeError("boom")
+        return {"statusCode": 200}
+
+    monkeypatch.setattr(worker_module, "process_record", process_record)
+
+    result = worker_module.handler(sqs_event("message-1", "message-2", "message-3", "message-4"), None)
+
+    assert result == {"batchItemFailures": [{"itemIdentifier": "message-2"}]}
+    assert sorted(processed) == ["message-1", "message-2", "message-3", "message-4"]
+
+
+def test_every_record_failing_is_reported(monkeypatch):
+    def process_record(record, context):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(worker_module, "process_record", process_record)
+
+    result = worker_module.handler(sqs_event("message-1", "message-2"), None)
+
+    assert result == {"batchItemFailures": [{"itemIdentifier": "message-1"}, {"itemIdentifier": "message-2"}]}
+
+
+def test_empty_event_has_no_failures():
+    assert worker_module.handler({"Records": []}, None) == {"batchItemFailures": []}
+
+
+
+def test_mixed_event_runs_through_process_record(monkeypatch, db_path, db_manager, clients, seed_document):
+    monkeypatch.setattr(worker_module, "create_db_manager", lambda: SQLiteDatabaseManager(db_path))
+    jobs = [seed_document(db_pk, make_corpus("en", 3000, seed=db_pk)) for db_pk in (1, 2, 3)]
+    # 2번 문서는 S3에서 읽지 못해 실패한다.
+    del clients.peek("s3").objects[jobs[1]["s3_key"]]
+    event = {"Records": [{"messageId": f"message-{job['db_pk']}", "body": json.dumps(job)} for job in jobs]}
+
+    result = worker_module.handler(event, None)
+
+    assert result == {"batchItemFailures": [{"itemIdentifier": "message-2"}]}
+    # 실패한 문서의 outbox row는 SQS 재전송 때 바로 claim할 수 있도록 WAITING으로 돌아가고, 성공한 문서의 row는 지워진다.
+    outbox = db_manager.execute_query("SELECT document_id, status, worker_id FROM outbox")
+    assert outbox == [{"document_id": 2, "status": "WAITING", "worker_id": None}]
+    quiz_counts = {
+        row["document_id"]: row["count"]
+        for row in db_manager.execute_query("SELECT document_id, COUNT(*) AS count FROM quiz WHERE is_latest = true GROUP BY document_id")
+    }
+    assert set(quiz_counts) == {1, 3}
+    statuses = {row["id"]: row["status"] for row in db_manager.execute_query("SELECT id, quiz_generation_status AS status FROM document")}
+    assert statuses == {1: "PROCESSED", 2: None, 3: "PROCESSED"}
@@ -0,0 +1,133 @@
+import asyncio
+import time
+
+import pytest
+
+from core.llm.deadline import deadline_after
+from core.llm.hedging import LatencyTracker
+from core.llm.openai import ChatMessage, OpenAIChatLLM
+
+
+HEDGE_DELAY = 0.2
+
+
+def test_no_hedge_delay_until_enough_samples():
+    tracker = LatencyTracker(min_samples=5, min_hedge_delay=0.0)
+    for _ in range(4):
+        tracker.record(1.0)
+
+    assert tracker.hedge_delay() is None
+    tracker.record(1.0)
+    assert tracker.hedge_delay() == 1.0
+
+
+def test_hedge_delay_is_the_percentile_with_a_floor():
+    tracker = LatencyTracker(min_samples=1, percentile=0.9, min_hedge_delay=0.5)
+    for seconds in range(1, 11):
+        tracker.record(seconds / 10)
+
+    assert tracker.hedge_delay() == 1.0
+    assert LatencyTracker(min_samples=1, min_hedge_delay=0.5).hedge_delay() is None
+    tracker.samples.clear()
+    tracker.record(0.1)
+    assert tracker.hedge_delay() == 0.5
+
+
+def test_hedges_are_capped_at_a_share_of_the_requests():
+    tracker = LatencyTracker(max_hedge_ratio=0.1)
+    tracker.requests = 30
+
+    assert [tracker.try_hedge() for _ in range(5)] == [True, True, True, False, False]
+    assert tracker.hedges == 3
+
+
+class FakeCompletions:
+    """Stands in for acreate_chat_completion: each request waits `queued` seconds for a slot, then `latencies[i]`."""
+
+    def __init__(self, latencies: list[float], queued: float = 0.0):
+        self.latencies = latencies
+        self.queued = queued
+        self.sent_at: list[float] = []
+        self.cancelled: list[int] = []
+
+    async def __call__(self, messages, on_sent=None, **params):
+        index = len(self.sent_at)
+        self.sent_at.append(float("nan"))
+        await asyncio.sleep(self.queued if index == 0 else 0.0)
+        if on_sent:
+            on_sent()
+        self.sent_at[index] = time.monotonic()
+        try:
+            await asyncio.sleep(self.latencies[index])
+        except asyncio.CancelledError:
+            self.cancelled.append(index)
+            raise
+        return f"response {index}"
+
+
+@pytest.fixture
+def chat_llm():
+    chat_llm = OpenAIChatLLM(api_key="test")
+    tracker = chat_llm._latency_tracker(None)
+    tracker.min_hedge_delay = HEDGE_DELAY
+    tracker.requests = 100
+    for _ in range(tracker.min_samples):
+        tracker.record(0.01)
+    yield chat_llm
+    chat_llm.close()
+
+
+def hedged(chat_llm: OpenAIChatLLM, completions: FakeCompletions):
+    chat_llm.acreate_chat_completion = completions
+    return chat_llm.run_coroutine(chat_llm._acreate_hedged([ChatMessage(role="user", content="hi")]))
+
+
+def test_fast_request_is_not_hedged(chat_llm):
+    completions = FakeCompletions([HEDGE_DELAY / 4, 0.0])
+
+    assert hedged(chat_llm, completions) == "response 0"
+    assert len(completions.sent_at) == 1
+
+
+def test_slow_request_is_hedged_after_the_delay_and_the_loser_is_cancelled(chat_llm):
+    completions = FakeCompletions([5.0, 0.01])
+
+    start = time.monotonic()
+    assert hedged(chat_llm, completions) == "response 1"
+
+    assert time.monotonic() - start < 1.0
+    assert completions.sent_at[1] - completions.sent_at[0] >= HEDGE_DELAY
+    assert completions.cancelled == [0]
+    assert chat_llm._latency_tracker(None).hedges == 1
+
+
+def test_primary_that_wins_cancels_the_hedge(chat_llm):
+    completions = FakeCompletions([HEDGE_DELAY * 1.5, 5.0])
+
+    assert hedged(chat_llm, completions) == "response 0"
+    assert len(completions.sent_at) == 2
+    assert completions.cancelled == [1]
+
+
+def test_time_spent_waiting_for_a_slot_does_not_count_towards_the_delay(chat_llm):
+    # 보내기 전에 hedge delay의 두 배를 기다려도, 보낸 뒤에는 빨리 끝나므로 hedge하지 않는다.
+    completions = FakeCompletions([HEDGE_DELAY / 4], queued=HEDGE_DELAY * 2)
+
+    assert hedged(chat_llm, completions) == "response 0"
+    assert len(completions.sent_at) == 1
+
+
+def test_no_hedge_when_the_deadline_is_closer_than_the_delay(chat_llm):
+    completions = FakeCompletions([HEDGE_DELAY * 2, 0.0])
+
+    with deadline_after(HEDGE_DELAY * 1.5):
+        assert hedged(chat_llm, completions) == "response 0"
+    assert len(completions.sent_at) == 1
+
+
+def test_no_hedge_when_disabled(chat_llm):
+    chat_llm.hedge_requests = False
+    completions = FakeCompletions([HEDGE_DELAY * 2, 0.0])
+
+    assert hedged(chat_llm, completions) == "response 0"
+    assert len(completions.sent_at) == 1
@@ -0,0 +1,14 @@
+import statistics
+
+import pytest
+
+from bench.check_import_budget import IMPORT_BUDGET_MS, loaded_heavy_modules, measure_import_ms
+
+
+@pytest.mark.parametrize("module", ["worker.worker", "worker.consumer"])
+def test_entry_point_does_not_load_heavy_modules(module):
+    assert loaded_heavy_modules(module) == []
+
+
+def test_entry_point_imports_within_budget():
+    assert statistics.median(measure_import_ms("worker.worker") for _ in range(3)) <= IMPORT_BUDGET_MS
@@ -0,0 +1,146 @@
+import json
+import random
+
+import pytest
+
+from bench.corpus import make_corpus
+from bench.fakes import canned_quizzes
+from core.llm.exception import InvalidLLMJsonResponseError
+from core.llm.json_stream import JsonArrayItemParser
+from core.llm.openai import ChatMessage, OpenAIChatLLM
+from core.llm.template import get_prompt_template
+
+
+def feed_in_pieces(text: str, sizes: list[int], array_key: str = "quizzes") -> tuple[list[dict], JsonArrayItemParser]:
+    parser = JsonArrayItemParser(array_key=array_key)
+    items, start = [], 0
+    for size in sizes:
+        items += parser.feed(text[start:start + size])
+        start += size
+    items += parser.feed(text[start:])
+    return items, parser
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_items_split_across_chunk_boundaries_match_a_full_parse(seed):
+    rng = random.Random(seed)
+    text = json.dumps(canned_quizzes(make_corpus("ko" if seed % 2 else "en", 3000, seed=seed), count=5), ensure_ascii=bool(seed % 3))
+    # 한 글자씩 자르는 경우까지 포함한다.
+    sizes = [rng.randint(1, 40) for _ in range(len(text))]
+
+    items, parser = feed_in_pieces(text, sizes)
+
+    assert items == json.loads(text)["quizzes"]
+    assert parser.completed
+
+
+def test_each_item_is_returned_by_the_feed_that_closes_it():
+    text = json.dumps({"quizzes": [{"question": "a"}, {"question": "b"}]})
+    parser = JsonArrayItemParser(array_key="quizzes")
+    first_close = text.index("}") + 1
+
+    assert parser.feed(text[:first_close - 1]) == []
+    assert parser.feed(text[first_close - 1:first_close]) == [{"question": "a"}]
+    assert parser.feed(text[first_close:]) == [{"question": "b"}]
+
+
+def test_quotes_braces_and_brackets_inside_strings():
+    quizzes = [
+        {"question": 'He said "}" and then "{"', "answer": "a\\\"]b", "explanation": "[not an array] {not an object}"},
+        {"question": "escaped backslash at the end \\", "answer": "é中😀", "explanation": "\"quizzes\": [{}]"},
+    ]
+    text = json.dumps({"quizzes": quizzes})
+
+    items, parser = feed_in_pieces(text, [1] * len(text))
+
+    assert items == quizzes
+    assert parser.completed
+
+
+def test_nested_arrays_and_objects_inside_items():
+    quizzes = [
+        {"question": "q", "options": ["a", "b", ["c", {"d": [1, 2]}]], "meta": {"tags": [[], [{}]]}},
+        {"question": "r", "options": []},
+    ]
+    text = json.dumps({"quizzes": quizzes})
+
+    assert feed_in_pieces(text, [7] * len(text))[0] == quizzes
+
+
+def test_other_keys_and_arrays_are_ignored():
+    text = json.dumps({
+        "notes": [{"question": "not a quiz"}],
+        "nested": {"quizzes": [{"question": "deeper than the top level"}]},
+        "quizzes": [{"question": "q"}],
+        "after": [1, 2, 3],
+    })
+
+    items, parser = feed_in_pieces(text, [5] * len(text))
+
+    assert items == [{"question": "q"}]
+    assert parser.completed
+
+
+def test_truncated_response_keeps_the_items_closed_so_far():
+    text = json.dumps({"quizzes": [{"question": "a"}, {"question": "b"}]})
+    truncated = text[:text.rindex("{") + 5]
+
+    items, parser = feed_in_pieces(truncated, [3] * len(truncated))
+
+    assert items == [{"question": "a"}]
+    assert not parser.completed
+
+
+@pytest.mark.parametrize("garbage", ["", "I cannot help with that.", "<html>502 Bad Gateway</html>", "[1, 2, 3", '{"quizzes": "none"'])
+def test_garbage_yields_nothing_and_keeps_the_head(garbage):
+    items, parser = feed_in_pieces(garbage, [2] * len(garbage))
+
+    assert items == []
+    assert not parser.completed
+    assert parser.head == garbage
+
+
+def test_unparsable_item_is_skipped():
+    # 중괄호 짝은 맞지만 JSON이 아닌 item
+    text = '{"quizzes": [{"question": "a",}, {"question": "b"}]}'
+
+    items, parser = feed_in_pieces(text, [4] * len(text))
+
+    assert items == [{"question": "b"}]
+    assert parser.completed
+
+
+@pytest.fixture
+def chat_llm(openai_server):
+    chat_llm = OpenAIChatLLM(api_key="test", max_retries=0, hedge_requests=False)
+    yield chat_llm
+    chat_llm.close()
+
+
+def quiz_messages() -> list[ChatMessage]:
+    return get_prompt_template("quiz", "en").render(note=make_corpus("en", 1000, seed=1), min_quizzes="4", max_quizzes="5")
+
+
+def test_streamed_items_match_the_non_streamed_answer(chat_llm):
+    from app.quiz.quiz_schema import QUIZ_RESPONSE_FORMAT
+
+    streamed = []
+
+    result = chat_llm.run_coroutine(chat_llm.astream_json_items(
+        quiz_messages(), array_key="quizzes", on_item=streamed.append, response_format=QUIZ_RESPONSE_FORMAT
+    ))
+
+    assert result == {"quizzes": streamed}
+    assert result == chat_llm.predict_json(quiz_messages(), response_format=QUIZ_RESPONSE_FORMAT)
+
+
+def test_stream_that_is_not_json_raises_with_its_head(openai_server, chat_llm):
+    from app.quiz.quiz_schema import QUIZ_RESPONSE_FORMAT
+
+    openai_server.invalid_json_rate = 1.0
+
+    with pytest.raises(InvalidLLMJsonResponseError) as error:
+        chat_llm.run_coroutine(chat_llm.astream_json_items(
+            quiz_messages(), array_key="quizzes", on_item=lambda item: None, response_format=QUIZ_RESPONSE_FORMAT
+        ))
+    assert error.value.llm_response
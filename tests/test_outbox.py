@@ -0,0 +1,76 @@
+import json
+from datetime import timedelta
+
+import pytest
+
+import app.job.outbox as outbox
+import worker.worker as worker_module
+from app.job.outbox import claim_outbox
+from core.database.database_manager import DatabaseManager
+
+
+class OperationalError(Exception):
+    pass
+
+
+class BrokenCursor:
+    def execute(self, query, params=None):
+        raise OperationalError("(2013, 'Lost connection to MySQL server during query')")
+
+    def close(self):
+        pass
+
+
+class BrokenConnection:
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def broken_db_manager() -> DatabaseManager:
+    db_manager = DatabaseManager(host=None, user=None, password=None, db=None)
+    db_manager.connection, db_manager.cursor = BrokenConnection(), BrokenCursor()
+    return db_manager
+
+
+@pytest.fixture
+def waiting_outbox(db_manager):
+    db_manager.execute_query("INSERT INTO outbox (document_id, status) VALUES (1, 'WAITING')")
+    db_manager.commit()
+
+
+def test_only_one_worker_claims_a_waiting_row(db_manager, waiting_outbox):
+    assert claim_outbox(db_manager, 1, "worker-a")
+    assert not claim_outbox(db_manager, 1, "worker-b")
+    # 같은 worker가 다시 잡는 것은 허용된다.
+    assert claim_outbox(db_manager, 1, "worker-a")
+
+
+def test_expired_lease_can_be_claimed(monkeypatch, db_manager, waiting_outbox):
+    assert claim_outbox(db_manager, 1, "worker-a", lease_seconds=60)
+
+    now = outbox._utcnow()
+    monkeypatch.setattr(outbox, "_utcnow", lambda: now + timedelta(seconds=61))
+
+    assert claim_outbox(db_manager, 1, "worker-b")
+
+
+def test_missing_row_is_not_claimed(db_manager):
+    assert not claim_outbox(db_manager, 1, "worker-a")
+
+
+def test_db_error_while_claiming_is_raised():
+    with pytest.raises(OperationalError):
+        claim_outbox(broken_db_manager(), 1, "worker-a")
+
+
+def test_db_error_while_claiming_fails_the_record(monkeypatch):
+    monkeypatch.setattr(worker_module, "create_db_manager", broken_db_manager)
+    event = {"Records": [{"messageId": "message-1", "body": json.dumps({"s3_key": "1.txt", "db_pk": 1, "star_count": 0, "member_id": 1})}]}
+
+    assert worker_module.handler(event, None) == {"batchItemFailures": [{"itemIdentifier": "message-1"}]}
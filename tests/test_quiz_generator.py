@@ -0,0 +1,151 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from app.job.job_context import JobContext
+from app.quiz.quiz_generator import MIN_QUIZ_COUNT, QuizWriter, insert_quizzes, quiz_generator, quiz_from_response, save_quiz_results
+from bench.corpus import make_corpus
+from bench.fakes import canned_quizzes
+from bench.sqlite_database_manager import SQLiteDatabaseManager
+from core.database.database_manager import DatabaseManager
+from core.llm.template import get_prompt_template
+from core.llm.utils import content_splitter
+
+
+@pytest.fixture
+def job_context(db_manager) -> JobContext:
+    db_manager.execute_query("INSERT INTO document (id, language) VALUES (1, 'en')")
+    db_manager.execute_query("INSERT INTO star (member_id, star) VALUES (1, 100)")
+    db_manager.commit()
+    return JobContext(
+        s3_key="test/1.txt", db_pk=1, member_id=1, star_count=5, content="", language="en",
+        document_prompt=get_prompt_template("document_data", "en"), quiz_prompt=get_prompt_template("quiz", "en"),
+    )
+
+
+def stream_into_writer(db_manager, quizzes: list[dict]) -> QuizWriter:
+    quiz_writer = QuizWriter(db_manager, 1)
+    quiz_writer.start()
+    for q_set in quizzes:
+        quiz_writer.put(quiz_from_response(q_set))
+    quiz_writer.close()
+    return quiz_writer
+
+
+def document_status(db_manager) -> str:
+    return db_manager.execute_query("SELECT quiz_generation_status AS status FROM document WHERE id = 1")[0]["status"]
+
+
+def test_streamed_quizzes_below_the_threshold_are_refunded(db_manager, job_context):
+    # 응답에는 퀴즈가 충분하지만 streaming 중 중복으로 걸러져 일부만 저장된 경우
+    results = [canned_quizzes(make_corpus("en", 1000, seed=seed), count=5) for seed in range(2)]
+    quiz_writer = stream_into_writer(db_manager, results[0]["quizzes"][:MIN_QUIZ_COUNT - 1])
+
+    save_quiz_results(None, db_manager, job_context, results, ["", ""], quiz_writer=quiz_writer)
+
+    assert document_status(db_manager) == "QUIZ_GENERATION_ERROR"
+    assert db_manager.execute_query("SELECT * FROM quiz") == []
+    assert db_manager.execute_query("SELECT star FROM star WHERE member_id = 1")[0]["star"] == 105
+
+
+def test_streamed_quizzes_at_the_threshold_are_kept(db_manager, job_context):
+    results = [canned_quizzes(make_corpus("en", 1000, seed=seed), count=5) for seed in range(2)]
+    quiz_writer = stream_into_writer(db_manager, results[0]["quizzes"] + results[1]["quizzes"][:MIN_QUIZ_COUNT - 5])
+
+    save_quiz_results(None, db_manager, job_context, results, ["", ""], quiz_writer=quiz_writer)
+
+    assert document_status(db_manager) == "PROCESSED"
+    assert len(db_manager.execute_query("SELECT * FROM quiz")) == MIN_QUIZ_COUNT
+
+
+def counting(chunks: list[str], consumed: list[str]):
+    for chunk in chunks:
+        consumed.append(chunk)
+        yield chunk
+
+
+@pytest.mark.parametrize("streamed", [False, True])
+def test_target_mode_only_reads_the_chunks_it_sends(openai_server, clients, db_manager, job_context, streamed):
+    chunks = content_splitter(make_corpus("en", 50_000, seed=1))
+    consumed: list[str] = []
+    job_context.content_splits = counting(chunks, consumed) if streamed else chunks
+    job_context.target_quiz_count = 10
+
+    quiz_generator(clients.peek("discord"), clients.peek("chat_llm"), db_manager, job_context)
+
+    assert document_status(db_manager) == "PROCESSED"
+    assert len(db_manager.execute_query("SELECT * FROM quiz")) == 10
+    assert openai_server.calls < len(chunks) // 4
+    if streamed:
+        # streaming 모드의 chunk는 보낸 만큼만 읽는다.
+        assert len(consumed) == openai_server.calls
+
+
+def test_target_mode_without_chunks_is_refunded(clients, db_manager, job_context):
+    job_context.content_splits = []
+    job_context.target_quiz_count = 10
+
+    quiz_generator(clients.peek("discord"), clients.peek("chat_llm"), db_manager, job_context)
+
+    assert document_status(db_manager) == "QUIZ_GENERATION_ERROR"
+
+
+def test_short_document_below_the_target_keeps_its_quizzes(openai_server, clients, db_manager, job_context):
+    openai_server.quizzes_per_chunk = 4
+    chunks = content_splitter(make_corpus("en", 1_800, seed=1))
+    assert len(chunks) == 2
+    job_context.content_splits = chunks
+    job_context.target_quiz_count = 10
+
+    quiz_generator(clients.peek("discord"), clients.peek("chat_llm"), db_manager, job_context)
+
+    # 목표에는 못 미치지만 MIN_QUIZ_COUNT는 넘으므로 환불하지 않고 일부 성공으로 저장한다.
+    assert document_status(db_manager) == "PARTIAL_SUCCESS"
+    assert len(db_manager.execute_query("SELECT * FROM quiz")) == 8
+    assert db_manager.execute_query("SELECT star FROM star WHERE member_id = 1")[0]["star"] == 100
+
+
+class FailingOptionsDatabaseManager(SQLiteDatabaseManager):
+    def execute_many(self, query, params_seq):
+        if query.startswith("INSERT INTO options"):
+            raise sqlite3.OperationalError("disk I/O error")
+        return super().execute_many(query, params_seq)
+
+
+class OptionsFailingCursor:
+    """pymysql DictCursor stand-in whose options INSERT fails."""
+
+    rowcount = 0
+
+    def execute(self, query, params=None):
+        return 0
+
+    def fetchall(self):
+        return [{"id": quiz_id} for quiz_id in range(1, 6)]
+
+    def executemany(self, query, params_seq):
+        if query.startswith("INSERT INTO options"):
+            raise sqlite3.OperationalError("Lost connection to MySQL server during query")
+        return len(params_seq)
+
+
+def test_failed_options_insert_is_raised():
+    db_manager = DatabaseManager(host=None, user=None, password=None, db=None)
+    db_manager.connection, db_manager.cursor = object(), OptionsFailingCursor()
+    quizzes = [quiz_from_response(q_set) for q_set in canned_quizzes(make_corpus("en", 1000, seed=1), count=5)["quizzes"]]
+
+    # 삼키면 보기 없는 객관식 퀴즈가 commit되므로 호출한 쪽이 rollback할 수 있게 올라와야 한다.
+    with pytest.raises(sqlite3.OperationalError):
+        insert_quizzes(db_manager, quizzes, 1, datetime.now())
+
+
+def test_failed_options_insert_while_streaming_is_rolled_back(db_path, db_manager, job_context):
+    failing_db_manager = FailingOptionsDatabaseManager(db_path)
+    quizzes = canned_quizzes(make_corpus("en", 1000, seed=1), count=5)["quizzes"]
+
+    with pytest.raises(sqlite3.OperationalError):
+        stream_into_writer(failing_db_manager, quizzes)
+
+    # 같은 connection에서도 commit되지 않은 퀴즈가 남아 있지 않아야 한다.
+    assert failing_db_manager.execute_query("SELECT * FROM quiz") == []
@@ -0,0 +1,32 @@
+import pytest
+
+from app.quiz.quiz_generator import MIN_QUIZ_COUNT
+from app.quiz.quiz_prompt import MAX_QUIZ_COUNT_SCALE, QUIZ_COUNT_PER_CHUNK, quiz_count_range, render_quiz_prompt
+from bench.corpus import make_corpus
+from core.llm.template import get_prompt_template
+from core.llm.utils import content_splitter, packed_content_splitter
+
+
+@pytest.mark.parametrize("language", ["en", "ko"])
+def test_fixed_chunks_ask_for_the_original_quiz_count(language):
+    quiz_prompt = get_prompt_template("quiz", language)
+
+    for chunk in content_splitter(make_corpus(language, 20_000)):
+        assert quiz_count_range(chunk) == QUIZ_COUNT_PER_CHUNK
+        system_prompt = render_quiz_prompt(quiz_prompt, chunk)[0].content
+        assert "between 4 and 5" in system_prompt or "4~5개" in system_prompt
+
+
+@pytest.mark.parametrize("language", ["en", "ko"])
+@pytest.mark.parametrize("size", [5_000, 20_000])
+def test_packed_chunks_ask_for_enough_quizzes(language, size):
+    content = make_corpus(language, size)
+    quiz_prompt = get_prompt_template("quiz", language)
+
+    chunks = packed_content_splitter(content, quiz_prompt.messages, token_budget=4000)
+
+    assert sum(quiz_count_range(chunk)[0] for chunk in chunks) >= MIN_QUIZ_COUNT
+
+
+def test_quiz_count_is_capped_for_very_long_chunks():
+    assert quiz_count_range("word " * 100_000) == tuple(count * MAX_QUIZ_COUNT_SCALE for count in QUIZ_COUNT_PER_CHUNK)
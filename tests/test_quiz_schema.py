@@ -0,0 +1,140 @@
+import copy
+
+import pytest
+
+from app.quiz.quiz_generator import QUIZ_CHUNK_RETRY_BUDGET
+from app.quiz.quiz_schema import MIN_VALID_QUIZZES_PER_CHUNK, QUIZ_RESPONSE_FORMAT, quiz_error, validate_quiz_response
+from bench.corpus import make_corpus
+from bench.fakes import canned_quizzes
+from core.llm.openai import OpenAIChatLLM
+from core.llm.template import get_prompt_template
+
+
+MULTIPLE_CHOICE = {
+    "type": "multiple_choice",
+    "question": "Which one is a process?",
+    "options": ["a", "b", "c", "d"],
+    "answer": "a",
+    "explanation": "Because.",
+}
+OX = {"type": "ox", "question": "A thread is a process.", "options": [], "answer": "incorrect", "explanation": "Because."}
+
+
+def with_changes(q_set: dict, **changes) -> dict:
+    q_set = copy.deepcopy(q_set)
+    for key, value in changes.items():
+        if value is None:
+            del q_set[key]
+        else:
+            q_set[key] = value
+    return q_set
+
+
+def test_valid_quizzes_have_no_error():
+    assert quiz_error(MULTIPLE_CHOICE) is None
+    assert quiz_error(OX) is None
+
+
+@pytest.mark.parametrize("q_set, error", [
+    ("not a quiz", "quiz is not an object"),
+    (with_changes(OX, type="essay"), "unknown quiz type: essay"),
+    (with_changes(OX, type=None), "unknown quiz type: None"),
+    (with_changes(MULTIPLE_CHOICE, question=None), "'question' must be a non-empty string"),
+    (with_changes(MULTIPLE_CHOICE, answer=None), "'answer' must be a non-empty string"),
+    (with_changes(OX, explanation="  "), "'explanation' must be a non-empty string"),
+    (with_changes(OX, question=["not", "a", "string"]), "'question' must be a non-empty string"),
+    (with_changes(OX, answer="maybe"), "ox answer must be one of ('correct', 'incorrect')"),
+    (with_changes(MULTIPLE_CHOICE, options=["a", "b", "c"]), "multiple choice quiz must have 4 options"),
+    (with_changes(MULTIPLE_CHOICE, options=["a", "b", "c", "d", "e"]), "multiple choice quiz must have 4 options"),
+    (with_changes(MULTIPLE_CHOICE, options=None), "multiple choice quiz must have 4 options"),
+    (with_changes(MULTIPLE_CHOICE, options="a, b, c, d"), "multiple choice quiz must have 4 options"),
+    (with_changes(MULTIPLE_CHOICE, options=["a", "b", "", "d"]), "options must be non-empty strings"),
+    (with_changes(MULTIPLE_CHOICE, options=["a", "b", "b", "d"]), "options must be distinct"),
+    (with_changes(MULTIPLE_CHOICE, answer="e"), "answer must be one of the options"),
+])
+def test_invalid_quizzes_are_rejected(q_set, error):
+    assert quiz_error(q_set) == error
+
+
+def test_invalid_quizzes_are_dropped_from_the_response():
+    response = {"quizzes": [MULTIPLE_CHOICE, with_changes(MULTIPLE_CHOICE, answer="e"), OX, with_changes(OX, answer=None)]}
+
+    assert validate_quiz_response(response) == ({"quizzes": [MULTIPLE_CHOICE, OX]}, True)
+
+
+def test_response_with_too_few_valid_quizzes_is_not_accepted():
+    response = {"quizzes": [MULTIPLE_CHOICE] + [with_changes(OX, type="essay")] * 4}
+
+    assert MIN_VALID_QUIZZES_PER_CHUNK > 1
+    assert validate_quiz_response(response) == ({"quizzes": [MULTIPLE_CHOICE]}, False)
+
+
+@pytest.mark.parametrize("response", [{}, {"quizzes": "none"}, {"quiz": [OX, MULTIPLE_CHOICE]}, ["not", "an", "object"]])
+def test_response_without_a_quiz_list_is_not_accepted(response):
+    assert validate_quiz_response(response) == ({"quizzes": []}, False)
+
+
+@pytest.fixture
+def chat_llm(openai_server):
+    chat_llm = OpenAIChatLLM(api_key="test", max_retries=0, hedge_requests=False)
+    yield chat_llm
+    chat_llm.close()
+
+
+def quiz_prompts(count: int) -> list:
+    quiz_prompt = get_prompt_template("quiz", "en")
+    return [
+        quiz_prompt.render(note=make_corpus("en", 1000, seed=seed), min_quizzes="4", max_quizzes="5")
+        for seed in range(count)
+    ]
+
+
+def reject_first_answers(rejections: int):
+    """validate_quiz_response, except that in the first `rejections` answers no quiz has a valid answer."""
+    seen = []
+
+    def validate(resp_dict: dict) -> tuple[dict, bool]:
+        seen.append(resp_dict)
+        if len(seen) <= rejections:
+            resp_dict = {"quizzes": [with_changes(q_set, answer="none of the above") for q_set in resp_dict["quizzes"]]}
+        return validate_quiz_response(resp_dict)
+
+    return validate
+
+
+def test_rejected_answer_is_sent_again(openai_server, chat_llm):
+    results = chat_llm.batch_predict_json(
+        quiz_prompts(1), response_format=QUIZ_RESPONSE_FORMAT,
+        validate=reject_first_answers(1), retry_budget=QUIZ_CHUNK_RETRY_BUDGET,
+    )
+
+    assert openai_server.calls == 2
+    assert len(results[0]["quizzes"]) == 5
+
+
+def test_rejected_answers_are_retried_within_the_batch_budget(openai_server, chat_llm):
+    results = chat_llm.batch_predict_json(
+        quiz_prompts(6), response_format=QUIZ_RESPONSE_FORMAT,
+        validate=reject_first_answers(1_000), retry_budget=2, max_retries_per_prompt=3,
+    )
+
+    # 6개 prompt가 모두 거절돼도 batch 전체에서 2번까지만 다시 보낸다.
+    assert openai_server.calls == 6 + 2
+    # 끝까지 거절된 prompt는 예외 대신 검증을 통과한 퀴즈만 남긴 응답을 돌려준다.
+    assert results == [{"quizzes": []}] * 6
+
+
+def test_rejected_answer_is_retried_at_most_max_retries_per_prompt(openai_server, chat_llm):
+    results = chat_llm.batch_predict_json(
+        quiz_prompts(2), response_format=QUIZ_RESPONSE_FORMAT,
+        validate=reject_first_answers(1_000), retry_budget=QUIZ_CHUNK_RETRY_BUDGET, max_retries_per_prompt=1,
+    )
+
+    assert openai_server.calls == 2 * 2
+    assert results == [{"quizzes": []}] * 2
+
+
+def test_canned_answer_passes_validation():
+    response = canned_quizzes(make_corpus("en", 1000, seed=1))
+
+    assert validate_quiz_response(response) == (response, True)
@@ -0,0 +1,20 @@
+from app.quiz.quiz_target import PLAN_QUIZ_QUESTION_NUM, spread_order, target_quiz_count
+from constant.constant import FIRST_GENERATION_QUIZ_NUM
+from core.enums.enum import SubscriptionPlanType
+
+
+def test_target_quiz_count_precedence():
+    assert target_quiz_count({"quiz_count": 7, "is_first_generation": True, "subscription_plan": "PRO"}) == 7
+    assert target_quiz_count({"is_first_generation": True, "subscription_plan": "PRO"}) == FIRST_GENERATION_QUIZ_NUM
+    assert target_quiz_count({"subscription_plan": "PRO"}) == PLAN_QUIZ_QUESTION_NUM[SubscriptionPlanType.PRO]
+    assert target_quiz_count({}) is None
+
+
+def test_unknown_subscription_plan_falls_back_to_every_chunk():
+    assert target_quiz_count({"subscription_plan": "ENTERPRISE"}) is None
+
+
+def test_spread_order_covers_every_chunk_once():
+    for count in (1, 2, 3, 7, 16, 100):
+        order = spread_order(count)
+        assert sorted(order) == list(range(count))
@@ -0,0 +1,128 @@
+import pytest
+
+from bench.fakes import FakeOpenAIServer
+from core.llm.openai import ChatMessage, OpenAIChatLLM
+from core.llm.rate_limit import AdaptiveConcurrencyLimiter, TokenBucket, retry_after_seconds
+
+
+MESSAGES = [ChatMessage(role="user", content="Make a title for this note.")]
+
+
+@pytest.fixture
+def make_chat_llm(monkeypatch):
+    servers, chat_llms = [], []
+
+    def make(max_retries: int = 4, request_timeout: float = 60.0, latency: float = 0.01, **server_kwargs) -> tuple[OpenAIChatLLM, FakeOpenAIServer]:
+        server = FakeOpenAIServer(latency=latency, latency_jitter=0.0, **server_kwargs).start()
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        chat_llm = OpenAIChatLLM(
+            api_key="test", max_concurrency=4, max_retries=max_retries, request_timeout=request_timeout, hedge_requests=False
+        )
+        servers.append(server)
+        chat_llms.append(chat_llm)
+        return chat_llm, server
+
+    yield make
+    for chat_llm in chat_llms:
+        chat_llm.close()
+    for server in servers:
+        server.stop()
+
+
+def test_throttled_requests_are_retried_until_they_succeed(make_chat_llm):
+    chat_llm, server = make_chat_llm(max_retries=8, rate_limit_rate=0.3, seed=1)
+
+    results = chat_llm.batch_predict_json([MESSAGES] * 8)
+
+    assert all(result == {"emoji": "📘", "title": "Bench Note", "category_id": 9} for result in results)
+    assert server.failures > 0
+    assert server.calls == 8 + server.failures
+
+
+def test_throttling_shrinks_the_concurrency_limit(make_chat_llm):
+    chat_llm, server = make_chat_llm(max_retries=8, rate_limit_rate=0.3, seed=1)
+
+    chat_llm.batch_predict_json([MESSAGES] * 8)
+
+    # 성공이 이어지면 limit은 다시 늘어나므로, 줄어든 적이 있는지만 본다.
+    assert chat_llm.concurrency_limiter.last_decreased_at > 0
+
+
+def test_rate_limit_error_is_raised_once_retries_run_out(make_chat_llm):
+    from openai import RateLimitError
+
+    chat_llm, server = make_chat_llm(max_retries=2, rate_limit_rate=1.0)
+
+    with pytest.raises(RateLimitError):
+        chat_llm.predict_json(MESSAGES)
+    assert server.calls == 3
+
+
+def test_waiting_for_a_saturated_limiter_does_not_count_toward_the_timeout(make_chat_llm):
+    chat_llm, server = make_chat_llm(request_timeout=0.6, latency=0.2)
+    # AIMD가 limit을 1까지 줄인 상태: 10개가 하나씩 차례로 나가므로 마지막 chunk는 약 2초를 기다린다.
+    chat_llm.concurrency_limiter.limit = 1.0
+    chat_llm.concurrency_limiter.max_limit = 1
+
+    results = chat_llm.batch_predict_json([MESSAGES] * 10)
+
+    assert [type(result).__name__ for result in results if isinstance(result, Exception)] == []
+    assert server.calls == 10
+
+
+def test_waiting_for_a_saturated_limiter_does_not_count_toward_the_stream_timeout(make_chat_llm):
+    chat_llm, server = make_chat_llm(request_timeout=0.6, latency=0.2)
+    chat_llm.concurrency_limiter.limit = 1.0
+    chat_llm.concurrency_limiter.max_limit = 1
+    items = []
+
+    results = chat_llm.batch_stream_json_items([MESSAGES] * 10, array_key="quizzes", on_item=items.append)
+
+    assert [type(result).__name__ for result in results if isinstance(result, Exception)] == []
+    assert server.calls == 10
+
+
+def test_slow_attempt_still_times_out(make_chat_llm):
+    chat_llm, server = make_chat_llm(request_timeout=0.2, latency=0.5)
+
+    results = chat_llm.batch_predict_json([MESSAGES])
+
+    assert isinstance(results[0], TimeoutError)
+
+
+def test_token_bucket_waits_for_the_debt_to_refill():
+    bucket = TokenBucket(capacity_per_minute=60)
+
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+
+
+def test_token_bucket_follows_a_lower_remaining_budget_from_the_server():
+    bucket = TokenBucket(capacity_per_minute=600)
+
+    bucket.sync_remaining(0)
+
+    assert bucket.reserve(10) == pytest.approx(1.0, abs=0.05)
+
+
+def test_concurrency_limit_halves_once_per_burst_of_throttles():
+    limiter = AdaptiveConcurrencyLimiter(max_limit=8, decrease_cooldown=60)
+
+    limiter.on_throttle()
+    limiter.on_throttle()
+
+    assert limiter.limit == 4
+
+
+def test_concurrency_limit_shrinks_when_the_server_reports_few_requests_left():
+    limiter = AdaptiveConcurrencyLimiter(max_limit=8)
+
+    limiter.on_success({"x-ratelimit-limit-requests": "500", "x-ratelimit-remaining-requests": "10"})
+
+    assert limiter.limit == 4
+
+
+def test_retry_after_prefers_milliseconds():
+    assert retry_after_seconds({"retry-after-ms": "200", "retry-after": "1"}) == 0.2
+    assert retry_after_seconds({"retry-after": "3"}) == 3.0
+    assert retry_after_seconds({}) is None
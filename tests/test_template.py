@@ -0,0 +1,72 @@
+import re
+
+import pytest
+
+from bench.corpus import make_corpus
+from core.llm.openai import ChatMessage
+from core.llm.template import SUPPORTED_LANGUAGES, PromptTemplate, get_prompt_template
+from core.llm.utils import fill_message_placeholders
+
+
+TRICKY_NOTE = 'JSON: {"a": {"b": [1, 2]}}, f-string {name} {{escaped}}, jinja {% if x %}{{ x }}{% endif %}, $note, 100%'
+
+
+def to_langchain_template(content: str) -> str:
+    """The same prompt as a LangChain f-string template: literal braces doubled, {{$name}} turned into {name}."""
+    escaped = content.replace("{", "{{").replace("}", "}}")
+    return re.sub(r"\{\{\{\{\$(\w+)\}\}\}\}", r"{\1}", escaped)
+
+
+@pytest.mark.parametrize("language", SUPPORTED_LANGUAGES)
+@pytest.mark.parametrize("task, values", [
+    ("quiz", {"note": make_corpus("en", 2000, seed=1), "min_quizzes": "4", "max_quizzes": "5"}),
+    ("quiz", {"note": TRICKY_NOTE, "min_quizzes": "8", "max_quizzes": "10"}),
+    ("document_data", {"note": make_corpus("ko", 2000, seed=1)}),
+    ("document_data", {"note": TRICKY_NOTE}),
+])
+def test_render_matches_fill_message_placeholders(language, task, values):
+    prompt_template = get_prompt_template(task, language)
+
+    rendered = prompt_template.render(**values)
+
+    assert rendered == fill_message_placeholders(prompt_template.messages, values)
+    # 값을 주지 않은 {{$prev_questions}}는 그대로 남는다.
+    assert "{{$prev_questions}}" in "".join(message.content for message in rendered)
+
+
+@pytest.mark.parametrize("language", SUPPORTED_LANGUAGES)
+@pytest.mark.parametrize("task", ["quiz", "document_data"])
+def test_render_matches_langchain_prompt_template(language, task):
+    langchain_prompts = pytest.importorskip("langchain_core.prompts")
+    prompt_template = get_prompt_template(task, language)
+    values = {"note": TRICKY_NOTE, "min_quizzes": "4", "max_quizzes": "5", "prev_questions": "{'q': 1}"}
+
+    rendered = prompt_template.render(**values)
+
+    for message, original in zip(rendered, prompt_template.messages):
+        langchain_template = langchain_prompts.PromptTemplate.from_template(to_langchain_template(original.content))
+        used = {name: values[name] for name in langchain_template.input_variables}
+        assert message.content == langchain_template.format(**used)
+
+
+def test_literal_braces_around_placeholders():
+    content = '{"note": "{{$note}}"} {{{$note}}} {{$ note}} {$note} {{$note}'
+    prompt_template = PromptTemplate([ChatMessage(role="user", content=content)])
+
+    rendered = prompt_template.render(note="N")[0].content
+
+    assert rendered == '{"note": "N"} {N} {{$ note}} {$note} {{$note}'
+    assert [rendered] == [message.content for message in fill_message_placeholders(prompt_template.messages, {"note": "N"})]
+
+
+def test_values_are_inserted_as_is():
+    prompt_template = PromptTemplate([ChatMessage(role="user", content="{{$note}} / {{$max_quizzes}}")])
+
+    # LangChain처럼 한 번만 채우므로, 값 안의 placeholder 모양 text는 다시 치환되지 않는다.
+    assert prompt_template.render(note="{{$max_quizzes}} {x}", max_quizzes="5")[0].content == "{{$max_quizzes}} {x} / 5"
+
+
+def test_template_without_placeholders_is_returned_unchanged():
+    prompt_template = PromptTemplate([ChatMessage(role="system", content="{literal} only")])
+
+    assert prompt_template.render(note="unused") == [ChatMessage(role="system", content="{literal} only")]
@@ -0,0 +1,81 @@
+import asyncio
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+import core.llm.tokenizer as tokenizer
+from core.llm.tokenizer import aload_encoding, count_tokens, estimate_tokens
+
+
+class SlowEncoding:
+    def encode(self, text: str, disallowed_special=()) -> list[int]:
+        return list(range(len(text.split())))
+
+
+@pytest.fixture
+def slow_tiktoken(monkeypatch):
+    """A tiktoken whose get_encoding takes a while, like the first download of the encoding file."""
+    loads = []
+
+    def get_encoding(name: str) -> SlowEncoding:
+        loads.append(name)
+        time.sleep(0.2)
+        return SlowEncoding()
+
+    monkeypatch.setitem(sys.modules, "tiktoken", types.SimpleNamespace(get_encoding=get_encoding))
+    monkeypatch.setattr(tokenizer, "_encoding", None)
+    monkeypatch.setattr(tokenizer, "_encoding_loaded", False)
+    return loads
+
+
+def test_encoding_is_loaded_once_across_threads(slow_tiktoken):
+    barrier = threading.Barrier(8)
+    counts = []
+
+    def count():
+        barrier.wait()
+        counts.append(count_tokens("three words here"))
+
+    threads = [threading.Thread(target=count) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 불러오는 중인 encoding을 None으로 보고 근사치를 세는 thread가 없어야 한다.
+    assert counts == [3] * 8
+    assert slow_tiktoken == [tokenizer.TIKTOKEN_ENCODING_NAME]
+
+
+def test_failed_load_falls_back_to_the_estimate(monkeypatch):
+    def get_encoding(name: str):
+        raise ConnectionError("no network")
+
+    monkeypatch.setitem(sys.modules, "tiktoken", types.SimpleNamespace(get_encoding=get_encoding))
+    monkeypatch.setattr(tokenizer, "_encoding", None)
+    monkeypatch.setattr(tokenizer, "_encoding_loaded", False)
+
+    assert count_tokens("three words here") == estimate_tokens("three words here")
+
+
+def test_loading_on_an_event_loop_does_not_block_it(slow_tiktoken):
+    async def load_while_ticking() -> int:
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(tick())
+        await aload_encoding()
+        ticker.cancel()
+        return ticks
+
+    assert asyncio.run(load_while_ticking()) > 5
+    assert tokenizer._encoding_loaded
+    assert count_tokens("three words here") == 3
@@ -0,0 +1,157 @@
+"""Offline quiz (re)generation through the OpenAI Batch API.
+
+Reads SQS-style job messages ({"s3_key", "db_pk", "member_id", "star_count"}) from a JSONL file,
+submits every chunk prompt of every document as one batch, waits for it and stores the quizzes
+through the same path as the real-time worker. Progress is kept in a state file, so re-running
+the same command resumes polling and skips documents that were already stored.
+
+    python -m worker.batch_worker --jobs jobs.jsonl --state batch_state.json
+"""
+import argparse
+import json
+import os
+import time
+import uuid
+
+from app.job.job_context import JobContext, load_job_context
+from app.job.outbox import claim_outbox, complete_outbox
+from app.quiz.quiz_batch_generator import build_quiz_batch_requests, collect_quiz_batch_results
+from app.quiz.quiz_generator import save_quiz_results
+from core.llm.template import get_prompt_template
+from worker.clients import create_db_manager, get_chat_llm, get_discord_client, get_s3_client
+
+
+BATCH_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+# batch completion window(24h)와 결과 저장까지 lease를 유지한다.
+BATCH_LEASE_SECONDS = 26 * 60 * 60
+
+
+def run_quiz_batch(jobs_path: str, state_path: str, poll_interval: float = 60):
+    state = _load_state(state_path)
+
+    if state["batch_id"] is None:
+        _submit(jobs_path, state, state_path)
+
+    batch = _wait_for_batch(state["batch_id"], poll_interval)
+    if batch.status == "failed":
+        raise RuntimeError(f"Batch {batch.id} failed: {batch.errors}")
+
+    chat_llm = get_chat_llm()
+    batch_results: dict[str, dict | Exception] = {}
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if file_id:
+            batch_results.update(chat_llm.download_batch_results(file_id))
+
+    for db_pk, document in state["documents"].items():
+        if db_pk in state["persisted"]:
+            continue
+        _persist_document(int(db_pk), document, batch_results, state["worker_id"])
+        state["persisted"].append(db_pk)
+        _save_state(state_path, state)
+
+    get_discord_client().flush()
+    print(f"Batch {batch.id} done. documents: {len(state['persisted'])}")
+
+
+def _submit(jobs_path: str, state: dict, state_path: str):
+    s3_client = get_s3_client()
+    chat_llm = get_chat_llm()
+    batch_requests: list[dict] = []
+
+    with open(jobs_path, encoding="utf-8") as f:
+        jobs = [json.loads(line) for line in f if line.strip()]
+
+    for job in jobs:
+        db_pk = int(job["db_pk"])
+        db_manager = create_db_manager()
+        try:
+            # 실시간 worker가 같은 문서를 처리하지 않도록 먼저 lease를 잡는다.
+            # 이전 실행에서 이 state의 worker_id로 잡아 둔 문서는 제출 전에 중단됐던 것이므로 다시 포함된다.
+            if not claim_outbox(db_manager, db_pk, worker_id=state["worker_id"], lease_seconds=BATCH_LEASE_SECONDS):
+                print(f"Skip document {db_pk}: outbox is missing or claimed by another worker")
+                continue
+
+            job_context = load_job_context(s3_client, db_manager, job["s3_key"], db_pk, job["member_id"], job["star_count"])
+        finally:
+            db_manager.close()
+
+        document_requests, chunk_previews = build_quiz_batch_requests(chat_llm, job_context)
+        batch_requests.extend(document_requests)
+        state["documents"][str(db_pk)] = {
+            "s3_key": job_context.s3_key,
+            "member_id": job_context.member_id,
+            "star_count": job_context.star_count,
+            "language": job_context.language,
+            "chunk_count": len(document_requests),
+            "chunk_previews": chunk_previews,
+        }
+        _save_state(state_path, state)
+
+    if not batch_requests:
+        raise RuntimeError("There are no WAITING documents to submit.")
+
+    state["batch_id"] = chat_llm.submit_batch(batch_requests)
+    _save_state(state_path, state)
+    print(f"Submitted batch {state['batch_id']}. documents: {len(state['documents'])}, requests: {len(batch_requests)}")
+
+
+def _wait_for_batch(batch_id: str, poll_interval: float):
+    chat_llm = get_chat_llm()
+    while True:
+        batch = chat_llm.retrieve_batch(batch_id)
+        print(f"Batch {batch_id}: {batch.status} {batch.request_counts}")
+        if batch.status in BATCH_TERMINAL_STATUSES:
+            return batch
+        time.sleep(poll_interval)
+
+
+def _persist_document(db_pk: int, document: dict, batch_results: dict[str, dict | Exception], worker_id: str):
+    job_context = JobContext(
+        s3_key=document["s3_key"],
+        db_pk=db_pk,
+        member_id=document["member_id"],
+        star_count=document["star_count"],
+        content="",
+        language=document["language"],
+        document_prompt=get_prompt_template("document_data", document["language"]),
+        quiz_prompt=get_prompt_template("quiz", document["language"]),
+    )
+    results = collect_quiz_batch_results(batch_results, db_pk, document["chunk_count"])
+
+    db_manager = create_db_manager()
+    try:
+        db_manager.execute_query(f"UPDATE quiz SET is_latest = false WHERE document_id = {db_pk}")
+        save_quiz_results(get_discord_client(), db_manager, job_context, results, document["chunk_previews"])
+        complete_outbox(db_manager, db_pk, worker_id=worker_id)
+        db_manager.commit()
+    finally:
+        db_manager.close()
+
+
+def _load_state(state_path: str) -> dict:
+    if os.path.exists(state_path):
+        with open(state_path, encoding="utf-8") as f:
+            return json.load(f)
+    return {"batch_id": None, "worker_id": f"batch:{uuid.uuid4().hex}", "documents": {}, "persisted": []}
+
+
+def _save_state(state_path: str, state: dict):
+    # 중간에 죽어도 state 파일이 깨지지 않도록 임시 파일에 쓰고 교체한다.
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, state_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate quizzes for many documents with the OpenAI Batch API.")
+    parser.add_argument("--jobs", required=True, help="JSONL file of job messages")
+    parser.add_argument("--state", required=True, help="state file used to resume the run")
+    parser.add_argument("--poll-interval", type=float, default=60)
+    args = parser.parse_args()
+
+    run_quiz_batch(args.jobs, args.state, args.poll_interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import os
+import threading
+
+from core.s3.s3_client import S3Client
+from core.discord.discord_client import DiscordClient
+from core.llm.openai import OpenAIChatLLM
+from core.llm.cache import ResponseCache, create_response_cache
+from core.database.database_manager import ConnectionPool, DatabaseManager, get_connection_pool
+
+
+WORKER_CONCURRENCY = int(os.environ.get("PICKTOSS_WORKER_CONCURRENCY", "4"))
+# record마다 quiz/document generator가 connection을 하나씩 쓴다.
+DB_POOL_SIZE = int(os.environ.get("PICKTOSS_DB_POOL_SIZE", str(WORKER_CONCURRENCY * 2)))
+LLM_CACHE_BACKEND = os.environ.get("PICKTOSS_LLM_CACHE_BACKEND")
+
+
+class ClientRegistry:
+    """Container-scoped clients, built lazily on first use and reused by every warm invocation."""
+
+    def __init__(self):
+        self._clients: dict = {}
+        self._lock = threading.RLock()
+
+    def get(self, name: str, factory):
+        client = self._clients.get(name)
+        if client is not None:
+            return client
+        with self._lock:
+            if name not in self._clients:
+                self._clients[name] = factory()
+            return self._clients[name]
+
+    def peek(self, name: str):
+        """The client if it has been built, without building it."""
+        return self._clients.get(name)
+
+    def close(self):
+        with self._lock:
+            chat_llm = self._clients.pop("chat_llm", None)
+            if chat_llm:
+                chat_llm.close()
+            self._clients.clear()
+
+
+registry = ClientRegistry()
+
+
+def get_s3_client() -> S3Client:
+    return registry.get("s3", lambda: S3Client(access_key=os.environ["PICKTOSS_AWS_ACCESS_KEY"], secret_key=os.environ["PICKTOSS_AWS_SECRET_KEY"], region_name="us-east-1", bucket_name=os.environ["PICKTOSS_S3_BUCKET_NAME"]))
+
+
+def get_discord_client() -> DiscordClient:
+    return registry.get("discord", lambda: DiscordClient(bot_token=os.environ["PICKTOSS_DISCORD_BOT_TOKEN"], channel_id=os.environ["PICKTOSS_DISCORD_CHANNEL_ID"]))
+
+
+def get_sqs_client():
+    return registry.get("sqs", _create_sqs_client)
+
+
+def _create_sqs_client():
+    # Lambda handler는 SQS를 직접 부르지 않으므로 long-running consumer에서만 boto3를 불러온다.
+    import boto3
+
+    return boto3.session.Session().client("sqs", aws_access_key_id=os.environ["PICKTOSS_AWS_ACCESS_KEY"], aws_secret_access_key=os.environ["PICKTOSS_AWS_SECRET_KEY"], region_name="us-east-1")
+
+
+def flush_discord_reports() -> bool:
+    # client가 만들어진 적이 없으면 보낼 리포트도 없다.
+    discord_client = registry.peek("discord")
+    return discord_client.flush() if discord_client else True
+
+
+def get_chat_llm() -> OpenAIChatLLM:
+    return registry.get("chat_llm", lambda: OpenAIChatLLM(
+        api_key=os.environ["PICKTOSS_OPENAI_API_KEY"],
+        model="gpt-4o-mini",
+        requests_per_minute=_optional_int_env("PICKTOSS_OPENAI_RPM"),
+        tokens_per_minute=_optional_int_env("PICKTOSS_OPENAI_TPM"),
+        cache=get_llm_response_cache(),
+    ))
+
+
+def get_db_connection_pool() -> ConnectionPool:
+    return registry.get("db_connection_pool", lambda: get_connection_pool(host=os.environ["PICKTOSS_DB_HOST"], user=os.environ["PICKTOSS_DB_USER"], password=os.environ["PICKTOSS_DB_PASSWORD"], db=os.environ["PICKTOSS_DB_NAME"], max_size=DB_POOL_SIZE))
+
+
+def create_db_manager() -> DatabaseManager:
+    # record 하나의 pipeline 전체가 pool에서 받은 connection 하나를 함께 쓴다.
+    return DatabaseManager(host=os.environ["PICKTOSS_DB_HOST"], user=os.environ["PICKTOSS_DB_USER"], password=os.environ["PICKTOSS_DB_PASSWORD"], db=os.environ["PICKTOSS_DB_NAME"], pool=get_db_connection_pool())
+
+
+def get_llm_response_cache() -> ResponseCache | None:
+    if not LLM_CACHE_BACKEND:
+        return None
+    return registry.get("llm_response_cache", _create_llm_response_cache)
+
+
+def _create_llm_response_cache() -> ResponseCache:
+    print(f"LLM response cache: {LLM_CACHE_BACKEND}")
+    if LLM_CACHE_BACKEND == "sqlite":
+        return create_response_cache("sqlite", path=os.environ.get("PICKTOSS_LLM_CACHE_PATH", "/tmp/picktoss_llm_cache.sqlite3"))
+    if LLM_CACHE_BACKEND == "mysql":
+        db_manager = DatabaseManager(host=os.environ["PICKTOSS_DB_HOST"], user=os.environ["PICKTOSS_DB_USER"], password=os.environ["PICKTOSS_DB_PASSWORD"], db=os.environ["PICKTOSS_DB_NAME"])
+        return create_response_cache("mysql", db_manager=db_manager)
+    return create_response_cache(LLM_CACHE_BACKEND)
+
+
+def _optional_int_env(name: str) -> int | None:
+    value = os.environ.get(name)
+    return int(value) if value else None
@@ -0,0 +1,358 @@
+"""Long-running SQS consumer, an alternative to invoking worker.worker.handler from Lambda.
+
+The main process long-polls SQS and hands messages to a pool of worker processes. Each process runs
+`process_record` (the same job code as the Lambda handler) on a few threads and keeps its own
+container-scoped clients, DB connection pool and OpenAI event loop for its whole lifetime.
+
+While a message is in flight its visibility timeout is extended, successful messages are deleted,
+and failed ones become visible again after `failure_visibility_timeout`. On SIGTERM/SIGINT the
+consumer stops receiving, returns messages that have not started, waits up to `shutdown_timeout`
+for running jobs, then kills the jobs still running, releases their outbox leases and returns their
+messages too, so another consumer picks them up right away.
+
+    python -m worker.consumer --queue-url https://sqs.us-east-1.amazonaws.com/.../picktoss-llm-worker
+        [--processes 2] [--threads-per-process 4] [--prefetch 10] [--max-in-flight 8]
+
+On ECS the Lambda base image's entrypoint has to be overridden, e.g.
+`entryPoint: ["python", "-m", "worker.consumer"]`.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from app.job.outbox import new_worker_id, release_outbox
+from core.database.database_manager import DatabaseManager
+from worker.clients import WORKER_CONCURRENCY, create_db_manager, get_sqs_client
+
+
+logging.basicConfig(level=logging.INFO)
+
+# SQS가 한 번에 돌려주는/한 번에 처리하는 메시지 수의 상한
+SQS_MAX_BATCH_SIZE = 10
+
+
+@dataclass
+class InFlightMessage:
+    receipt_handle: str
+    extended_at: float
+    body: str = ""
+    # job을 시작한 worker가 outbox lease를 잡을 때 쓰는 id
+    worker_id: str | None = None
+
+
+class SQSConsumer:
+    def __init__(
+        self,
+        sqs_client,
+        queue_url: str,
+        processes: int = 2,
+        threads_per_process: int = WORKER_CONCURRENCY,
+        prefetch: int = SQS_MAX_BATCH_SIZE,
+        max_in_flight: int | None = None,
+        visibility_timeout: int = 300,
+        wait_time_seconds: int = 20,
+        failure_visibility_timeout: int = 30,
+        shutdown_timeout: float = 25.0,
+        process_initializer: Callable[[], None] | None = None,
+        db_manager_factory: Callable[[], DatabaseManager] = create_db_manager,
+    ):
+        self.sqs_client = sqs_client
+        self.queue_url = queue_url
+        self.processes = processes
+        self.threads_per_process = threads_per_process
+        self.prefetch = min(prefetch, SQS_MAX_BATCH_SIZE)
+        # 받아 두었지만 아직 끝나지 않은(대기 중 + 실행 중) 메시지 수의 상한
+        self.max_in_flight = max_in_flight or processes * threads_per_process
+        self.visibility_timeout = visibility_timeout
+        self.wait_time_seconds = wait_time_seconds
+        self.failure_visibility_timeout = failure_visibility_timeout
+        self.shutdown_timeout = shutdown_timeout
+        self.process_initializer = process_initializer
+        self.db_manager_factory = db_manager_factory
+
+        self.succeeded = 0
+        self.failed = 0
+
+        self._in_flight: dict[str, InFlightMessage] = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def stop(self, *_):
+        if not self._stopping.is_set():
+            print("Stopping consumer: no new messages will be received")
+        self._stopping.set()
+
+    def run(self):
+        # fork는 main process의 thread와 SDK 상태를 복사하므로 spawn으로 깨끗한 process를 띄운다.
+        mp_context = multiprocessing.get_context("spawn")
+        self._job_queue = mp_context.Queue()
+        self._result_queue = mp_context.Queue()
+        workers = [
+            mp_context.Process(
+                target=_process_main,
+                args=(self._job_queue, self._result_queue, self.threads_per_process, self.process_initializer),
+                name=f"picktoss-consumer-{i}",
+            )
+            for i in range(self.processes)
+        ]
+        for worker in workers:
+            worker.start()
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        poller = threading.Thread(target=self._poll, name="sqs-poller", daemon=True)
+        poller.start()
+        print(f"Consumer started. processes: {self.processes}, threads per process: {self.threads_per_process}, max in flight: {self.max_in_flight}")
+
+        try:
+            deadline = None
+            while True:
+                self._drain_results(timeout=1.0)
+                self._extend_visibility()
+
+                if self._stopping.is_set():
+                    if deadline is None:
+                        deadline = time.monotonic() + self.shutdown_timeout
+                        self._release_unstarted()
+                    if not self._in_flight or time.monotonic() > deadline:
+                        break
+        finally:
+            self._stopping.set()
+            poller.join(timeout=self.wait_time_seconds + 5)
+            self._release_unstarted()
+
+            for _ in range(self.processes * self.threads_per_process):
+                self._job_queue.put(None)
+            for worker in workers:
+                worker.join(timeout=max(0.0, deadline - time.monotonic()) + 5 if deadline else 5)
+                if worker.is_alive():
+                    # worker process는 SIGTERM을 무시하므로 SIGKILL로 끝낸다.
+                    worker.kill()
+                    worker.join()
+
+            # 종료를 기다리는 동안 끝난 job은 결과대로 처리한다.
+            self._drain_results(timeout=0.1)
+            # 강제로 끝난 job은 release_outbox를 실행하지 못했으므로 대신 lease를 풀어서,
+            # 다시 전달된 메시지가 lease 만료를 기다리지 않고 바로 claim할 수 있게 한다.
+            self._release_leases(list(self._in_flight.values()))
+            self._change_visibility(list(self._in_flight), 0)
+
+        print(f"Consumer stopped. succeeded: {self.succeeded}, failed: {self.failed}")
+
+    def _poll(self):
+        while not self._stopping.is_set():
+            capacity = self.max_in_flight - len(self._in_flight)
+            if capacity <= 0:
+                time.sleep(0.1)
+                continue
+
+            try:
+                response = self.sqs_client.receive_message(
+                    QueueUrl=self.queue_url,
+                    MaxNumberOfMessages=min(self.prefetch, capacity),
+                    WaitTimeSeconds=self.wait_time_seconds,
+                    VisibilityTimeout=self.visibility_timeout,
+                )
+            except Exception:
+                logging.exception("Failed to receive SQS messages")
+                time.sleep(1)
+                continue
+
+            messages = response.get("Messages", [])
+            if self._stopping.is_set():
+                # long polling 중에 종료가 시작됐다면 받은 메시지를 바로 돌려준다.
+                self._change_visibility_of(messages, 0)
+                return
+
+            for message in messages:
+                with self._lock:
+                    self._in_flight[message["MessageId"]] = InFlightMessage(
+                        receipt_handle=message["ReceiptHandle"], extended_at=time.monotonic(), body=message["Body"]
+                    )
+                # process_record가 받는 Lambda SQS event의 record와 같은 모양으로 넘긴다.
+                self._job_queue.put({"messageId": message["MessageId"], "receiptHandle": message["ReceiptHandle"], "body": message["Body"]})
+
+    def _drain_results(self, timeout: float):
+        try:
+            results = [self._result_queue.get(timeout=timeout)]
+        except queue.Empty:
+            return
+        while True:
+            try:
+                results.append(self._result_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        succeeded, failed = [], []
+        # ("started", worker_id) 또는 ("done", 실패했으면 error 문자열)
+        for message_id, status, detail in results:
+            with self._lock:
+                if status == "started":
+                    if message_id in self._in_flight:
+                        self._in_flight[message_id].worker_id = detail
+                    continue
+                message = self._in_flight.pop(message_id, None)
+            if message is None:
+                continue
+            if detail is None:
+                succeeded.append(message)
+            else:
+                print(f"Job failed. messageId: {message_id}, error: {detail}")
+                failed.append(message)
+
+        self.succeeded += len(succeeded)
+        self.failed += len(failed)
+        for batch in _batches(succeeded):
+            self._call_batch(self.sqs_client.delete_message_batch, [
+                {"Id": str(i), "ReceiptHandle": message.receipt_handle} for i, message in enumerate(batch)
+            ])
+        for batch in _batches(failed):
+            self._call_batch(self.sqs_client.change_message_visibility_batch, [
+                {"Id": str(i), "ReceiptHandle": message.receipt_handle, "VisibilityTimeout": self.failure_visibility_timeout}
+                for i, message in enumerate(batch)
+            ])
+
+    def _extend_visibility(self):
+        now = time.monotonic()
+        with self._lock:
+            # timeout의 절반이 지나면 연장해서, 실행 중인 job이 다른 consumer에게 보이지 않게 한다.
+            expiring = [message for message in self._in_flight.values() if now - message.extended_at > self.visibility_timeout / 2]
+            for message in expiring:
+                message.extended_at = now
+        for batch in _batches(expiring):
+            self._call_batch(self.sqs_client.change_message_visibility_batch, [
+                {"Id": str(i), "ReceiptHandle": message.receipt_handle, "VisibilityTimeout": self.visibility_timeout}
+                for i, message in enumerate(batch)
+            ])
+
+    def _release_unstarted(self):
+        # 아직 process가 꺼내 가지 않은 메시지는 queue에서 빼서 SQS에 돌려준다.
+        released = []
+        while True:
+            try:
+                record = self._job_queue.get_nowait()
+            except queue.Empty:
+                break
+            if record is not None:
+                released.append(record["messageId"])
+        self._change_visibility(released, 0)
+
+    def _release_leases(self, messages: list[InFlightMessage]):
+        started = [message for message in messages if message.worker_id]
+        if not started:
+            return
+        db_manager = self.db_manager_factory()
+        try:
+            for message in started:
+                try:
+                    release_outbox(db_manager, int(json.loads(message.body)["db_pk"]), message.worker_id)
+                except Exception:
+                    # 풀지 못한 lease는 sweeper가 만료 후 되돌린다.
+                    logging.exception(f"Failed to release outbox lease. worker_id: {message.worker_id}")
+        finally:
+            db_manager.close()
+
+    def _change_visibility(self, message_ids: list[str], visibility_timeout: int):
+        with self._lock:
+            messages = [self._in_flight.pop(message_id) for message_id in message_ids if message_id in self._in_flight]
+        for batch in _batches(messages):
+            self._call_batch(self.sqs_client.change_message_visibility_batch, [
+                {"Id": str(i), "ReceiptHandle": message.receipt_handle, "VisibilityTimeout": visibility_timeout}
+                for i, message in enumerate(batch)
+            ])
+
+    def _change_visibility_of(self, messages: list[dict], visibility_timeout: int):
+        for batch in _batches(messages):
+            self._call_batch(self.sqs_client.change_message_visibility_batch, [
+                {"Id": str(i), "ReceiptHandle": message["ReceiptHandle"], "VisibilityTimeout": visibility_timeout}
+                for i, message in enumerate(batch)
+            ])
+
+    def _call_batch(self, method, entries: list[dict]):
+        try:
+            response = method(QueueUrl=self.queue_url, Entries=entries)
+        except Exception:
+            logging.exception(f"SQS {method.__name__} failed")
+            return
+        for failure in response.get("Failed", []):
+            print(f"SQS {method.__name__} failed for entry {failure.get('Id')}: {failure.get('Message')}")
+
+
+def _process_main(job_queue, result_queue, threads: int, initializer: Callable[[], None] | None):
+    # 종료 신호는 main process가 받아서 처리하고, worker process는 sentinel을 받을 때까지 하던 job을 끝낸다.
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if initializer:
+        initializer()
+
+    import worker.worker as worker_module
+    from worker.clients import flush_discord_reports, registry
+
+    def work():
+        while True:
+            record = job_queue.get()
+            if record is None:
+                return
+            # main process가 강제 종료 후 lease를 풀 수 있도록 worker_id를 먼저 알린다.
+            worker_id = new_worker_id()
+            result_queue.put((record["messageId"], "started", worker_id))
+            try:
+                worker_module.process_record(record, None, worker_id=worker_id)
+            except Exception as e:
+                logging.exception(f"Failed to process record. messageId: {record['messageId']}")
+                result_queue.put((record["messageId"], "done", f"{type(e).__name__}: {e}"))
+            else:
+                result_queue.put((record["messageId"], "done", None))
+
+    job_threads = [threading.Thread(target=work, name=f"job-{i}") for i in range(threads)]
+    for thread in job_threads:
+        thread.start()
+    for thread in job_threads:
+        thread.join()
+
+    flush_discord_reports()
+    registry.close()
+
+
+def _batches(items: list, size: int = SQS_MAX_BATCH_SIZE) -> list[list]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consume quiz generation jobs from SQS with a process pool.")
+    parser.add_argument("--queue-url", default=os.environ.get("PICKTOSS_SQS_QUEUE_URL"))
+    parser.add_argument("--processes", type=int, default=int(os.environ.get("PICKTOSS_CONSUMER_PROCESSES", os.cpu_count() or 1)))
+    parser.add_argument("--threads-per-process", type=int, default=WORKER_CONCURRENCY)
+    parser.add_argument("--prefetch", type=int, default=int(os.environ.get("PICKTOSS_CONSUMER_PREFETCH", SQS_MAX_BATCH_SIZE)))
+    parser.add_argument("--max-in-flight", type=int, default=int(os.environ.get("PICKTOSS_CONSUMER_MAX_IN_FLIGHT", "0")) or None)
+    parser.add_argument("--visibility-timeout", type=int, default=300)
+    parser.add_argument("--shutdown-timeout", type=float, default=25.0)
+    args = parser.parse_args()
+
+    if not args.queue_url:
+        parser.error("--queue-url or PICKTOSS_SQS_QUEUE_URL is required")
+
+    SQSConsumer(
+        sqs_client=get_sqs_client(),
+        queue_url=args.queue_url,
+        processes=args.processes,
+        threads_per_process=args.threads_per_process,
+        prefetch=args.prefetch,
+        max_in_flight=args.max_in_flight,
+        visibility_timeout=args.visibility_timeout,
+        shutdown_timeout=args.shutdown_timeout,
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
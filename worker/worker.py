@@ -1,63 +1,140 @@
-import os
+import contextvars
 import json
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 
-from core.s3.s3_client import S3Client
-from core.discord.discord_client import DiscordClient
-from core.llm.openai import OpenAIChatLLM
-from core.database.database_manager import DatabaseManager
+from app.job.job_context import JobContext, load_job_context
+from app.job.outbox import claim_outbox, complete_outbox, new_worker_id, release_outbox, sweep_expired_leases
 from app.document.document_data_generator import document_data_generator
 from app.quiz.quiz_generator import quiz_generator
+from app.quiz.quiz_target import target_quiz_count
+from core.llm.deadline import deadline_after
+from core.tracing.tracer import span
+from worker.clients import WORKER_CONCURRENCY, create_db_manager, flush_discord_reports, get_chat_llm, get_discord_client, get_llm_response_cache, get_s3_client
 
 
 logging.basicConfig(level=logging.INFO)
 
+# Lambda 제한 시간 중 LLM 호출에 쓰지 않고 결과 저장, outbox 정리, Discord flush에 남겨두는 시간
+DEADLINE_RESERVE_SECONDS = float(os.environ.get("PICKTOSS_DEADLINE_RESERVE_SECONDS", "30"))
+
+
 def handler(event, context):
-    
     print(event)
-    event_info: str = event["Records"][0]["body"]
+    # EventBridge schedule로 호출되면 만료된 outbox lease를 되돌리는 sweeper로 동작한다.
+    if event.get("detail-type") == "Scheduled Event":
+        return sweep(event, context)
+
+    records: list[dict] = event.get("Records", [])
+    batch_item_failures: list[dict] = []
+
+    if not records:
+        return {"batchItemFailures": batch_item_failures}
+
+    max_workers = max(1, min(WORKER_CONCURRENCY, len(records)))
+    with span("handler", records=len(records)) as handler_span, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # record별 span이 handler span 아래에 기록되도록 context를 복사해서 넘긴다.
+        futures = [(record, executor.submit(contextvars.copy_context().run, process_record, record, context)) for record in records]
+
+        for record, future in futures:
+            try:
+                result = future.result()
+                print(f"messageId: {record.get('messageId')}, result: {result}")
+            except Exception:
+                logging.exception(f"Failed to process record. messageId: {record.get('messageId')}")
+                batch_item_failures.append({"itemIdentifier": record["messageId"]})
+        handler_span.add("failed_records", len(batch_item_failures))
+
+    # Lambda는 handler가 반환되면 container를 멈추므로, 쌓여 있는 에러 리포트를 먼저 보낸다.
+    if not flush_discord_reports():
+        print("Timed out while flushing Discord error reports")
+
+    llm_response_cache = get_llm_response_cache()
+    if llm_response_cache:
+        print(f"LLM response cache stats: {llm_response_cache.stats()}")
+
+    # SQS event source mapping에 ReportBatchItemFailures가 설정되어 있어야 실패한 메시지만 재전송된다.
+    return {"batchItemFailures": batch_item_failures}
+
+
+def process_record(record: dict, context, worker_id: str | None = None) -> dict:
+    event_info: str = record["body"]
     body: dict = json.loads(event_info)
     if "s3_key" not in body or "db_pk" not in body:
-        raise ValueError(f"s3_key and db_pk must be provided. event: {event}, context: {context}")
-    
+        raise ValueError(f"s3_key and db_pk must be provided. record: {record}, context: {context}")
+
     s3_key = body["s3_key"]
     db_pk = int(body["db_pk"])
     star_count = body["star_count"]
     member_id = body["member_id"]
 
-    # core client settings
-    s3_client = S3Client(access_key=os.environ["PICKTOSS_AWS_ACCESS_KEY"], secret_key=os.environ["PICKTOSS_AWS_SECRET_KEY"], region_name="us-east-1", bucket_name=os.environ["PICKTOSS_S3_BUCKET_NAME"])
-    discord_client = DiscordClient(bot_token=os.environ["PICKTOSS_DISCORD_BOT_TOKEN"], channel_id=os.environ["PICKTOSS_DISCORD_CHANNEL_ID"])
-    chat_llm = OpenAIChatLLM(api_key=os.environ["PICKTOSS_OPENAI_API_KEY"], model="gpt-4o-mini")
-    db_manager = DatabaseManager(host=os.environ["PICKTOSS_DB_HOST"], user=os.environ["PICKTOSS_DB_USER"], password=os.environ["PICKTOSS_DB_PASSWORD"], db=os.environ["PICKTOSS_DB_NAME"])
-    
-    get_outbox_query = f"SELECT * FROM outbox WHERE document_id = {db_pk}"
-    outbox = db_manager.execute_query(get_outbox_query)
+    db_manager = create_db_manager()
+    # consumer는 job을 강제로 끝낸 뒤 대신 lease를 풀 수 있도록 worker_id를 정해서 넘긴다.
+    worker_id = worker_id or new_worker_id()
+
+    # LLM 호출은 deadline이 가까워지면 새 요청을 멈추고, 그때까지 끝난 결과만 저장한다.
+    with span("process_record", document_id=db_pk, message_id=record.get("messageId")), deadline_after(_job_budget_seconds(context)):
+        try:
+            # 중복 전달된 SQS 메시지가 동시에 와도 한 worker만 outbox row를 가져간다.
+            if not claim_outbox(db_manager, db_pk, worker_id):
+                print("There is no claimable data in the outbox table.")
+                return {"StatusCode": 200, "message": "Outbox is missing or already being processed."}
+            print("Processing LLM API")
+
+            # core client settings (container 단위로 한 번만 만들어지고 warm invocation에서 재사용된다)
+            # 처리할 문서가 있을 때만 만들어서, 건너뛰는 메시지는 SDK import 비용을 내지 않는다.
+            s3_client = get_s3_client()
+            discord_client = get_discord_client()
+            chat_llm = get_chat_llm()
+
+            update_quiz_is_latest_query = f"UPDATE quiz SET is_latest = false WHERE document_id = {db_pk}"
+            db_manager.execute_query(update_quiz_is_latest_query)
+            db_manager.commit()
+
+            # S3 문서, document 조회, prompt 로딩, chunking은 한 번만 하고 두 generator가 공유한다.
+            job_context = load_job_context(s3_client, db_manager, s3_key, db_pk, member_id, star_count, target_quiz_count(body))
+
+            # 두 generator는 서로 독립적인 LLM 호출이므로 동시에 실행한다.
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                document_future = executor.submit(contextvars.copy_context().run, _generate_document_data, discord_client, chat_llm, job_context)
+                quiz_generator(discord_client, chat_llm, db_manager, job_context)
+                document_future.result()
 
-    if not outbox:
-        print("There is no data in the outbox table.")
-        return {"StatusCode": 200, "message": "There is no data in the outbox table."}
+            complete_outbox(db_manager, db_pk, worker_id)
+            db_manager.commit()
+        except Exception:
+            try:
+                release_outbox(db_manager, db_pk, worker_id)
+            except Exception:
+                logging.exception(f"Failed to release outbox. document_id: {db_pk}")
+            raise
+        finally:
+            db_manager.close()
 
-    if outbox[0]['status'] == "PROCESSING":
-        print("Data that is already being processed.")
-        return {"StatusCode": 200, "message": "Data that is already being processed."}
+    return {"statusCode": 200, "message": "hi"}
 
-    if outbox[0]['status'] == "WAITING":
-        print("Processing LLM API")
-        update_outbox_query = f"UPDATE outbox SET status = 'PROCESSING' WHERE document_id = {db_pk}"
-        db_manager.execute_query(update_outbox_query)
-        db_manager.commit()
 
-    update_quiz_is_latest_query = f"UPDATE quiz SET is_latest = false WHERE document_id = {db_pk}"
-    db_manager.execute_query(update_quiz_is_latest_query)
-    db_manager.commit()
+def _job_budget_seconds(context) -> float | None:
+    # consumer나 bench처럼 Lambda context가 없으면 deadline을 두지 않는다.
+    if context is None or not hasattr(context, "get_remaining_time_in_millis"):
+        return None
+    return max(0.0, context.get_remaining_time_in_millis() / 1000 - DEADLINE_RESERVE_SECONDS)
 
-    document_data_generator(s3_client, discord_client, chat_llm, s3_key, db_pk)
 
-    quiz_generator(s3_client, discord_client, chat_llm, s3_key, db_pk, member_id, star_count)
+def sweep(event, context) -> dict:
+    db_manager = create_db_manager()
+    try:
+        document_ids = sweep_expired_leases(db_manager)
+    finally:
+        db_manager.close()
+    return {"statusCode": 200, "swept": document_ids}
 
-    delete_outbox_query = f"DELETE FROM outbox WHERE document_id = {db_pk}"
-    db_manager.execute_query(delete_outbox_query)
-    db_manager.commit()
 
-    return {"statusCode": 200, "message": "hi"}
\ No newline at end of file
+def _generate_document_data(discord_client, chat_llm, job_context: JobContext):
+    # pymysql connection은 thread 간에 공유할 수 없으므로 pool에서 connection을 하나 더 받는다.
+    db_manager = create_db_manager()
+    try:
+        document_data_generator(discord_client, chat_llm, db_manager, job_context)
+    finally:
+        db_manager.close()